@@ -1,6 +1,7 @@
 # flask_server/__init__.py
 import os
 import logging
+import time
 from flask import Flask, jsonify, request # Ensure 'request' is imported
 from flask_cors import CORS
 
@@ -14,10 +15,25 @@ from .course_recommender import course_bp                     # From course_reco
 from .features.jobs_routes import jobs_bp                     # From features/jobs_routes.py
 from .features.resume_tools_routes import resume_tools_bp     # From features/resume_tools_routes.py
 from .features.ai_practice_routes import ai_practice_bp       # From features/ai_practice_routes.py
-from .pages.load_model import load_bert_model                 # From pages/load_model.py
+from .features.health_routes import health_bp                 # From features/health_routes.py
+from .features.task_routes import tasks_bp                    # From features/task_routes.py
+from .warmup import start_warmup, record_create_app_time      # From warmup.py (loads SBERT and the course model)
+from .pages.embedding_cache import init_app as init_embedding_cache # From pages/embedding_cache.py
+from .pages.job_index import init_app as init_job_index       # From pages/job_index.py
+from .pages.fetch_data import init_app as init_adzuna_client  # From pages/fetch_data.py
+from .pages.jobs_cache import init_app as init_jobs_cache     # From pages/jobs_cache.py
+from .pages.inference_batcher import init_app as init_inference_batcher # From pages/inference_batcher.py
+from .pages.extract import init_app as init_pdf_extraction    # From pages/extract.py
+from .pages.parsed_resume_store import init_app as init_parsed_resume_store # From pages/parsed_resume_store.py
+from .pages.resume_tailoring import init_app as init_resume_tailoring # From pages/resume_tailoring.py
+from .pages.answer_evaluation import init_app as init_answer_evaluation # From pages/answer_evaluation.py
+from .pages.llm_client import init_app as init_llm_client     # From pages/llm_client.py
+from .pages.task_queue import init_app as init_task_queue     # From pages/task_queue.py
+from .pages.llm_cache import init_app as init_llm_cache       # From pages/llm_cache.py
 
 # This is the application factory
 def create_app(config_class=Config):
+    create_app_start = time.perf_counter()
     app = Flask("flask_server") # Or app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -81,26 +97,41 @@ def create_app(config_class=Config):
     # Initialize Authlib OAuth clients
     init_auth_oauth_services(app)
 
-    # SBERT Model Loading
-    # sbert_model, sbert_loaded = load_bert_model(app.logger)
-    # app.config['SBERT_MODEL'] = sbert_model
-    # app.config['SBERT_MODEL_LOADED'] = sbert_loaded
-    # if not sbert_loaded:
-    #     app.logger.warning("SBERT model failed to load or was disabled. Related features will be affected.")
-    # else:
-    #     app.logger.info(f"SBERT Model Loaded and attached to app.config: {sbert_loaded}")
-    
-    # Course Recommender TF-IDF Model Status Check (loaded in its own service module)
+    # Course Recommender: result cache and model file watcher. The model itself loads during warm-up.
     try:
-        from .course_recommender.service import get_model_status as get_course_recommender_status
-        cr_status = get_course_recommender_status()
-        app.logger.info(f"Course Recommender TF-IDF Model Status: {cr_status['status']} - {cr_status['message']}")
-        if cr_status['status'] == "DOWN":
-             app.logger.error("CRITICAL: Course Recommender TF-IDF Model failed to load.")
-    except ImportError:
-        app.logger.error("Could not import course_recommender.service in __init__ to check status.")
+        from .course_recommender.service import init_app as init_course_recommender_service
+        init_course_recommender_service(app)
     except Exception as e:
-        app.logger.error(f"Error checking course recommender status on startup in __init__: {e}", exc_info=True)
+        app.logger.error(f"Error initializing course recommender service in __init__: {e}", exc_info=True)
+
+    # SBERT embedding cache (wrapped around the model once warm-up has loaded it)
+    init_embedding_cache(app)
+    # Cross-request SBERT micro-batching (also applied by warm-up, beneath the embedding cache)
+    init_inference_batcher(app)
+    # Pooled Adzuna session: timeouts, retries and circuit breaker
+    init_adzuna_client(app)
+    # Cache of Adzuna search results (stale-while-revalidate)
+    init_jobs_cache(app)
+    # Recently fetched jobs by id (for /api/match_score_batch)
+    init_job_index(app)
+    # Resume PDF limits, text cache and process pool settings
+    init_pdf_extraction(app)
+    # Reuse of LLM resume parses (table created by user_db.create_all() above)
+    init_parsed_resume_store(app)
+    # Shared Ollama client settings (the model itself is pre-loaded by warm-up)
+    init_llm_client(app)
+    # Concurrency cap for resume section tailoring
+    init_resume_tailoring(app)
+    # Concurrency cap and batch size for interview answer evaluation
+    init_answer_evaluation(app)
+    # Cache of LLM generations (interview questions)
+    init_llm_cache(app)
+    # Background task queue and this process's task workers (for the /async endpoints)
+    init_task_queue(app)
+
+    # SBERT (when SBERT_ENABLED) and the TF-IDF course model load here, in the background by default.
+    # Until warm-up finishes /api/readyz returns 503 and the model-backed endpoints return 503.
+    start_warmup(app)
 
     # Register Blueprints
     app.register_blueprint(auth_bp)
@@ -108,6 +139,8 @@ def create_app(config_class=Config):
     app.register_blueprint(jobs_bp)
     app.register_blueprint(resume_tools_bp)
     app.register_blueprint(ai_practice_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(tasks_bp)
     app.logger.info("All application blueprints registered.")
 
     # Root Route
@@ -130,5 +163,6 @@ def create_app(config_class=Config):
             "configured_frontend_url_for_cors": app.config.get('FRONTEND_URL')
         })
 
+    record_create_app_time(time.perf_counter() - create_app_start)
     app.logger.info("Flask application '%s' (with SQLAlchemy) created successfully and ready.", app.name)
     return app
\ No newline at end of file
@@ -46,6 +46,137 @@ class Config:
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
     ADZUNA_APP_ID = os.getenv('ADZUNA_APP_ID')
     ADZUNA_APP_KEY = os.getenv('ADZUNA_APP_KEY')
+    # Adzuna client (see pages/fetch_data.py); point ADZUNA_BASE_URL at `python -m flask_server.pages.fake_adzuna` locally
+    ADZUNA_BASE_URL = os.getenv('ADZUNA_BASE_URL', 'http://api.adzuna.com/v1/api/jobs')
+    ADZUNA_CONNECT_TIMEOUT_SECONDS = float(os.getenv('ADZUNA_CONNECT_TIMEOUT_SECONDS', '3.05'))
+    ADZUNA_READ_TIMEOUT_SECONDS = float(os.getenv('ADZUNA_READ_TIMEOUT_SECONDS', '10'))
+    ADZUNA_POOL_SIZE = int(os.getenv('ADZUNA_POOL_SIZE', '10')) # Keep-alive connections per worker
+    # Connection errors, timeouts, 429 and 5xx: retries with backoff, or after Retry-After if it is short enough
+    ADZUNA_MAX_RETRIES = int(os.getenv('ADZUNA_MAX_RETRIES', '2'))
+    ADZUNA_BACKOFF_SECONDS = float(os.getenv('ADZUNA_BACKOFF_SECONDS', '0.5'))
+    ADZUNA_MAX_RETRY_AFTER_SECONDS = float(os.getenv('ADZUNA_MAX_RETRY_AFTER_SECONDS', '5'))
+    # After this many failed searches in a row /api/fetch_jobs answers 503 at once for ADZUNA_BREAKER_RESET_SECONDS
+    ADZUNA_BREAKER_FAILURES = int(os.getenv('ADZUNA_BREAKER_FAILURES', '5'))
+    ADZUNA_BREAKER_RESET_SECONDS = float(os.getenv('ADZUNA_BREAKER_RESET_SECONDS', '30'))
+
+    # Course recommender retrieval engine: 'brute_force', 'inverted_index' or 'hybrid'
+    # ('hybrid' needs SBERT_ENABLED and a version built with `python -m flask_server.course_recommender.embeddings`)
+    COURSE_RECOMMENDER_ENGINE = os.getenv('COURSE_RECOMMENDER_ENGINE', 'brute_force')
+    # Hybrid engine: weight of the embedding score in the re-rank, candidates per retriever, IVF lists scanned per query
+    COURSE_HYBRID_DENSE_WEIGHT = float(os.getenv('COURSE_HYBRID_DENSE_WEIGHT', '0.5'))
+    COURSE_HYBRID_CANDIDATES = int(os.getenv('COURSE_HYBRID_CANDIDATES', '50'))
+    COURSE_ANN_N_PROBE = int(os.getenv('COURSE_ANN_N_PROBE', '8'))
+    # Poll 'ML prediction/versions' every N seconds and hot-reload when the active version changes (0 disables)
+    COURSE_MODEL_WATCH_INTERVAL_SECONDS = int(os.getenv('COURSE_MODEL_WATCH_INTERVAL_SECONDS', '30'))
+    # Shared secret for POST /api/admin/reload_recommender (endpoint disabled when unset)
+    RECOMMENDER_ADMIN_TOKEN = os.getenv('RECOMMENDER_ADMIN_TOKEN')
+
+    # --- Startup warm-up (see warmup.py) ---
+    # Load models in a background thread so workers accept connections immediately; /api/readyz reports when warm.
+    # Set to false to load inline in create_app (scripts, gunicorn --preload: threads do not survive the fork).
+    WARMUP_IN_BACKGROUND = os.getenv('WARMUP_IN_BACKGROUND', 'true').lower() == 'true'
+    # Load the SBERT model (sentence-transformers + torch) during warm-up
+    SBERT_ENABLED = os.getenv('SBERT_ENABLED', 'false').lower() == 'true'
+    # 'torch' (sentence-transformers) or 'onnx' (onnxruntime, no torch; export first with
+    # `python -m flask_server.pages.onnx_encoder export`, check drift with `... check`)
+    SBERT_BACKEND = os.getenv('SBERT_BACKEND', 'torch')
+    SBERT_ONNX_DIR = os.getenv('SBERT_ONNX_DIR', os.path.join(os.path.dirname(BASE_DIR), 'ML prediction', 'sbert_onnx'))
+    SBERT_ONNX_QUANTIZED = os.getenv('SBERT_ONNX_QUANTIZED', 'true').lower() == 'true' # int8 weights
+    SBERT_ONNX_THREADS = int(os.getenv('SBERT_ONNX_THREADS', '0')) # onnxruntime intra-op threads (0: one per core)
+    # Comma-separated warm-up components whose failure keeps /api/readyz at 503 ('course_recommender', 'sbert', 'llm').
+    # Defaults to the models the endpoints cannot serve without; set it to '' to report ready regardless.
+    WARMUP_REQUIRED_COMPONENTS = os.getenv('WARMUP_REQUIRED_COMPONENTS', 'course_recommender,sbert' if SBERT_ENABLED else 'course_recommender')
+
+    # --- PDF extraction (see pages/extract.py) ---
+    # Uploads over these limits are rejected with 413
+    PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', str(10 * 1024 * 1024)))
+    PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '50'))
+    # Opt-in: with PDF_WORKERS > 1, documents with at least PDF_PARALLEL_MIN_PAGES pages are extracted in a pool
+    # of PDF_WORKERS processes, PDF_PAGES_PER_TASK pages per task. Text resumes extract faster in the request
+    # thread (each task re-parses the file); check with `python -m flask_server.pages.extract benchmark FILE.pdf`.
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '16'))
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', '8'))
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', '1'))
+    PDF_EXTRACT_TIMEOUT_SECONDS = int(os.getenv('PDF_EXTRACT_TIMEOUT_SECONDS', '60'))
+
+    # --- LLM (Ollama) ---
+    # One pooled client per worker (see pages/llm_client.py); `python -m flask_server.pages.fake_ollama` stands in locally
+    OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://127.0.0.1:11434')
+    OLLAMA_CONNECT_TIMEOUT_SECONDS = float(os.getenv('OLLAMA_CONNECT_TIMEOUT_SECONDS', '5'))
+    OLLAMA_TIMEOUT_SECONDS = float(os.getenv('OLLAMA_TIMEOUT_SECONDS', '120'))
+    OLLAMA_MAX_RETRIES = int(os.getenv('OLLAMA_MAX_RETRIES', '1')) # Connection failures only
+    # How long Ollama keeps the model loaded after each call ('30m', '1h', -1 forever)
+    OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+    # Model pre-loaded during warm-up (component 'llm'), so the first request does not wait for it to load
+    LLM_MODEL = os.getenv('LLM_MODEL', 'tinyllama')
+    LLM_PRELOAD = os.getenv('LLM_PRELOAD', 'true').lower() == 'true'
+    # Generations in flight per worker, all features together (match the server's OLLAMA_NUM_PARALLEL);
+    # a call waits up to LLM_QUEUE_TIMEOUT_SECONDS for a slot, then fails with 503
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+    LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '60'))
+    # Try the rule-based resume parser (pages/resume_parser.py) first; the LLM parses only resumes it scores
+    # below this confidence. `python -m flask_server.pages.resume_parser benchmark <dir>` shows the skip rate.
+    RESUME_RULE_PARSER_ENABLED = os.getenv('RESUME_RULE_PARSER_ENABLED', 'true').lower() == 'true'
+    RESUME_RULE_PARSER_MIN_CONFIDENCE = float(os.getenv('RESUME_RULE_PARSER_MIN_CONFIDENCE', '0.75'))
+    # LLM calls in flight for resume section tailoring, across all requests of a worker
+    RESUME_TAILOR_MAX_CONCURRENCY = int(os.getenv('RESUME_TAILOR_MAX_CONCURRENCY', '4'))
+    # LLM calls in flight for answer evaluation, across all requests of a worker
+    ANSWER_EVAL_MAX_CONCURRENCY = int(os.getenv('ANSWER_EVAL_MAX_CONCURRENCY', '4'))
+    # Answers scored per prompt; above 1, several answers share one structured prompt
+    ANSWER_EVAL_BATCH_SIZE = int(os.getenv('ANSWER_EVAL_BATCH_SIZE', '1'))
+
+    # --- Background tasks (see pages/task_queue.py; used by the /async endpoints) ---
+    TASK_QUEUE_ENABLED = os.getenv('TASK_QUEUE_ENABLED', 'true').lower() == 'true'
+    # Worker threads per process running queued tasks (0: this process only submits)
+    TASK_QUEUE_WORKERS = int(os.getenv('TASK_QUEUE_WORKERS', '2'))
+    TASK_QUEUE_POLL_SECONDS = float(os.getenv('TASK_QUEUE_POLL_SECONDS', '1'))
+    # Running tasks not heartbeating for this long (their process died) are requeued, up to TASK_MAX_ATTEMPTS runs
+    TASK_STALE_SECONDS = int(os.getenv('TASK_STALE_SECONDS', '300'))
+    TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '2'))
+    # Finished tasks (and their results) are deleted after this
+    TASK_RESULT_TTL_SECONDS = int(os.getenv('TASK_RESULT_TTL_SECONDS', '86400'))
+
+    # --- Local caches ---
+    # SQLite file shared by every worker on this host (used by the 'sqlite' cache backends)
+    LOCAL_CACHE_DIR = os.getenv('LOCAL_CACHE_DIR', os.path.join(BASE_DIR, '.cache'))
+    LOCAL_CACHE_DB_PATH = os.getenv('LOCAL_CACHE_DB_PATH', os.path.join(LOCAL_CACHE_DIR, 'cache.sqlite3'))
+    # The background task queue (kept apart from the caches: its rows are not disposable)
+    TASK_QUEUE_DB_PATH = os.getenv('TASK_QUEUE_DB_PATH', os.path.join(LOCAL_CACHE_DIR, 'tasks.sqlite3'))
+    # Course recommendation results: 'memory' (per worker), 'sqlite' (per host) or 'none'
+    COURSE_CACHE_BACKEND = os.getenv('COURSE_CACHE_BACKEND', 'memory')
+    COURSE_CACHE_MAX_ENTRIES = int(os.getenv('COURSE_CACHE_MAX_ENTRIES', '2048'))
+    COURSE_CACHE_TTL_SECONDS = int(os.getenv('COURSE_CACHE_TTL_SECONDS', '3600'))
+    # SBERT embeddings by text hash: 'sqlite' (per host, survives restarts), 'memory' (per worker) or 'none'
+    EMBEDDING_CACHE_BACKEND = os.getenv('EMBEDDING_CACHE_BACKEND', 'sqlite')
+    EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MEMORY_ENTRIES', '4096'))
+    EMBEDDING_CACHE_DISK_ENTRIES = int(os.getenv('EMBEDDING_CACHE_DISK_ENTRIES', '200000'))
+    # Merge concurrent SBERT encode calls into one forward pass of up to SBERT_BATCH_MAX_SIZE texts,
+    # holding the first caller at most SBERT_BATCH_MAX_WAIT_MS for others to join
+    SBERT_BATCHING_ENABLED = os.getenv('SBERT_BATCHING_ENABLED', 'true').lower() == 'true'
+    SBERT_BATCH_MAX_SIZE = int(os.getenv('SBERT_BATCH_MAX_SIZE', '32'))
+    SBERT_BATCH_MAX_WAIT_MS = float(os.getenv('SBERT_BATCH_MAX_WAIT_MS', '5'))
+    # Resume PDF text by SHA-256 of the upload: 'sqlite', 'memory' or 'none'
+    PDF_TEXT_CACHE_BACKEND = os.getenv('PDF_TEXT_CACHE_BACKEND', 'sqlite')
+    PDF_TEXT_CACHE_MAX_ENTRIES = int(os.getenv('PDF_TEXT_CACHE_MAX_ENTRIES', '2000'))
+    PDF_TEXT_CACHE_TTL_SECONDS = int(os.getenv('PDF_TEXT_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+    # Store parse_resume_with_llm output in the database (ParsedResume) and reuse it for the same resume text
+    PARSED_RESUME_CACHE_ENABLED = os.getenv('PARSED_RESUME_CACHE_ENABLED', 'true').lower() == 'true'
+    # LLM generations by normalized prompt inputs and model (interview questions): 'sqlite', 'memory' or 'none'.
+    # LLM_CACHE_VARIANTS > 1 keeps that many different generations per prompt and serves one at random.
+    LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'sqlite')
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000'))
+    LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+    LLM_CACHE_VARIANTS = int(os.getenv('LLM_CACHE_VARIANTS', '1'))
+    # Jobs returned by /api/fetch_jobs, so /api/match_score_batch can take job ids: 'sqlite', 'memory' or 'none'
+    JOB_INDEX_BACKEND = os.getenv('JOB_INDEX_BACKEND', 'sqlite')
+    JOB_INDEX_MAX_ENTRIES = int(os.getenv('JOB_INDEX_MAX_ENTRIES', '20000'))
+    JOB_INDEX_TTL_SECONDS = int(os.getenv('JOB_INDEX_TTL_SECONDS', '86400'))
+    # Adzuna search results for /api/fetch_jobs: 'sqlite', 'memory' or 'none'. Fresh for JOBS_CACHE_TTL_SECONDS,
+    # then served stale (and refreshed in the background) for JOBS_CACHE_STALE_SECONDS more.
+    JOBS_CACHE_BACKEND = os.getenv('JOBS_CACHE_BACKEND', 'sqlite')
+    JOBS_CACHE_MAX_ENTRIES = int(os.getenv('JOBS_CACHE_MAX_ENTRIES', '2000'))
+    JOBS_CACHE_TTL_SECONDS = int(os.getenv('JOBS_CACHE_TTL_SECONDS', '600'))
+    JOBS_CACHE_STALE_SECONDS = int(os.getenv('JOBS_CACHE_STALE_SECONDS', '3600'))
 
     # --- Database Configuration ---
     # Render provides DATABASE_URL automatically when a DB is linked.
@@ -0,0 +1,185 @@
+# flask_server/course_recommender/ann.py
+# Approximate nearest-neighbour search over L2-normalized course embeddings (cosine = inner product).
+#
+# IVFIndex is an inverted-file index: spherical k-means splits the catalog into n_lists clusters and
+# every course is stored in the list of its nearest centroid, with the vectors of a list kept contiguous.
+# A query scores the centroids, then scans only the n_probe closest lists. Raising n_probe trades
+# latency for recall; n_probe == n_lists is exact search. evaluate_ann() measures both against exact_top_k.
+#
+# On disk (inside a course_embeddings/ directory, see embeddings.py):
+#   ivf.centroids.npy   (n_lists, dim) float32
+#   ivf.offsets.npy     (n_lists + 1,) int64   list i spans rows offsets[i]:offsets[i+1]
+#   ivf.ids.npy         (n_courses,)   int32   course index of each row
+#   ivf.vectors.npy     (n_courses, dim) float32, rows in list order
+import os
+import time
+
+import numpy as np
+
+DEFAULT_N_PROBE = 8
+KMEANS_ITERATIONS = 15
+KMEANS_SAMPLE_PER_LIST = 256 # Training points per centroid; the rest of the catalog is only assigned
+ASSIGN_CHUNK_ROWS = 65_536
+
+IVF_FILES = {
+    "centroids": "ivf.centroids.npy",
+    "offsets": "ivf.offsets.npy",
+    "ids": "ivf.ids.npy",
+    "vectors": "ivf.vectors.npy",
+}
+
+def default_n_lists(n_rows):
+    return max(1, int(round(np.sqrt(n_rows))))
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def _assign(vectors, centroids):
+    """Index of the nearest (max inner product) centroid for each row, computed in chunks."""
+    labels = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], ASSIGN_CHUNK_ROWS):
+        chunk = np.asarray(vectors[start:start + ASSIGN_CHUNK_ROWS], dtype=np.float32)
+        labels[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
+
+def spherical_kmeans(vectors, n_clusters, n_iter=KMEANS_ITERATIONS, seed=0):
+    """Lloyd iterations with unit-norm centroids. Empty clusters are re-seeded from random rows."""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), size=n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(vectors, centroids)
+        counts = np.bincount(labels, minlength=n_clusters)
+        non_empty = np.flatnonzero(counts)
+        sums = np.zeros_like(centroids)
+        sums[non_empty] = np.add.reduceat(vectors[np.argsort(labels, kind='stable')], (np.cumsum(counts) - counts)[non_empty])
+        empty = np.flatnonzero(counts == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+        centroids = _normalize_rows(sums).astype(np.float32)
+    return centroids
+
+def exact_top_k(embeddings, query_vectors, top_n):
+    """Exhaustive inner-product search; the reference ANN recall is measured against."""
+    results = []
+    for query in np.atleast_2d(query_vectors):
+        scores = np.asarray(embeddings @ query, dtype=np.float32)
+        results.append(_top_k(np.arange(len(scores)), scores, top_n))
+    return results
+
+def _top_k(indices, scores, top_n):
+    if len(scores) > top_n:
+        part = np.argpartition(-scores, top_n - 1)[:top_n]
+        indices, scores = indices[part], scores[part]
+    order = np.argsort(-scores, kind='stable')
+    return indices[order], scores[order]
+
+class IVFIndex:
+    def __init__(self, centroids, offsets, ids, vectors):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    @property
+    def dim(self):
+        return self.centroids.shape[1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, embeddings, n_lists=None, n_iter=KMEANS_ITERATIONS, seed=0):
+        """embeddings: (n_courses, dim) L2-normalized float32 rows (may be a memmap)."""
+        n_rows = embeddings.shape[0]
+        n_lists = min(n_lists or default_n_lists(n_rows), n_rows)
+        rng = np.random.default_rng(seed)
+        sample_size = min(n_rows, n_lists * KMEANS_SAMPLE_PER_LIST)
+        sample = np.asarray(embeddings[np.sort(rng.choice(n_rows, size=sample_size, replace=False))], dtype=np.float32)
+        centroids = spherical_kmeans(sample, n_lists, n_iter=n_iter, seed=seed)
+        labels = _assign(embeddings, centroids)
+        ids = np.argsort(labels, kind='stable').astype(np.int32)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=offsets[1:])
+        vectors = np.asarray(embeddings[ids], dtype=np.float32)
+        return cls(centroids, offsets, ids, vectors)
+
+    def save(self, directory):
+        for name, filename in IVF_FILES.items():
+            np.save(os.path.join(directory, filename), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        arrays = {name: np.load(os.path.join(directory, filename), mmap_mode='r' if mmap else None)
+                  for name, filename in IVF_FILES.items()}
+        # Centroids and offsets are small and read on every query
+        arrays["centroids"] = np.ascontiguousarray(arrays["centroids"])
+        arrays["offsets"] = np.asarray(arrays["offsets"])
+        return cls(**arrays)
+
+    def search(self, query_vectors, top_n, n_probe=DEFAULT_N_PROBE):
+        """Returns one (course_indices, scores) pair per query row, best first."""
+        query_vectors = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        n_probe = max(1, min(n_probe, self.n_lists))
+        centroid_scores = query_vectors @ self.centroids.T
+        if n_probe < self.n_lists:
+            probed = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probed = np.broadcast_to(np.arange(self.n_lists), (len(query_vectors), self.n_lists))
+        results = []
+        for query, lists in zip(query_vectors, probed):
+            ids, scores = [], []
+            for list_id in lists:
+                start, end = self.offsets[list_id], self.offsets[list_id + 1]
+                if start == end:
+                    continue
+                ids.append(self.ids[start:end])
+                scores.append(self.vectors[start:end] @ query)
+            if not ids:
+                results.append((np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)))
+                continue
+            results.append(_top_k(np.concatenate(ids), np.concatenate(scores), top_n))
+        return results
+
+def _without(ids, exclude_id, top_n):
+    if exclude_id is not None:
+        ids = ids[ids != exclude_id]
+    return ids[:top_n]
+
+def evaluate_ann(index, embeddings, query_vectors, top_n=10, n_probes=(1, 2, 4, 8, 16, 32), exclude_ids=None):
+    """Recall@top_n and per-query latency of index.search for each n_probe, against exact_top_k.
+
+    exclude_ids[i] is dropped from both result lists of query i: pass the row ids when the queries are indexed
+    vectors, otherwise every query finds itself (in a list that is always probed) and recall is overstated.
+    Returns a list of dicts; the exact search row has n_probe None.
+    """
+    if exclude_ids is None:
+        exclude_ids = [None] * len(query_vectors)
+    extra = 1 if any(exclude_id is not None for exclude_id in exclude_ids) else 0
+    timings = []
+    exact = []
+    for query, exclude_id in zip(query_vectors, exclude_ids):
+        start = time.perf_counter()
+        exact_ids, _ = exact_top_k(embeddings, query, top_n + extra)[0]
+        timings.append((time.perf_counter() - start) * 1000)
+        exact.append(_without(exact_ids, exclude_id, top_n))
+    rows = [{"n_probe": None, "recall": 1.0, "mean_ms": float(np.mean(timings)), "p95_ms": float(np.percentile(timings, 95))}]
+    for n_probe in n_probes:
+        if n_probe > index.n_lists:
+            break
+        timings, hits, total = [], 0, 0
+        for query, exact_ids, exclude_id in zip(query_vectors, exact, exclude_ids):
+            start = time.perf_counter()
+            ann_ids, _ = index.search(query, top_n + extra, n_probe=n_probe)[0]
+            timings.append((time.perf_counter() - start) * 1000)
+            ann_ids = _without(ann_ids, exclude_id, top_n)
+            hits += len(np.intersect1d(ann_ids, exact_ids))
+            total += len(exact_ids)
+        rows.append({"n_probe": n_probe, "recall": hits / total if total else 1.0,
+                     "mean_ms": float(np.mean(timings)), "p95_ms": float(np.percentile(timings, 95))})
+    return rows
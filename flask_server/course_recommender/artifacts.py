@@ -0,0 +1,410 @@
+# flask_server/course_recommender/artifacts.py
+# On-disk format for the course recommender that can be opened with mmap instead of unpickled.
+#
+# Layout of an artifact directory:
+#   manifest.json                      format version, shapes, vectorizer params, metadata column names
+#   vocabulary.bin / .offsets.npy      vectorizer terms in column order (UTF-8 blob + int64 offsets); empty for a
+#                                      hashing vectorizer (manifest vectorizer.kind == "hashing", see train.py)
+#   idf.npy                            vectorizer idf weights
+#   matrix.data.npy / .indices.npy / .indptr.npy   CSR arrays of the L2-normalized course matrix
+#   postings.data.npy / .indices.npy / .indptr.npy CSC arrays of the same matrix (term -> courses, course ids
+#                                      sorted), for the inverted index; absent in sets written before they existed
+#   meta_<i>.bin / .offsets.npy        one UTF-8 blob + offsets per metadata column
+#   payloads.bin / .offsets.npy        pre-serialized JSON recommendation payload per course (see payloads.py)
+#
+# Every array is opened with np.load(mmap_mode='r') / mmap, so all workers on a host share
+# one page-cache copy and nothing is deserialized at boot. CourseArtifactWriter writes the format in row
+# blocks, so a catalog never has to fit in memory at once (see train.py).
+import argparse
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+
+import numpy as np
+
+from .payloads import MappedPayloadTable, iter_payload_fragments
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = "course-artifacts"
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+METADATA_COLUMNS = ['course_title', 'Course URL', 'course_skills', 'course_description']
+
+# TfidfVectorizer params that can be stored in JSON and passed back to the constructor
+_VECTORIZER_PARAMS = [
+    'analyzer', 'binary', 'decode_error', 'encoding', 'input', 'lowercase', 'max_df', 'max_features',
+    'min_df', 'ngram_range', 'norm', 'smooth_idf', 'stop_words', 'strip_accents', 'sublinear_tf',
+    'token_pattern', 'use_idf'
+]
+HASHING_VECTORIZER_KIND = "hashing"
+_HASHING_VECTORIZER_PARAMS = [
+    'analyzer', 'binary', 'decode_error', 'encoding', 'input', 'lowercase', 'n_features', 'ngram_range',
+    'stop_words', 'strip_accents', 'token_pattern'
+]
+_COPY_BLOCK_BYTES = 64 * 1024 * 1024
+
+class MappedTextColumn:
+    """Read-only column of strings backed by a memory-mapped UTF-8 blob and an offsets array."""
+
+    def __init__(self, blob_path, offsets_path):
+        # Plain ndarray view of the mapping: indexing an np.memmap subclass is several times slower
+        self._offsets = np.load(offsets_path, mmap_mode='r').view(np.ndarray)
+        # mmap cannot map an empty file (e.g. a column that is empty for every course)
+        if os.path.getsize(blob_path) > 0:
+            with open(blob_path, 'rb') as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._blob = b""
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return self._blob[start:end].decode('utf-8')
+
+class MappedCourseMetadata:
+    """Course metadata as memory-mapped text columns; row(idx) returns a plain dict."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def row(self, idx):
+        return {name: column[idx] for name, column in self.columns.items()}
+
+def is_artifact_dir(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_FILENAME))
+
+class _TextColumnWriter:
+    """Appends strings to a UTF-8 blob; close() writes the offsets array."""
+
+    def __init__(self, blob_path, offsets_path):
+        self._blob = open(blob_path, 'wb')
+        self._offsets_path = offsets_path
+        self._offsets = [np.zeros(1, dtype=np.int64)]
+        self._end = 0
+
+    def append(self, values):
+        lengths = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            encoded = value.encode('utf-8')
+            self._blob.write(encoded)
+            lengths[i] = len(encoded)
+        if len(lengths):
+            offsets = self._end + np.cumsum(lengths)
+            self._offsets.append(offsets)
+            self._end = int(offsets[-1])
+
+    def close(self):
+        self._blob.close()
+        np.save(self._offsets_path, np.concatenate(self._offsets))
+
+def _write_text_column(values, blob_path, offsets_path):
+    writer = _TextColumnWriter(blob_path, offsets_path)
+    writer.append(values)
+    writer.close()
+
+def _raw_to_npy(raw_path, npy_path, dtype, length):
+    """Copies a headerless binary array file into an .npy file block by block, then removes the raw file."""
+    if length == 0:
+        np.save(npy_path, np.empty(0, dtype=dtype))
+    else:
+        target = np.lib.format.open_memmap(npy_path, mode='w+', dtype=dtype, shape=(length,))
+        source = np.memmap(raw_path, mode='r', dtype=dtype, shape=(length,))
+        block = max(1, _COPY_BLOCK_BYTES // np.dtype(dtype).itemsize)
+        for start in range(0, length, block):
+            target[start:start + block] = source[start:start + block]
+        target.flush()
+        del target, source
+    os.remove(raw_path)
+
+def _write_postings(artifact_dir, n_terms, nnz):
+    """Writes the CSC (postings) copy of the mapped CSR matrix in artifact_dir with a two-pass counting sort over
+    blocks of entries, so neither copy of the matrix has to fit in memory."""
+    path = lambda name: os.path.join(artifact_dir, name)
+    data = np.load(path('matrix.data.npy'), mmap_mode='r')
+    columns = np.load(path('matrix.indices.npy'), mmap_mode='r')
+    row_indptr = np.load(path('matrix.indptr.npy'), mmap_mode='r')
+    block = max(1, _COPY_BLOCK_BYTES // 16)
+
+    counts = np.zeros(n_terms, dtype=np.int64)
+    for start in range(0, nnz, block):
+        counts += np.bincount(columns[start:start + block], minlength=n_terms)
+    indptr = np.zeros(n_terms + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    index_dtype = np.int32 if nnz <= np.iinfo(np.int32).max else np.int64
+    np.save(path('postings.indptr.npy'), indptr.astype(index_dtype))
+    if nnz == 0:
+        np.save(path('postings.data.npy'), np.empty(0, dtype=np.float64))
+        np.save(path('postings.indices.npy'), np.empty(0, dtype=np.int32))
+        return
+
+    out_data = np.lib.format.open_memmap(path('postings.data.npy'), mode='w+', dtype=np.float64, shape=(nnz,))
+    out_rows = np.lib.format.open_memmap(path('postings.indices.npy'), mode='w+', dtype=np.int32, shape=(nnz,))
+    cursor = indptr[:-1].copy() # Next free slot per term
+    for start in range(0, nnz, block):
+        end = min(nnz, start + block)
+        block_columns = np.asarray(columns[start:end])
+        # Entries are in row order, so a stable sort by term keeps each term's course ids ascending
+        order = np.argsort(block_columns, kind='stable')
+        sorted_columns = block_columns[order]
+        block_counts = np.bincount(sorted_columns, minlength=n_terms)
+        group_starts = np.concatenate(([0], np.cumsum(block_counts)[:-1]))
+        targets = cursor[sorted_columns] + (np.arange(end - start) - group_starts[sorted_columns])
+        rows = np.searchsorted(row_indptr, np.arange(start, end), side='right') - 1
+        out_rows[targets] = rows[order]
+        out_data[targets] = np.asarray(data[start:end])[order]
+        cursor += block_counts
+    out_data.flush()
+    out_rows.flush()
+    del out_data, out_rows
+
+def _as_text(value):
+    if value is None or (isinstance(value, float) and value != value): # None / NaN
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+def _vectorizer_params(vectorizer):
+    params = vectorizer.get_params()
+    for callable_param in ('tokenizer', 'preprocessor'):
+        if params.get(callable_param) is not None:
+            raise ValueError(f"Vectorizer uses a custom {callable_param}; it cannot be stored in the artifact format.")
+    if not isinstance(params.get('stop_words'), (str, list, type(None))):
+        params['stop_words'] = sorted(params['stop_words'])
+    stored = {name: params[name] for name in _VECTORIZER_PARAMS}
+    stored['ngram_range'] = list(stored['ngram_range'])
+    stored['dtype'] = np.dtype(params['dtype']).name
+    return stored
+
+def hashing_vectorizer_params(hashing_vectorizer, tfidf_params):
+    """Manifest entry for a HashingVectorizer followed by a TfidfTransformer (see _build_vectorizer)."""
+    params = hashing_vectorizer.get_params()
+    if params.get('tokenizer') is not None or params.get('preprocessor') is not None:
+        raise ValueError("Vectorizer uses a custom tokenizer/preprocessor; it cannot be stored in the artifact format.")
+    if not isinstance(params.get('stop_words'), (str, list, type(None))):
+        params['stop_words'] = sorted(params['stop_words'])
+    hashing = {name: params[name] for name in _HASHING_VECTORIZER_PARAMS}
+    hashing['ngram_range'] = list(hashing['ngram_range'])
+    hashing['dtype'] = np.dtype(params['dtype']).name
+    return {"kind": HASHING_VECTORIZER_KIND, "hashing": hashing, "tfidf": dict(tfidf_params)}
+
+def _vocabulary_terms(vectorizer):
+    vocabulary = vectorizer.vocabulary_
+    terms = [None] * len(vocabulary)
+    for term, column in vocabulary.items():
+        terms[column] = term
+    return terms
+
+class CourseArtifactWriter:
+    """Writes an artifact set in row blocks: append() L2-normalized CSR blocks with their metadata rows, then
+    finish(). Only one block and the row offsets are held in memory. The directory is written next to its final
+    location and renamed into place by finish(), so readers never see a half-written artifact set.
+    """
+
+    def __init__(self, output_dir, n_terms, metadata_columns=METADATA_COLUMNS):
+        self.output_dir = os.path.abspath(output_dir)
+        self.tmp_dir = f"{self.output_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+        self.n_terms = n_terms
+        self.metadata_columns = list(metadata_columns)
+        self.n_courses = 0
+        self.nnz = 0
+        self._data = open(self._path('matrix.data.raw'), 'wb')
+        self._indices = open(self._path('matrix.indices.raw'), 'wb')
+        self._indptr = [np.zeros(1, dtype=np.int64)]
+        self._meta_writers = [_TextColumnWriter(self._path(f'meta_{i}.bin'), self._path(f'meta_{i}.offsets.npy'))
+                              for i in range(len(self.metadata_columns))]
+        self._payload_writer = _TextColumnWriter(self._path('payloads.bin'), self._path('payloads.offsets.npy'))
+
+    def _path(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def append(self, course_matrix, metadata_df):
+        course_matrix = course_matrix.tocsr()
+        course_matrix.sort_indices()
+        if course_matrix.shape[1] != self.n_terms:
+            raise ValueError(f"Block has {course_matrix.shape[1]} columns, expected {self.n_terms}.")
+        if course_matrix.shape[0] != len(metadata_df):
+            raise ValueError(f"Matrix has {course_matrix.shape[0]} rows but metadata has {len(metadata_df)}.")
+        self._data.write(np.asarray(course_matrix.data, dtype=np.float64).tobytes())
+        self._indices.write(np.asarray(course_matrix.indices, dtype=np.int32).tobytes())
+        self._indptr.append(self.nnz + np.asarray(course_matrix.indptr[1:], dtype=np.int64))
+        for writer, col in zip(self._meta_writers, self.metadata_columns):
+            writer.append([_as_text(v) for v in metadata_df[col].tolist()])
+        self._payload_writer.append(list(iter_payload_fragments(metadata_df, start=self.n_courses)))
+        self.nnz += course_matrix.nnz
+        self.n_courses += course_matrix.shape[0]
+
+    def finish(self, vectorizer_params, terms, idf, extra=None):
+        """Writes vocabulary, idf and manifest (plus any `extra` manifest keys) and moves the set into place."""
+        self._data.close()
+        self._indices.close()
+        for writer in self._meta_writers + [self._payload_writer]:
+            writer.close()
+        _raw_to_npy(self._path('matrix.data.raw'), self._path('matrix.data.npy'), np.float64, self.nnz)
+        _raw_to_npy(self._path('matrix.indices.raw'), self._path('matrix.indices.npy'), np.int32, self.nnz)
+        # Same index dtype as the indices, so scipy can wrap the mapped arrays without upcasting (copying) them
+        indptr = np.concatenate(self._indptr)
+        np.save(self._path('matrix.indptr.npy'), indptr.astype(np.int32) if self.nnz <= np.iinfo(np.int32).max else indptr)
+        _write_postings(self.tmp_dir, self.n_terms, self.nnz)
+        _write_text_column(terms, self._path('vocabulary.bin'), self._path('vocabulary.offsets.npy'))
+        np.save(self._path('idf.npy'), np.asarray(idf, dtype=np.float64))
+
+        manifest = {
+            "format": ARTIFACT_FORMAT,
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "n_courses": int(self.n_courses),
+            "n_terms": int(self.n_terms),
+            "nnz": int(self.nnz),
+            "matrix_normalized": True,
+            "vectorizer": vectorizer_params,
+            "metadata_columns": self.metadata_columns,
+            "payloads": True,
+            "postings": True,
+        }
+        manifest.update(extra or {})
+        with open(self._path(MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.isdir(self.output_dir):
+            shutil.rmtree(self.output_dir)
+        os.rename(self.tmp_dir, self.output_dir)
+        logger.info(f"Course artifacts written to {self.output_dir} ({manifest['n_courses']} courses, {manifest['n_terms']} terms).")
+        return manifest
+
+    def abort(self):
+        for f in (self._data, self._indices):
+            f.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+def save_course_artifacts(output_dir, vectorizer, course_matrix, metadata_df):
+    """Writes vectorizer, course matrix and metadata to output_dir in the mmap-able format.
+
+    The matrix rows are L2-normalized before writing.
+    """
+    from sklearn.preprocessing import normalize
+
+    course_matrix = normalize(course_matrix, norm='l2', copy=True).tocsr()
+    writer = CourseArtifactWriter(output_dir, course_matrix.shape[1],
+                                  metadata_columns=[col for col in METADATA_COLUMNS if col in metadata_df.columns])
+    try:
+        writer.append(course_matrix, metadata_df)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.finish(_vectorizer_params(vectorizer), _vocabulary_terms(vectorizer), vectorizer.idf_)
+
+def read_manifest(artifact_dir):
+    with open(os.path.join(artifact_dir, MANIFEST_FILENAME), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported course artifact format in {artifact_dir}: "
+                         f"{manifest.get('format')} v{manifest.get('format_version')}")
+    return manifest
+
+def _build_vectorizer(params, terms, idf):
+    if params.get('kind') == HASHING_VECTORIZER_KIND:
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        from sklearn.pipeline import make_pipeline
+
+        hashing = dict(params['hashing'])
+        hashing['ngram_range'] = tuple(hashing['ngram_range'])
+        hashing['dtype'] = np.dtype(hashing['dtype']).type
+        transformer = TfidfTransformer(**params['tfidf'])
+        transformer.idf_ = idf
+        return make_pipeline(HashingVectorizer(alternate_sign=False, norm=None, **hashing), transformer)
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    params = dict(params)
+    params['ngram_range'] = tuple(params['ngram_range'])
+    params['dtype'] = np.dtype(params['dtype']).type
+    vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(terms)}, **params)
+    vectorizer.idf_ = idf
+    return vectorizer
+
+def load_course_artifacts(artifact_dir):
+    """Opens an artifact directory and returns (vectorizer, course_matrix, metadata, manifest).
+
+    The CSR arrays and metadata columns stay memory-mapped; only the vocabulary dict is built in process.
+    """
+    from scipy.sparse import csr_matrix
+
+    manifest = read_manifest(artifact_dir)
+    path = lambda name: os.path.join(artifact_dir, name)
+
+    vocabulary = MappedTextColumn(path('vocabulary.bin'), path('vocabulary.offsets.npy'))
+    terms = [vocabulary[i] for i in range(len(vocabulary))]
+    vectorizer = _build_vectorizer(manifest["vectorizer"], terms, np.load(path('idf.npy')))
+
+    course_matrix = csr_matrix(
+        (np.load(path('matrix.data.npy'), mmap_mode='r'),
+         np.load(path('matrix.indices.npy'), mmap_mode='r'),
+         np.load(path('matrix.indptr.npy'), mmap_mode='r')),
+        shape=(manifest["n_courses"], manifest["n_terms"]), copy=False
+    )
+
+    metadata = MappedCourseMetadata({
+        col: MappedTextColumn(path(f'meta_{i}.bin'), path(f'meta_{i}.offsets.npy'))
+        for i, col in enumerate(manifest["metadata_columns"])
+    })
+    return vectorizer, course_matrix, metadata, manifest
+
+def load_payload_table(artifact_dir):
+    """Memory-mapped pre-rendered payloads, or None for artifact sets written before payloads existed."""
+    blob_path = os.path.join(artifact_dir, 'payloads.bin')
+    if not os.path.isfile(blob_path):
+        return None
+    return MappedPayloadTable(MappedTextColumn(blob_path, os.path.join(artifact_dir, 'payloads.offsets.npy')))
+
+def load_postings(artifact_dir):
+    """Memory-mapped CSC postings of the course matrix, or None for artifact sets written before postings existed."""
+    from scipy.sparse import csc_matrix
+
+    path = lambda name: os.path.join(artifact_dir, name)
+    if not os.path.isfile(path('postings.indptr.npy')):
+        return None
+    manifest = read_manifest(artifact_dir)
+    postings = csc_matrix(
+        (np.load(path('postings.data.npy'), mmap_mode='r'),
+         np.load(path('postings.indices.npy'), mmap_mode='r'),
+         np.load(path('postings.indptr.npy'), mmap_mode='r')),
+        shape=(manifest["n_courses"], manifest["n_terms"]), copy=False
+    )
+    postings.has_sorted_indices = True # Written sorted by _write_postings; keeps scipy from sorting the read-only map
+    return postings
+
+def convert_joblib_artifacts(vectorizer_path, matrix_path, metadata_path, output_dir):
+    """Converts the notebook's three joblib pickles into the mmap-able artifact format."""
+    import joblib
+
+    logger.info(f"Converting joblib course model from {os.path.dirname(vectorizer_path)} to {output_dir}")
+    vectorizer = joblib.load(vectorizer_path)
+    course_matrix = joblib.load(matrix_path)
+    metadata_df = joblib.load(metadata_path)
+    return save_course_artifacts(output_dir, vectorizer, course_matrix, metadata_df)
+
+def main(argv=None):
+    from .service import MODEL_DIR_PATH, VECTORIZER_PATH, COURSE_MATRIX_PATH, COURSE_METADATA_PATH, COURSE_ARTIFACTS_DIR
+
+    parser = argparse.ArgumentParser(description="Convert 'ML prediction/*.joblib' course model files to the mmap artifact format.")
+    parser.add_argument('--source-dir', default=MODEL_DIR_PATH, help="Directory holding the three .joblib files")
+    parser.add_argument('--output-dir', default=COURSE_ARTIFACTS_DIR, help="Artifact directory to create (replaced if it exists)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    source = lambda default_path: os.path.join(args.source_dir, os.path.basename(default_path))
+    manifest = convert_joblib_artifacts(source(VECTORIZER_PATH), source(COURSE_MATRIX_PATH), source(COURSE_METADATA_PATH), args.output_dir)
+    print(json.dumps(manifest, indent=2))
+
+if __name__ == '__main__':
+    main()
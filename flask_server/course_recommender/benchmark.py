@@ -0,0 +1,189 @@
+# flask_server/course_recommender/benchmark.py
+# Compares the brute_force and inverted_index engines on synthetic TF-IDF catalogs.
+#
+#   python -m flask_server.course_recommender.benchmark --sizes 10000,100000,1000000
+#
+# Term popularity follows a Zipf-like distribution so postings lengths resemble a real vocabulary.
+# For every catalog size it reports per-query latency for both engines, the index build time and
+# how often the two engines return the same top-k scores. A second table times payload assembly
+# (pandas row access vs. the pre-rendered payload tables in payloads.py). A third reports recall@top_n
+# and latency of the IVF index (ann.py) against exact dense search on clustered synthetic embeddings;
+# run `python -m flask_server.course_recommender.embeddings` for the same report on the real catalog.
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.preprocessing import normalize
+
+from .ann import IVFIndex, evaluate_ann
+from .artifacts import MappedTextColumn, _write_text_column
+from .engines import InvertedIndex, brute_force_top_k
+from .payloads import MappedPayloadTable, build_payload_table, gather_recommendations, iter_payload_fragments
+
+def _term_probabilities(n_terms, zipf_exponent):
+    weights = 1.0 / np.arange(1, n_terms + 1) ** zipf_exponent
+    return weights / weights.sum()
+
+def make_synthetic_matrix(n_rows, n_terms, terms_per_row, rng, zipf_exponent=1.05, chunk_rows=100_000, idf=None):
+    """Random L2-normalized TF-IDF-like CSR matrix whose term frequencies follow a Zipf-like distribution.
+
+    Returns (matrix, idf). Pass the idf of a catalog to weight queries against it.
+    """
+    probabilities = _term_probabilities(n_terms, zipf_exponent)
+    chunks = []
+    for start in range(0, n_rows, chunk_rows):
+        rows = min(chunk_rows, n_rows - start)
+        cols = rng.choice(n_terms, size=rows * terms_per_row, p=probabilities).astype(np.int32)
+        indptr = np.arange(0, rows * terms_per_row + 1, terms_per_row, dtype=np.int64)
+        chunk = csr_matrix((np.ones(rows * terms_per_row), cols, indptr), shape=(rows, n_terms))
+        chunk.sum_duplicates() # data becomes term counts
+        chunks.append(chunk)
+    matrix = vstack(chunks, format='csr')
+    if idf is None:
+        document_frequency = np.bincount(matrix.indices, minlength=n_terms)
+        idf = np.log((1 + n_rows) / (1 + document_frequency)) + 1 # sklearn's smooth_idf
+    matrix.data *= idf[matrix.indices]
+    return normalize(matrix, norm='l2', copy=False), idf
+
+def _time_per_query(fn, query_matrix):
+    timings, results = [], []
+    for row in range(query_matrix.shape[0]):
+        query = query_matrix[row]
+        start = time.perf_counter()
+        results.append(fn(query)[0])
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), results
+
+def _same_scores(a, b):
+    return len(a[1]) == len(b[1]) and np.allclose(a[1], b[1], atol=1e-9)
+
+def run_benchmark(sizes, n_terms=50_000, terms_per_course=60, terms_per_query=40, n_queries=50, top_n=3, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in sizes:
+        course_matrix, idf = make_synthetic_matrix(size, n_terms, terms_per_course, rng)
+        query_matrix, _ = make_synthetic_matrix(n_queries, n_terms, terms_per_query, rng, idf=idf)
+
+        build_start = time.perf_counter()
+        index = InvertedIndex(course_matrix)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        brute_ms, brute_results = _time_per_query(lambda q: brute_force_top_k(course_matrix, q, top_n), query_matrix)
+        index_ms, index_results = _time_per_query(lambda q: index.top_k(q, top_n), query_matrix)
+        agreement = np.mean([_same_scores(a, b) for a, b in zip(brute_results, index_results)])
+        rows.append({
+            "courses": size, "nnz": course_matrix.nnz, "index_build_ms": build_ms,
+            "brute_mean_ms": brute_ms.mean(), "brute_p95_ms": np.percentile(brute_ms, 95),
+            "index_mean_ms": index_ms.mean(), "index_p95_ms": np.percentile(index_ms, 95),
+            "speedup": brute_ms.mean() / index_ms.mean(), "topk_agreement": agreement,
+        })
+    return rows
+
+def _legacy_recommendations(metadata_df, indices, scores):
+    # Per-hit pandas row access, as get_predictions did before payloads were pre-rendered
+    recs = []
+    for idx, score in zip(indices, scores):
+        info = metadata_df.iloc[idx]
+        recs.append({
+            "id": f"tf_course_{idx}", "name": info.get('course_title'), "url": info.get('Course URL'),
+            "platform": "Coursera", "relevance": f"{score:.2%}",
+            "description_snippet": (info.get('course_description')[:150] + "...") if info.get('course_description') else "",
+            "skills_taught": info.get('course_skills')
+        })
+    return recs
+
+def run_payload_benchmark(n_courses=100_000, top_n=20, n_responses=2000, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    metadata_df = pd.DataFrame({
+        'course_title': [f"Course {i}" for i in range(n_courses)],
+        'Course URL': [f"https://www.coursera.org/learn/course-{i}" for i in range(n_courses)],
+        'course_skills': ["Python  SQL  Data Analysis  Machine Learning"] * n_courses,
+        'course_description': ["An in-depth course description " * 12] * n_courses,
+    })
+    responses = [(rng.choice(n_courses, size=top_n, replace=False), np.sort(rng.random(top_n))[::-1]) for _ in range(n_responses)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        blob_path, offsets_path = os.path.join(tmp_dir, 'payloads.bin'), os.path.join(tmp_dir, 'payloads.offsets.npy')
+        _write_text_column(list(iter_payload_fragments(metadata_df)), blob_path, offsets_path)
+        variants = [
+            ("pandas iloc (legacy)", lambda idx, sc: _legacy_recommendations(metadata_df, idx, sc)),
+            ("payload tuple", lambda idx, sc, table=build_payload_table(metadata_df): gather_recommendations(table, idx, sc)),
+            ("mmap JSON payloads", lambda idx, sc, table=MappedPayloadTable(MappedTextColumn(blob_path, offsets_path)): gather_recommendations(table, idx, sc)),
+        ]
+        rows = []
+        for name, assemble in variants:
+            start = time.perf_counter()
+            for indices, scores in responses:
+                assemble(indices, scores)
+            rows.append({"variant": name, "us_per_response": (time.perf_counter() - start) * 1e6 / n_responses})
+    return rows
+
+def make_synthetic_embeddings(n_rows, dim, rng, n_topics=None, noise=1.4):
+    """L2-normalized float32 rows scattered around random topic directions, like sentence embeddings of a catalog.
+
+    noise is the expected norm of the random offset from a (unit) topic direction.
+    """
+    n_topics = n_topics or max(8, n_rows // 500)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    topics /= np.linalg.norm(topics, axis=1, keepdims=True)
+    offsets = rng.standard_normal((n_rows, dim)).astype(np.float32) * (noise / np.sqrt(dim))
+    rows = topics[rng.integers(0, n_topics, size=n_rows)] + offsets
+    return (rows / np.linalg.norm(rows, axis=1, keepdims=True)).astype(np.float32)
+
+def run_ann_benchmark(sizes, dim=384, n_queries=100, top_n=10, n_probes=(1, 2, 4, 8, 16, 32), seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in sizes:
+        embeddings = make_synthetic_embeddings(size + n_queries, dim, rng)
+        embeddings, queries = embeddings[:size], embeddings[size:]
+        build_start = time.perf_counter()
+        index = IVFIndex.build(embeddings)
+        build_ms = (time.perf_counter() - build_start) * 1000
+        for row in evaluate_ann(index, embeddings, queries, top_n=top_n, n_probes=n_probes):
+            rows.append(dict(row, courses=size, n_lists=index.n_lists, build_ms=build_ms))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark brute_force vs inverted_index course retrieval.")
+    parser.add_argument('--sizes', default="10000,100000,1000000", help="Comma-separated catalog sizes")
+    parser.add_argument('--terms', type=int, default=50_000, help="Vocabulary size")
+    parser.add_argument('--terms-per-course', type=int, default=60)
+    parser.add_argument('--terms-per-query', type=int, default=40)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-n', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--payload-courses', type=int, default=100_000, help="Catalog size for the payload assembly benchmark (0 skips it)")
+    parser.add_argument('--ann-sizes', default="100000", help="Comma-separated catalog sizes for the ANN benchmark (empty skips it)")
+    parser.add_argument('--ann-dim', type=int, default=384, help="Embedding size (all-MiniLM-L6-v2: 384)")
+    parser.add_argument('--ann-top-n', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    rows = run_benchmark(sizes, n_terms=args.terms, terms_per_course=args.terms_per_course,
+                         terms_per_query=args.terms_per_query, n_queries=args.queries, top_n=args.top_n, seed=args.seed)
+    header = f"{'courses':>9} {'nnz':>11} {'build ms':>9} {'brute ms':>9} {'brute p95':>9} {'index ms':>9} {'index p95':>9} {'speedup':>8} {'agree':>6}"
+    print(header)
+    for r in rows:
+        print(f"{r['courses']:>9} {r['nnz']:>11} {r['index_build_ms']:>9.1f} {r['brute_mean_ms']:>9.2f} {r['brute_p95_ms']:>9.2f} "
+              f"{r['index_mean_ms']:>9.2f} {r['index_p95_ms']:>9.2f} {r['speedup']:>7.1f}x {r['topk_agreement']:>6.0%}")
+
+    if args.payload_courses > 0:
+        print(f"\nPayload assembly for top_n={args.top_n} ({args.payload_courses} courses)")
+        for r in run_payload_benchmark(args.payload_courses, top_n=args.top_n, seed=args.seed):
+            print(f"{r['variant']:>22} {r['us_per_response']:>9.1f} us/response")
+
+    ann_sizes = [int(size) for size in args.ann_sizes.split(',') if size.strip()]
+    if ann_sizes:
+        print(f"\nIVF ANN recall@{args.ann_top_n} vs exact dense search (dim {args.ann_dim})")
+        print(f"{'courses':>9} {'lists':>6} {'build ms':>9} {'n_probe':>8} {'recall':>7} {'mean ms':>8} {'p95 ms':>8}")
+        for r in run_ann_benchmark(ann_sizes, dim=args.ann_dim, top_n=args.ann_top_n, seed=args.seed):
+            print(f"{r['courses']:>9} {r['n_lists']:>6} {r['build_ms']:>9.0f} {r['n_probe'] or 'exact':>8} "
+                  f"{r['recall']:>7.1%} {r['mean_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# flask_server/course_recommender/embeddings.py
+# Dense course embeddings for the 'hybrid' engine (see engines.hybrid_rerank).
+#
+#   python -m flask_server.course_recommender.embeddings [--version NAME] [--n-lists N] [--eval-queries 200]
+#
+# Embeds every course of a model version with the SBERT model from pages/load_model.py and writes,
+# next to that version's files:
+#   course_embeddings/
+#     embeddings.json   manifest: model name, dim, n_courses, IVF parameters, build timings
+#     embeddings.npy    (n_courses, dim) float32, L2-normalized, in course index order
+#     ivf.*.npy         ANN index over the same vectors (see ann.py)
+# A version without course_embeddings/ still loads; the hybrid engine then falls back to sparse retrieval.
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from .ann import IVFIndex, evaluate_ann
+from .payloads import _metadata_columns
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_DIRNAME = "course_embeddings"
+EMBEDDINGS_MANIFEST_FILENAME = "embeddings.json"
+EMBEDDINGS_FORMAT = "course-embeddings"
+EMBEDDINGS_FORMAT_VERSION = 1
+ENCODE_BATCH_SIZE = 256
+
+def embeddings_dir_for(model_path):
+    return os.path.join(model_path, EMBEDDINGS_DIRNAME)
+
+def has_course_embeddings(model_path):
+    return os.path.isfile(os.path.join(embeddings_dir_for(model_path), EMBEDDINGS_MANIFEST_FILENAME))
+
+def course_texts(metadata):
+    """Text embedded for each course: title, skills and description."""
+    titles, _, skills, descriptions = _metadata_columns(metadata)
+    texts = []
+    for title, skill, description in zip(titles, skills, descriptions):
+        parts = [part for part in (title, skill, description) if isinstance(part, str) and part.strip()]
+        texts.append(". ".join(parts))
+    return texts
+
+def encode_texts(encoder, texts, batch_size=ENCODE_BATCH_SIZE):
+    """(len(texts), dim) float32 L2-normalized embeddings from a SentenceTransformer-like encoder."""
+    vectors = np.asarray(encoder.encode(list(texts), batch_size=batch_size, convert_to_numpy=True,
+                                        normalize_embeddings=True, show_progress_bar=False), dtype=np.float32)
+    vectors = np.atleast_2d(vectors)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def build_course_embeddings(model_path, metadata, encoder, model_name, n_lists=None, batch_size=ENCODE_BATCH_SIZE):
+    """Embeds the catalog, builds the IVF index and writes course_embeddings/ under model_path.
+
+    Like save_course_artifacts, the directory is written next to its final location and renamed into place.
+    """
+    output_dir = os.path.abspath(embeddings_dir_for(model_path))
+    tmp_dir = f"{output_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    start = time.perf_counter()
+    embeddings = encode_texts(encoder, course_texts(metadata), batch_size=batch_size)
+    encode_seconds = time.perf_counter() - start
+    logger.info(f"Embedded {len(embeddings)} courses in {encode_seconds:.1f}s.")
+    np.save(os.path.join(tmp_dir, 'embeddings.npy'), embeddings)
+
+    start = time.perf_counter()
+    index = IVFIndex.build(embeddings, n_lists=n_lists)
+    index.save(tmp_dir)
+    index_seconds = time.perf_counter() - start
+    logger.info(f"IVF index built in {index_seconds:.1f}s ({index.n_lists} lists).")
+
+    manifest = {
+        "format": EMBEDDINGS_FORMAT,
+        "format_version": EMBEDDINGS_FORMAT_VERSION,
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "model_name": model_name,
+        "dim": int(embeddings.shape[1]),
+        "n_courses": int(embeddings.shape[0]),
+        "ivf": {"n_lists": int(index.n_lists)},
+        "encode_seconds": round(encode_seconds, 3),
+        "index_seconds": round(index_seconds, 3),
+    }
+    with open(os.path.join(tmp_dir, EMBEDDINGS_MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.rename(tmp_dir, output_dir)
+    logger.info(f"Course embeddings written to {output_dir}.")
+    return manifest
+
+class CourseEmbeddings:
+    """Memory-mapped course embeddings and their ANN index, as loaded into a ModelBundle."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, EMBEDDINGS_MANIFEST_FILENAME), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != EMBEDDINGS_FORMAT or self.manifest.get("format_version") != EMBEDDINGS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported course embeddings format in {directory}: "
+                             f"{self.manifest.get('format')} v{self.manifest.get('format_version')}")
+        self.model_name = self.manifest["model_name"]
+        self.vectors = np.load(os.path.join(directory, 'embeddings.npy'), mmap_mode='r')
+        self.index = IVFIndex.load(directory)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+def load_course_embeddings(model_path, n_courses):
+    """CourseEmbeddings for a model version, or None if it has none (or they do not match the catalog)."""
+    if not has_course_embeddings(model_path):
+        return None
+    embeddings = CourseEmbeddings(embeddings_dir_for(model_path))
+    if embeddings.vectors.shape[0] != n_courses:
+        logger.warning(f"Ignoring course embeddings in {model_path}: {embeddings.vectors.shape[0]} rows for {n_courses} courses.")
+        return None
+    return embeddings
+
+def main(argv=None):
+    from ..pages.load_model import SBERT_MODEL_NAME, load_bert_model
+    from .model_store import load_bundle, resolve_model_source
+    from .service import MODEL_DIR_PATH
+
+    parser = argparse.ArgumentParser(description="Embed the course catalog and build its ANN index for the hybrid engine.")
+    parser.add_argument('--model-dir', default=MODEL_DIR_PATH, help="'ML prediction' directory")
+    parser.add_argument('--version', default=None, help="Model version to embed (default: the active one)")
+    parser.add_argument('--n-lists', type=int, default=None, help="IVF lists (default: sqrt(n_courses))")
+    parser.add_argument('--batch-size', type=int, default=ENCODE_BATCH_SIZE)
+    parser.add_argument('--eval-queries', type=int, default=200, help="Courses whose embeddings are used as queries to report recall; "
+                        "each query's own course is left out of both result lists (0 skips)")
+    parser.add_argument('--top-n', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    encoder, loaded = load_bert_model(logger)
+    if not loaded:
+        raise SystemExit("SBERT model could not be loaded; install sentence-transformers.")
+    source = resolve_model_source(args.model_dir, args.version)
+    bundle = load_bundle(source)
+    manifest = build_course_embeddings(source.path, bundle.metadata, encoder, SBERT_MODEL_NAME,
+                                       n_lists=args.n_lists, batch_size=args.batch_size)
+    print(json.dumps(manifest, indent=2))
+
+    if args.eval_queries > 0:
+        embeddings = CourseEmbeddings(embeddings_dir_for(source.path))
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(embeddings.vectors), size=min(args.eval_queries, len(embeddings.vectors)), replace=False)
+        print(f"\nANN recall@{args.top_n} vs exact search ({len(sample)} course embeddings as queries, themselves excluded)")
+        print(f"{'n_probe':>8} {'recall':>7} {'mean ms':>8} {'p95 ms':>8}")
+        for row in evaluate_ann(embeddings.index, embeddings.vectors, embeddings.vectors[sample], top_n=args.top_n,
+                                exclude_ids=sample):
+            print(f"{row['n_probe'] or 'exact':>8} {row['recall']:>7.1%} {row['mean_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+
+if __name__ == '__main__':
+    main()
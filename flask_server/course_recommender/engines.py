@@ -0,0 +1,196 @@
+# flask_server/course_recommender/engines.py
+# Retrieval engines for the course recommender. Both take L2-normalized query rows and an
+# L2-normalized course matrix, and return per-query (course_indices, scores) sorted by descending score.
+#   brute_force     one sparse dot product against the whole catalog
+#   inverted_index  term -> postings lists with MaxScore pruning (only courses sharing terms are scored)
+#   hybrid          sparse candidates plus dense (SBERT embedding, ANN) candidates, re-ranked together;
+#                   see hybrid_rerank. The service falls back to brute_force when a version has no embeddings.
+import threading
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = 0.01
+ENGINE_BRUTE_FORCE = "brute_force"
+ENGINE_INVERTED_INDEX = "inverted_index"
+ENGINE_HYBRID = "hybrid"
+ENGINES = (ENGINE_BRUTE_FORCE, ENGINE_INVERTED_INDEX, ENGINE_HYBRID)
+
+HYBRID_DENSE_WEIGHT = 0.5
+HYBRID_CANDIDATES = 50 # Per retriever and query, before merging
+
+# Slack for float summation order when comparing partial scores against the pruning threshold
+_SCORE_EPSILON = 1e-9
+# InvertedIndex scans its whole accumulator once a query has visited more than n_courses / _DENSE_PASS_RATIO postings
+_DENSE_PASS_RATIO = 8
+
+def select_top_k(indices, scores, top_n, threshold=SIMILARITY_THRESHOLD):
+    """Thresholds, then partially selects the top_n scores; returns (indices, scores) sorted by descending score."""
+    keep = scores > threshold
+    indices, scores = indices[keep], scores[keep]
+    if len(scores) > top_n:
+        part = np.argpartition(-scores, top_n - 1)[:top_n]
+        indices, scores = indices[part], scores[part]
+    order = np.argsort(-scores, kind='stable')
+    return indices[order], scores[order]
+
+def brute_force_top_k(course_matrix, query_matrix, top_n, threshold=SIMILARITY_THRESHOLD):
+    # (n_queries x n_courses) CSR; only courses sharing a term with the query are stored
+    sim_matrix = course_matrix.dot(query_matrix.T).T.tocsr()
+    results = []
+    for row in range(sim_matrix.shape[0]):
+        start, end = sim_matrix.indptr[row], sim_matrix.indptr[row + 1]
+        results.append(select_top_k(sim_matrix.indices[start:end], sim_matrix.data[start:end], top_n, threshold))
+    return results
+
+class InvertedIndex:
+    """Term-at-a-time retrieval over postings lists with MaxScore-style pruning.
+
+    Query terms are visited in decreasing order of their score upper bound (query weight x the
+    term's max posting weight). While the bounds of the unvisited terms could still lift an unseen
+    course above the current k-th best score, a term's postings are added in full to a score
+    accumulator. Once they cannot, only the surviving candidates are probed in the remaining
+    postings (binary search), and candidates that can no longer reach the k-th score are dropped.
+    Results match brute_force_top_k up to ties and float summation order.
+
+    postings is the CSC form of course_matrix (e.g. artifacts.load_postings, memory-mapped); without it the
+    matrix is converted here, which costs a private copy per process. Scores are accumulated in one reused
+    buffer per thread, and only the entries a query touched are read and reset, so a query costs
+    O(postings visited) rather than O(catalog).
+    """
+
+    def __init__(self, course_matrix, postings=None):
+        if postings is None:
+            postings = course_matrix.tocsc()
+        if not postings.has_sorted_indices:
+            postings.sort_indices()
+        self.n_courses, self.n_terms = postings.shape
+        # Plain ndarray views: slicing an np.memmap subclass is slower
+        self._indptr = np.asarray(postings.indptr)
+        self._course_ids = np.asarray(postings.indices)
+        self._weights = np.asarray(postings.data)
+        self.max_weights = np.zeros(self.n_terms, dtype=np.float64)
+        non_empty = np.flatnonzero(np.diff(self._indptr) > 0)
+        if len(non_empty):
+            self.max_weights[non_empty] = np.maximum.reduceat(self._weights, self._indptr[non_empty])
+        self._local = threading.local()
+
+    @property
+    def nnz(self):
+        return len(self._course_ids)
+
+    def _postings(self, term):
+        start, end = self._indptr[term], self._indptr[term + 1]
+        return self._course_ids[start:end], self._weights[start:end]
+
+    @staticmethod
+    def _kth_score(scores, top_n, threshold):
+        if len(scores) < top_n:
+            return threshold
+        return max(threshold, float(np.partition(scores, len(scores) - top_n)[len(scores) - top_n]))
+
+    def _accumulator(self):
+        accumulator = getattr(self._local, 'accumulator', None)
+        if accumulator is None:
+            accumulator = self._local.accumulator = np.zeros(self.n_courses, dtype=np.float64)
+        return accumulator
+
+    def _touched_most(self, touched):
+        # Past this many postings a dense pass over the accumulator is cheaper than gathering and sorting them
+        return sum(len(ids) for ids in touched) * _DENSE_PASS_RATIO > self.n_courses
+
+    def search(self, query_terms, query_weights, top_n, threshold=SIMILARITY_THRESHOLD):
+        accumulator = self._accumulator()
+        touched = [] # Course id arrays written to the accumulator; reset to zero before returning
+        try:
+            return self._search(accumulator, touched, query_terms, query_weights, top_n, threshold)
+        finally:
+            if self._touched_most(touched):
+                accumulator.fill(0.0)
+            else:
+                for ids in touched:
+                    accumulator[ids] = 0.0
+
+    def _search(self, accumulator, touched, query_terms, query_weights, top_n, threshold):
+        upper_bounds = query_weights * self.max_weights[query_terms]
+        useful = upper_bounds > 0
+        query_terms, query_weights, upper_bounds = query_terms[useful], query_weights[useful], upper_bounds[useful]
+        order = np.argsort(-upper_bounds, kind='stable')
+        query_terms, query_weights = query_terms[order], query_weights[order]
+        # remaining[j] = best score a course can still collect from terms j..end
+        remaining = np.append(np.cumsum(upper_bounds[order][::-1])[::-1], 0.0)
+
+        # Phase 1: accumulate full postings while an unseen course could still make the top-k
+        best_seen = 0.0
+        theta = threshold
+        j = 0
+        while j < len(query_terms):
+            ids, weights = self._postings(query_terms[j])
+            accumulator[ids] += query_weights[j] * weights
+            touched.append(ids)
+            term_scores = accumulator[ids]
+            best_seen = max(best_seen, float(term_scores.max()))
+            j += 1
+            # theta <= best_seen, so it is only worth tightening once the tail bound drops below best_seen.
+            # The k-th score among this term's courses is a lower bound on the true k-th score, which
+            # keeps pruning exact without scanning the whole accumulator.
+            if remaining[j] <= best_seen:
+                theta = max(theta, self._kth_score(term_scores, top_n, threshold))
+                if remaining[j] <= theta - _SCORE_EPSILON:
+                    break
+        if self._touched_most(touched):
+            cand_ids = np.flatnonzero(accumulator + remaining[j] >= theta - _SCORE_EPSILON)
+        else:
+            # Only courses in the visited postings have a score (any other is capped at remaining[j] < theta).
+            # They are filtered against theta before de-duplicating, so the sort only sees likely candidates.
+            seen_ids = np.concatenate(touched) if touched else np.empty(0, dtype=np.int64)
+            cand_ids = np.unique(seen_ids[accumulator[seen_ids] + remaining[j] >= theta - _SCORE_EPSILON])
+        if j == len(query_terms):
+            return select_top_k(cand_ids, accumulator[cand_ids], top_n, threshold)
+
+        # Phase 2: the remaining (low-impact) terms only need scores for candidates that can still reach theta
+        while j < len(query_terms) and len(cand_ids):
+            ids, weights = self._postings(query_terms[j])
+            if len(cand_ids) * np.log2(len(ids) + 1) < len(ids):
+                # Few candidates: binary-search them in the postings instead of walking the list
+                pos = np.searchsorted(ids, cand_ids)
+                pos[pos == len(ids)] = 0
+                hit = ids[pos] == cand_ids
+                accumulator[cand_ids[hit]] += query_weights[j] * weights[pos[hit]]
+            else:
+                accumulator[ids] += query_weights[j] * weights
+                touched.append(ids)
+            j += 1
+            cand_scores = accumulator[cand_ids]
+            theta = max(theta, self._kth_score(cand_scores, top_n, threshold))
+            alive = cand_scores + remaining[j] >= theta - _SCORE_EPSILON
+            if not alive.all():
+                cand_ids = cand_ids[alive]
+        return select_top_k(cand_ids, accumulator[cand_ids], top_n, threshold)
+
+    def top_k(self, query_matrix, top_n, threshold=SIMILARITY_THRESHOLD):
+        query_matrix = query_matrix.tocsr()
+        results = []
+        for row in range(query_matrix.shape[0]):
+            start, end = query_matrix.indptr[row], query_matrix.indptr[row + 1]
+            results.append(self.search(query_matrix.indices[start:end], query_matrix.data[start:end], top_n, threshold))
+        return results
+
+def hybrid_rerank(course_matrix, course_vectors, query_matrix, query_vectors, sparse_results, dense_results,
+                  top_n, dense_weight=HYBRID_DENSE_WEIGHT, threshold=SIMILARITY_THRESHOLD):
+    """Merges each query's sparse and dense candidate sets and re-ranks the union.
+
+    Both similarities are recomputed exactly for every candidate, so a course found by only one retriever
+    is still scored on both: score = dense_weight * embedding cosine + (1 - dense_weight) * TF-IDF cosine.
+    """
+    query_matrix = query_matrix.tocsr()
+    results = []
+    for row, ((sparse_ids, _), (dense_ids, _)) in enumerate(zip(sparse_results, dense_results)):
+        cand_ids = np.union1d(sparse_ids, dense_ids).astype(np.int64)
+        if not len(cand_ids):
+            results.append((cand_ids, np.empty(0, dtype=np.float64)))
+            continue
+        sparse_scores = np.asarray(course_matrix[cand_ids].dot(query_matrix[row].T).todense(), dtype=np.float64).ravel()
+        dense_scores = np.asarray(course_vectors[cand_ids] @ query_vectors[row], dtype=np.float64)
+        scores = dense_weight * dense_scores + (1.0 - dense_weight) * sparse_scores
+        results.append(select_top_k(cand_ids, scores, top_n, threshold))
+    return results
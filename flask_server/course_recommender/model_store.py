@@ -0,0 +1,158 @@
+# flask_server/course_recommender/model_store.py
+# Versioned course model directories and the immutable bundle a request scores against.
+#
+#   ML prediction/
+#     versions/
+#       CURRENT                 optional; name of the version to serve (otherwise the last name in sort order)
+#       2025-06-01/             an artifact set (manifest.json, see artifacts.py) or the three .joblib files
+#       2025-07-15/
+#     course_artifacts/ , *.joblib   legacy single-model layout, used when versions/ is absent or empty
+# Either kind of model directory may also hold course_embeddings/ (see embeddings.py) for the hybrid engine.
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from .artifacts import MANIFEST_FILENAME, is_artifact_dir, load_course_artifacts, load_payload_table, load_postings
+from .embeddings import EMBEDDINGS_MANIFEST_FILENAME, embeddings_dir_for, has_course_embeddings, load_course_embeddings
+from .engines import InvertedIndex
+from .payloads import build_payload_table
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIRNAME = 'versions'
+CURRENT_VERSION_FILENAME = 'CURRENT'
+ARTIFACTS_DIRNAME = 'course_artifacts'
+LEGACY_VERSION = 'default'
+JOBLIB_FILENAMES = ('tfidf_vectorizer.joblib', 'course_tfidf_matrix.joblib', 'course_metadata.joblib')
+
+_VERSION_NAME_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$')
+
+class ModelSource:
+    """Where a model version lives on disk and which files identify it."""
+
+    def __init__(self, version, path, kind):
+        self.version = version
+        self.path = path
+        self.kind = kind # 'artifacts' or 'joblib'
+
+    @property
+    def files(self):
+        if self.kind == 'artifacts':
+            files = [os.path.join(self.path, MANIFEST_FILENAME)]
+        else:
+            files = [os.path.join(self.path, name) for name in JOBLIB_FILENAMES]
+        if has_course_embeddings(self.path):
+            files.append(os.path.join(embeddings_dir_for(self.path), EMBEDDINGS_MANIFEST_FILENAME))
+        return files
+
+    def fingerprint(self):
+        digest = hashlib.sha256(self.version.encode('utf-8'))
+        for path in self.files:
+            stat = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+def is_valid_version_name(version):
+    return bool(version) and bool(_VERSION_NAME_RE.match(version))
+
+def list_versions(model_dir):
+    versions_dir = os.path.join(model_dir, VERSIONS_DIRNAME)
+    if not os.path.isdir(versions_dir):
+        return []
+    return sorted(name for name in os.listdir(versions_dir)
+                  if is_valid_version_name(name) and os.path.isdir(os.path.join(versions_dir, name)))
+
+def _source_in(version, path):
+    if is_artifact_dir(path):
+        return ModelSource(version, path, 'artifacts')
+    if is_artifact_dir(os.path.join(path, ARTIFACTS_DIRNAME)):
+        return ModelSource(version, os.path.join(path, ARTIFACTS_DIRNAME), 'artifacts')
+    if all(os.path.exists(os.path.join(path, name)) for name in JOBLIB_FILENAMES):
+        return ModelSource(version, path, 'joblib')
+    raise FileNotFoundError(f"No course model artifacts or joblib files found in {path}")
+
+def resolve_model_source(model_dir, version=None):
+    """Returns the ModelSource for `version`, or for the active version when version is None."""
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(f"TF-IDF Model directory not found: {model_dir}")
+    versions_dir = os.path.join(model_dir, VERSIONS_DIRNAME)
+    if version is not None:
+        if not is_valid_version_name(version) or not os.path.isdir(os.path.join(versions_dir, version)):
+            raise FileNotFoundError(f"Course model version '{version}' not found in {versions_dir}")
+        return _source_in(version, os.path.join(versions_dir, version))
+
+    available = list_versions(model_dir)
+    if not available:
+        return _source_in(LEGACY_VERSION, model_dir)
+    current_file = os.path.join(versions_dir, CURRENT_VERSION_FILENAME)
+    if os.path.isfile(current_file):
+        with open(current_file, encoding='utf-8') as f:
+            current = f.read().strip()
+        if current in available:
+            return _source_in(current, os.path.join(versions_dir, current))
+        logger.warning(f"{current_file} names unknown version '{current}'; falling back to latest ({available[-1]}).")
+    return _source_in(available[-1], os.path.join(versions_dir, available[-1]))
+
+class ModelBundle:
+    """Everything one model version needs to answer a request. Never mutated after load, except
+    for the lazily built inverted index, so it can be swapped in while requests still use the old one."""
+
+    def __init__(self, source, vectorizer, course_matrix, metadata, payloads, embeddings=None, postings=None):
+        self.version = source.version
+        self.source_path = source.path
+        self.fingerprint = source.fingerprint()
+        self.vectorizer = vectorizer
+        self.course_matrix = course_matrix
+        self.metadata = metadata
+        self.payloads = payloads # payloads[idx] -> recommendation dict without 'relevance'
+        self.embeddings = embeddings # embeddings.CourseEmbeddings or None
+        self.postings = postings # Memory-mapped CSC copy of course_matrix for the inverted index, or None
+        self.loaded_at = time.time()
+        self._inverted_index = None
+        self._inverted_index_lock = threading.Lock()
+
+    @property
+    def n_courses(self):
+        return self.course_matrix.shape[0]
+
+    def get_inverted_index(self):
+        if self._inverted_index is None:
+            with self._inverted_index_lock:
+                if self._inverted_index is None:
+                    logger.info(f"Building inverted index for course model version '{self.version}'...")
+                    index = InvertedIndex(self.course_matrix, postings=self.postings)
+                    logger.info(f"Inverted index built: {index.n_terms} terms, {index.nnz} postings.")
+                    self._inverted_index = index
+        return self._inverted_index
+
+def load_bundle(source):
+    import joblib
+    from sklearn.preprocessing import normalize
+
+    payloads = None
+    postings = None
+    if source.kind == 'artifacts':
+        vectorizer, course_matrix, metadata, manifest = load_course_artifacts(source.path)
+        payloads = load_payload_table(source.path)
+        postings = load_postings(source.path)
+        logger.info(f"Course model '{source.version}' memory-mapped from {source.path} ({manifest['n_courses']} courses).")
+    else:
+        vectorizer = joblib.load(os.path.join(source.path, JOBLIB_FILENAMES[0]))
+        # Rows are L2-normalized once here so that cosine similarity is a plain sparse dot product per request
+        course_matrix = normalize(joblib.load(os.path.join(source.path, JOBLIB_FILENAMES[1])), norm='l2', copy=False).tocsr()
+        metadata = joblib.load(os.path.join(source.path, JOBLIB_FILENAMES[2]))
+        logger.info(f"Course model '{source.version}' loaded from joblib files in {source.path} ({course_matrix.shape[0]} courses).")
+    if payloads is None:
+        payloads = build_payload_table(metadata)
+    try:
+        embeddings = load_course_embeddings(source.path, course_matrix.shape[0])
+    except Exception as e:
+        # Sparse retrieval still works; the hybrid engine falls back to it
+        logger.warning(f"Could not load course embeddings for version '{source.version}': {e}")
+        embeddings = None
+    if embeddings is not None:
+        logger.info(f"Course embeddings loaded ({embeddings.model_name}, dim {embeddings.dim}, {embeddings.index.n_lists} IVF lists).")
+    return ModelBundle(source, vectorizer, course_matrix, metadata, payloads, embeddings, postings)
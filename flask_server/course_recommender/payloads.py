@@ -0,0 +1,55 @@
+# flask_server/course_recommender/payloads.py
+# Course recommendation payloads rendered once per model load, so a response is a gather by course index
+# instead of per-hit pandas row access and string formatting.
+import json
+import math
+
+SNIPPET_LENGTH = 150
+
+def _clean_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+def render_payload(idx, title, url, skills, description):
+    """Everything in a recommendation except the query-dependent 'relevance'."""
+    description = _clean_value(description)
+    return {
+        "id": f"tf_course_{idx}", "name": _clean_value(title), "url": _clean_value(url),
+        "platform": "Coursera",
+        "description_snippet": (description[:SNIPPET_LENGTH] + "...") if description else "",
+        "skills_taught": _clean_value(skills)
+    }
+
+def _metadata_columns(metadata):
+    """Returns (titles, urls, skills, descriptions) as sequences for a DataFrame or MappedCourseMetadata."""
+    names = ('course_title', 'Course URL', 'course_skills', 'course_description')
+    missing = [None] * len(metadata)
+    if hasattr(metadata, 'iloc'): # pandas DataFrame
+        return [metadata[name].tolist() if name in metadata.columns else missing for name in names]
+    return [metadata.columns.get(name, missing) for name in names]
+
+def build_payload_table(metadata, start=0):
+    """Tuple of payload dicts, one per course. `start` is the course index of the first row (for row blocks)."""
+    titles, urls, skills, descriptions = _metadata_columns(metadata)
+    return tuple(render_payload(start + i, titles[i], urls[i], skills[i], descriptions[i]) for i in range(len(metadata)))
+
+def iter_payload_fragments(metadata, start=0):
+    """Pre-serialized JSON payloads, one per course, for storing alongside the artifact set."""
+    for payload in build_payload_table(metadata, start):
+        yield json.dumps(payload, separators=(',', ':'))
+
+class MappedPayloadTable:
+    """Payloads stored as JSON fragments in a memory-mapped column (see artifacts.py)."""
+
+    def __init__(self, column):
+        self._column = column
+
+    def __len__(self):
+        return len(self._column)
+
+    def __getitem__(self, idx):
+        return json.loads(self._column[idx])
+
+def gather_recommendations(payloads, indices, scores):
+    return [dict(payloads[int(idx)], relevance=f"{float(score):.2%}") for idx, score in zip(indices, scores)]
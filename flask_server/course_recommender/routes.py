@@ -1,9 +1,36 @@
 # flask_server/course_recommender/routes.py
+import hmac
 from flask import Blueprint, request, jsonify, current_app
-from .service import get_model_status, get_predictions # Relative import
+from .service import get_model_status, get_predictions, get_batch_predictions, get_cache_stats, reload_model_async # Relative import
+from .model_store import is_valid_version_name
 
 course_bp = Blueprint('course_recommender', __name__, url_prefix='/api')
 
+MAX_BATCH_JOBS = 50 # One job-board results page
+DEFAULT_TOP_N = 3
+MAX_TOP_N = 20
+
+def _parse_top_n(data):
+    """Returns (top_n, error_message). Values above MAX_TOP_N are clamped."""
+    top_n = data.get('top_n', DEFAULT_TOP_N)
+    if isinstance(top_n, bool) or not isinstance(top_n, (int, str)):
+        return None, "'top_n' must be a positive integer"
+    try:
+        top_n = int(top_n)
+    except ValueError:
+        return None, "'top_n' must be a positive integer"
+    if top_n < 1:
+        return None, "'top_n' must be a positive integer"
+    return min(top_n, MAX_TOP_N), None
+
+def _header_bytes(value):
+    """The raw bytes of a header value (WSGI hands them over decoded as latin-1), for hmac.compare_digest,
+    which raises TypeError on str arguments with non-ASCII characters."""
+    try:
+        return value.encode('latin-1')
+    except UnicodeEncodeError:
+        return value.encode('utf-8')
+
 @course_bp.route('/course_predict', methods=['POST'])
 def predict_courses_route_handler(): # Renamed to avoid clashes if you combine files later
     model_status = get_model_status()
@@ -17,17 +44,81 @@ def predict_courses_route_handler(): # Renamed to avoid clashes if you combine f
     job_description = data.get('job_description', '')
     if not job_title and not job_description:
         return jsonify({"error": "Job title or description required"}), 400
+    top_n, top_n_error = _parse_top_n(data)
+    if top_n_error: return jsonify({"error": top_n_error}), 400
 
-    current_app.logger.info(f"Course prediction request for: '{job_title}'")
-    recommendations, message = get_predictions(job_title, job_description)
+    current_app.logger.info(f"Course prediction request for: '{job_title}' (top_n={top_n})")
+    recommendations, message, model_version = get_predictions(job_title, job_description, top_n=top_n, engine=current_app.config.get('COURSE_RECOMMENDER_ENGINE'))
 
     if not recommendations and "error" in message.lower():
         current_app.logger.error(f"Error from course recommender service: {message}")
-        return jsonify({"error": message, "courses": []}), 500
+        return jsonify({"error": message, "courses": [], "model_version": model_version}), 500
     
-    return jsonify({"courses": recommendations, "message": message}), 200
+    return jsonify({"courses": recommendations, "message": message, "model_version": model_version}), 200
+
+@course_bp.route('/course_predict_batch', methods=['POST'])
+def predict_courses_batch_route_handler():
+    model_status = get_model_status()
+    if model_status["status"] == "DOWN":
+        current_app.logger.error(f"Batch course prediction endpoint: TF-IDF Model service is down. Reason: {model_status['message']}")
+        return jsonify({"error": model_status["message"]}), 503
+
+    data = request.get_json()
+    if not data: return jsonify({"error": "No input data"}), 400
+    jobs = data.get('jobs')
+    if not isinstance(jobs, list) or not jobs:
+        return jsonify({"error": "'jobs' must be a non-empty list"}), 400
+    if len(jobs) > MAX_BATCH_JOBS:
+        return jsonify({"error": f"At most {MAX_BATCH_JOBS} jobs per batch"}), 400
+    for index, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            return jsonify({"error": f"jobs[{index}] must be an object with job_title and/or job_description"}), 400
+        for field in ('job_title', 'job_description'):
+            if job.get(field) is not None and not isinstance(job[field], str):
+                return jsonify({"error": f"jobs[{index}].{field} must be a string"}), 400
+    top_n, top_n_error = _parse_top_n(data)
+    if top_n_error: return jsonify({"error": top_n_error}), 400
+
+    current_app.logger.info(f"Batch course prediction request for {len(jobs)} jobs (top_n={top_n})")
+    pairs = [(job.get('job_title') or '', job.get('job_description') or '') for job in jobs]
+    results, message, model_version = get_batch_predictions(pairs, top_n=top_n, engine=current_app.config.get('COURSE_RECOMMENDER_ENGINE'))
+
+    if not results and "error" in message.lower():
+        current_app.logger.error(f"Error from course recommender service: {message}")
+        return jsonify({"error": message, "results": [], "model_version": model_version}), 500
+
+    return jsonify({
+        "results": [{"job_id": job.get('id'), **result} for job, result in zip(jobs, results)],
+        "message": message,
+        "model_version": model_version
+    }), 200
 
 @course_bp.route('/health_recommender', methods=['GET'])
 def health_check_recommender():
     status_info = get_model_status()
-    return jsonify(status_info), 200 if status_info["status"] == "UP" else 503
\ No newline at end of file
+    status_info["cache"] = get_cache_stats()
+    return jsonify(status_info), 200 if status_info["status"] == "UP" else 503
+
+@course_bp.route('/admin/reload_recommender', methods=['POST'])
+def reload_recommender_route_handler():
+    """Starts a background reload of the course model. Only reloads the worker that receives the request;
+    to roll out to every worker, update 'ML prediction/versions/CURRENT' and let the file watcher pick it up."""
+    admin_token = current_app.config.get('RECOMMENDER_ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({"error": "Model reload endpoint is disabled (RECOMMENDER_ADMIN_TOKEN not set)."}), 403
+    if not hmac.compare_digest(_header_bytes(request.headers.get('X-Admin-Token', '')), admin_token.encode('utf-8')):
+        return jsonify({"error": "Invalid admin token"}), 403
+
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {} # No body: reload the active version
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    version = data.get('version')
+    if version is not None and (not isinstance(version, str) or not is_valid_version_name(version)):
+        return jsonify({"error": "Invalid version name"}), 400
+    if not reload_model_async(version):
+        return jsonify({"error": "A model reload is already in progress"}), 409
+
+    current_app.logger.info(f"Course model reload requested (version: {version or 'active'})")
+    return jsonify({"message": "Model reload started", "target_version": version or "active"}), 202
\ No newline at end of file
@@ -1,11 +1,19 @@
 # flask_server/course_recommender/service.py
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer # Ensure this is imported for joblib
-from sklearn.metrics.pairwise import cosine_similarity
-import pandas as pd # Ensure this is imported for joblib
+# sklearn, scipy and joblib are imported where they are used (model load, first query) rather than here:
+# importing them accounts for most of the app's startup time. See flask_server/warmup.py.
 import os
 import re
 import logging
+import multiprocessing
+import threading
+import time
+from .embeddings import encode_texts
+from .engines import (ENGINES, ENGINE_BRUTE_FORCE, ENGINE_INVERTED_INDEX, ENGINE_HYBRID, HYBRID_CANDIDATES,
+                      HYBRID_DENSE_WEIGHT, brute_force_top_k, hybrid_rerank)
+from .ann import DEFAULT_N_PROBE
+from .model_store import load_bundle, resolve_model_source
+from .payloads import gather_recommendations
+from ..pages.result_cache import ResultCache, create_cache_backend, make_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +26,21 @@ MODEL_DIR_PATH = os.path.join(PROJECT_ROOT_DIR, 'ML prediction') # Corrected fol
 VECTORIZER_PATH = os.path.join(MODEL_DIR_PATH, 'tfidf_vectorizer.joblib')
 COURSE_MATRIX_PATH = os.path.join(MODEL_DIR_PATH, 'course_tfidf_matrix.joblib')
 COURSE_METADATA_PATH = os.path.join(MODEL_DIR_PATH, 'course_metadata.joblib')
+# Memory-mapped artifact set (see artifacts.py); preferred over the joblib files when present
+COURSE_ARTIFACTS_DIR = os.path.join(MODEL_DIR_PATH, 'course_artifacts')
 
-_tfidf_vectorizer = None
-_course_tfidf_matrix = None
-_course_metadata_df = None
-_model_loaded_successfully = False
+# The active model version (a model_store.ModelBundle). Requests read this reference once and use that
+# bundle throughout, so a reload can swap in a new version without disturbing requests in flight.
+_active_bundle = None
+_pinned_version = None # Set when an admin reload names a version; the file watcher then leaves it alone
+_reload_lock = threading.Lock()
+_reload_state = {"in_progress": False, "target_version": None, "last_error": None, "last_reload_at": None}
+_watcher_thread = None
+_result_cache = None # Configured by init_app()
+# Query encoder for the hybrid engine: the SBERT model, set by the startup warm-up once it has loaded
+_query_encoder = None
+_query_encoder_model_name = None
+_hybrid_settings = {"dense_weight": HYBRID_DENSE_WEIGHT, "candidates": HYBRID_CANDIDATES, "n_probe": DEFAULT_N_PROBE}
 
 def _clean_text(text):
     if not isinstance(text, str): return ""
@@ -30,60 +48,251 @@ def _clean_text(text):
     text = re.sub(r'[^\w\s]', '', text)
     return re.sub(r'\s+', ' ', text).strip()
 
-def load_model_components():
-    global _tfidf_vectorizer, _course_tfidf_matrix, _course_metadata_df, _model_loaded_successfully
-    logger.info(f"Attempting to load TF-IDF model components from: {MODEL_DIR_PATH}")
+def _activate_bundle(bundle):
+    global _active_bundle
+    _active_bundle = bundle # Single reference assignment: atomic for readers
+    if _result_cache is not None:
+        _result_cache.set_version(bundle.fingerprint)
+    logger.info(f"Course model version '{bundle.version}' is now active ({bundle.n_courses} courses, fingerprint {bundle.fingerprint}).")
+
+def load_model_components(version=None):
+    """Loads a model version (the CURRENT/latest one by default) and makes it active. Returns True on success."""
+    logger.info(f"Attempting to load TF-IDF model components from: {MODEL_DIR_PATH} (version: {version or 'active'})")
     try:
-        if not os.path.isdir(MODEL_DIR_PATH):
-            logger.error(f"TF-IDF Model directory not found: {MODEL_DIR_PATH}")
-            _model_loaded_successfully = False
-            return
-        if not all(os.path.exists(p) for p in [VECTORIZER_PATH, COURSE_MATRIX_PATH, COURSE_METADATA_PATH]):
-            logger.error(f"One or more TF-IDF model files missing from {MODEL_DIR_PATH}.")
-            _model_loaded_successfully = False
-            return
-
-        _tfidf_vectorizer = joblib.load(VECTORIZER_PATH)
-        _course_tfidf_matrix = joblib.load(COURSE_MATRIX_PATH)
-        _course_metadata_df = joblib.load(COURSE_METADATA_PATH)
-        _model_loaded_successfully = True
-        logger.info("TF-IDF Course recommender model components loaded successfully.")
+        bundle = load_bundle(resolve_model_source(MODEL_DIR_PATH, version))
     except Exception as e:
         logger.error(f"Error loading TF-IDF model components: {e}", exc_info=True)
-        _model_loaded_successfully = False
+        _reload_state["last_error"] = str(e)
+        return False
+    _activate_bundle(bundle)
+    _reload_state["last_error"] = None
+    _reload_state["last_reload_at"] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    return True
+
+def warm_up():
+    """Loads the active model version and the query-time imports. Called from the startup warm-up thread."""
+    from sklearn.preprocessing import normalize # noqa: F401 -- first query otherwise pays for this import
+    with _reload_lock:
+        _reload_state["in_progress"] = True
+        _reload_state["target_version"] = "active"
+        try:
+            return load_model_components()
+        finally:
+            _reload_state["in_progress"] = False
+            _reload_state["target_version"] = None
+
+def _reload_worker(version, previous_pinned_version):
+    global _pinned_version
+    try:
+        if not load_model_components(version):
+            _pinned_version = previous_pinned_version # Keep following whatever was active before the failed reload
+    finally:
+        _reload_state["in_progress"] = False
+        _reload_state["target_version"] = None
+        _reload_lock.release()
+
+def reload_model_async(version=None):
+    """Builds the model off the request path and swaps it in when ready.
+
+    Returns False if a reload is already running. Passing a version pins it (see _pinned_version);
+    passing None unpins and follows versions/CURRENT again.
+    """
+    global _pinned_version
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    previous_pinned_version, _pinned_version = _pinned_version, version
+    _reload_state["in_progress"] = True
+    _reload_state["target_version"] = version or "active"
+    threading.Thread(target=_reload_worker, args=(version, previous_pinned_version), name="course-model-reload", daemon=True).start()
+    return True
+
+def _watch_model_dir(interval_seconds):
+    while True:
+        time.sleep(interval_seconds)
+        if _pinned_version is not None:
+            continue
+        try:
+            source = resolve_model_source(MODEL_DIR_PATH)
+            bundle = _active_bundle
+            if bundle is None or source.fingerprint() != bundle.fingerprint:
+                logger.info(f"Course model change detected on disk (version '{source.version}'); reloading in background.")
+                reload_model_async()
+        except FileNotFoundError as e:
+            logger.debug(f"Course model watcher: {e}")
+        except Exception as e:
+            logger.warning(f"Course model watcher could not check {MODEL_DIR_PATH}: {e}")
+
+def start_model_watcher(interval_seconds):
+    global _watcher_thread
+    if _watcher_thread is not None or not interval_seconds or interval_seconds <= 0:
+        return
+    if multiprocessing.current_process().name != 'MainProcess': # A pool process re-importing the entry module
+        return
+    _watcher_thread = threading.Thread(target=_watch_model_dir, args=(interval_seconds,), name="course-model-watcher", daemon=True)
+    _watcher_thread.start()
+    logger.info(f"Watching {MODEL_DIR_PATH} for course model changes every {interval_seconds}s.")
+
+def init_app(app):
+    """Configures the recommendation result cache and the model file watcher from app.config."""
+    global _result_cache
+    start_model_watcher(app.config.get('COURSE_MODEL_WATCH_INTERVAL_SECONDS', 0))
+    _hybrid_settings["dense_weight"] = app.config.get('COURSE_HYBRID_DENSE_WEIGHT', HYBRID_DENSE_WEIGHT)
+    _hybrid_settings["candidates"] = app.config.get('COURSE_HYBRID_CANDIDATES', HYBRID_CANDIDATES)
+    _hybrid_settings["n_probe"] = app.config.get('COURSE_ANN_N_PROBE', DEFAULT_N_PROBE)
+    backend_name = app.config.get('COURSE_CACHE_BACKEND', 'memory')
+    if not backend_name or backend_name == 'none':
+        _result_cache = None
+        app.logger.info("Course recommendation cache disabled.")
+        return
+    try:
+        backend = create_cache_backend(
+            backend_name, namespace='course_recommendations',
+            max_entries=app.config.get('COURSE_CACHE_MAX_ENTRIES', 2048),
+            sqlite_path=app.config.get('LOCAL_CACHE_DB_PATH')
+        )
+    except Exception as e:
+        app.logger.error(f"Could not create course recommendation cache ({backend_name}): {e}. Caching disabled.", exc_info=True)
+        _result_cache = None
+        return
+    _result_cache = ResultCache(backend, ttl_seconds=app.config.get('COURSE_CACHE_TTL_SECONDS', 3600))
+    _result_cache.set_version(_active_bundle.fingerprint if _active_bundle else None)
+    app.logger.info(f"Course recommendation cache enabled: backend={backend_name}, max_entries={backend.max_entries}, ttl={_result_cache.ttl_seconds}s")
+
+def set_query_encoder(encoder, model_name):
+    """Registers the sentence encoder for hybrid queries. Course embeddings built with another model are not used."""
+    global _query_encoder, _query_encoder_model_name
+    _query_encoder, _query_encoder_model_name = encoder, model_name
+    logger.info(f"Hybrid course retrieval query encoder set: {model_name}")
+
+def _hybrid_available(bundle):
+    embeddings = bundle.embeddings
+    return (embeddings is not None and _query_encoder is not None
+            and embeddings.model_name == _query_encoder_model_name)
+
+def get_cache_stats():
+    if _result_cache is None:
+        return {"backend": "disabled"}
+    return _result_cache.stats()
+
+def _cache_key(bundle, query_text, top_n, engine):
+    return make_cache_key(bundle.fingerprint, engine, top_n, query_text)
+
+def _cache_get(bundle, query_text, top_n, engine):
+    if _result_cache is None:
+        return None
+    try:
+        return _result_cache.get(_cache_key(bundle, query_text, top_n, engine))
+    except Exception as e:
+        logger.warning(f"Course recommendation cache read failed: {e}")
+        return None
+
+def _cache_set(bundle, query_text, top_n, engine, result):
+    if _result_cache is None:
+        return
+    try:
+        _result_cache.set(_cache_key(bundle, query_text, top_n, engine), result)
+    except Exception as e:
+        logger.warning(f"Course recommendation cache write failed: {e}")
+
+def get_active_model_version():
+    bundle = _active_bundle
+    return bundle.version if bundle else None
 
 def get_model_status():
-    if _model_loaded_successfully:
-        return {"status": "UP", "message": "TF-IDF Course Model components loaded."}
+    bundle = _active_bundle
+    reload_info = dict(_reload_state)
+    if bundle is not None:
+        embeddings = bundle.embeddings
+        return {"status": "UP", "message": "TF-IDF Course Model components loaded.", "model_version": bundle.version,
+                "n_courses": bundle.n_courses, "reload": reload_info,
+                "embeddings": {"model_name": embeddings.model_name, "ivf_lists": embeddings.index.n_lists} if embeddings else None,
+                "hybrid_available": _hybrid_available(bundle)}
+    elif reload_info["in_progress"]:
+        return {"status": "DOWN", "message": "TF-IDF Course Model is loading.", "model_version": None, "reload": reload_info}
     else:
-        return {"status": "DOWN", "message": f"TF-IDF Course Model components not loaded. Check logs. Path: {MODEL_DIR_PATH}"}
+        return {"status": "DOWN", "message": f"TF-IDF Course Model components not loaded. Check logs. Path: {MODEL_DIR_PATH}",
+                "model_version": None, "reload": reload_info}
+
+def _rank_queries(bundle, query_texts, top_n, engine):
+    """Returns one (course_indices, scores) pair per query text, best first."""
+    from sklearn.preprocessing import normalize
+    query_matrix = normalize(bundle.vectorizer.transform(query_texts), norm='l2', copy=False)
+    if engine == ENGINE_HYBRID:
+        n_candidates = max(top_n, _hybrid_settings["candidates"])
+        embeddings = bundle.embeddings
+        query_vectors = encode_texts(_query_encoder, query_texts)
+        sparse_results = brute_force_top_k(bundle.course_matrix, query_matrix, n_candidates)
+        dense_results = embeddings.index.search(query_vectors, n_candidates, n_probe=_hybrid_settings["n_probe"])
+        return hybrid_rerank(bundle.course_matrix, embeddings.vectors, query_matrix, query_vectors,
+                             sparse_results, dense_results, top_n, dense_weight=_hybrid_settings["dense_weight"])
+    if engine == ENGINE_INVERTED_INDEX:
+        return bundle.get_inverted_index().top_k(query_matrix, top_n)
+    return brute_force_top_k(bundle.course_matrix, query_matrix, top_n)
+
+def _resolve_engine(engine, bundle):
+    if not engine:
+        return ENGINE_BRUTE_FORCE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown course recommender engine '{engine}'. Expected one of: {', '.join(ENGINES)}")
+    if engine == ENGINE_HYBRID and not _hybrid_available(bundle):
+        # No embeddings for this version, or SBERT not loaded (yet): serve (and cache) sparse results
+        return ENGINE_BRUTE_FORCE
+    return engine
 
-def get_predictions(job_title, job_description, top_n=3):
-    if not _model_loaded_successfully:
-        return [], "TF-IDF Course Model not loaded."
+def get_predictions(job_title, job_description, top_n=3, engine=None):
+    """Returns (recommendations, message, model_version)."""
+    bundle = _active_bundle
+    if bundle is None:
+        return [], "TF-IDF Course Model not loaded.", None
     query_text = _clean_text(job_title + " " + job_description)
-    if not query_text: return [], "Query text empty after cleaning."
+    if not query_text: return [], "Query text empty after cleaning.", bundle.version
     try:
-        query_vector = _tfidf_vectorizer.transform([query_text])
-        sim_scores = cosine_similarity(query_vector, _course_tfidf_matrix).flatten()
-        indices = sim_scores.argsort()[-top_n:][::-1]
-        recs = []
-        for idx in indices:
-            score = float(sim_scores[idx])
-            if score > 0.01: # Threshold
-                info = _course_metadata_df.iloc[idx]
-                recs.append({
-                    "id": f"tf_course_{idx}", "name": info.get('course_title'), "url": info.get('Course URL'),
-                    "platform": "Coursera", "relevance": f"{score:.2%}",
-                    "description_snippet": (info.get('course_description')[:150] + "...") if info.get('course_description') else "",
-                    "skills_taught": info.get('course_skills')
-                })
+        engine = _resolve_engine(engine, bundle)
+        cached = _cache_get(bundle, query_text, top_n, engine)
+        if cached is not None:
+            return cached["courses"], cached["message"], bundle.version
+        (indices, scores), = _rank_queries(bundle, [query_text], top_n, engine)
+        recs = gather_recommendations(bundle.payloads, indices, scores)
         msg = "Recommendations retrieved." if recs else "No suitable courses found."
-        return recs, msg
+        _cache_set(bundle, query_text, top_n, engine, {"courses": recs, "message": msg})
+        return recs, msg, bundle.version
     except Exception as e:
         logger.error(f"Error in TF-IDF get_predictions: {e}", exc_info=True)
-        return [], f"Error predicting courses: {e}"
+        return [], f"Error predicting courses: {e}", bundle.version
 
-# Load model when this module is imported
-if not _model_loaded_successfully:
-    load_model_components()
\ No newline at end of file
+def get_batch_predictions(jobs, top_n=3, engine=None):
+    """Scores many (job_title, job_description) pairs with a single sparse matrix product.
+
+    Returns (results, message, model_version); results[i] is {"courses": [...], "message": ...} for jobs[i].
+    """
+    bundle = _active_bundle
+    if bundle is None:
+        return [], "TF-IDF Course Model not loaded.", None
+    results = [{"courses": [], "message": "Query text empty after cleaning."} for _ in jobs]
+    try:
+        engine = _resolve_engine(engine, bundle)
+        query_texts, positions = [], []
+        scored_count = 0
+        for pos, (job_title, job_description) in enumerate(jobs):
+            query_text = _clean_text((job_title or "") + " " + (job_description or ""))
+            if not query_text:
+                continue
+            scored_count += 1
+            cached = _cache_get(bundle, query_text, top_n, engine)
+            if cached is not None:
+                results[pos] = cached
+            else:
+                query_texts.append(query_text)
+                positions.append(pos)
+        if not scored_count:
+            return results, "All query texts empty after cleaning.", bundle.version
+        if query_texts:
+            ranked = _rank_queries(bundle, query_texts, top_n, engine)
+            for (indices, scores), pos, query_text in zip(ranked, positions, query_texts):
+                recs = gather_recommendations(bundle.payloads, indices, scores)
+                results[pos] = {"courses": recs, "message": "Recommendations retrieved." if recs else "No suitable courses found."}
+                _cache_set(bundle, query_text, top_n, engine, results[pos])
+        return results, f"Batch recommendations retrieved for {scored_count} of {len(jobs)} jobs.", bundle.version
+    except Exception as e:
+        logger.error(f"Error in TF-IDF get_batch_predictions: {e}", exc_info=True)
+        return [], f"Error predicting courses: {e}", bundle.version
@@ -0,0 +1,297 @@
+# flask_server/course_recommender/train.py
+# Command-line training for the course recommender (replaces 'ML prediction/Untitled2.ipynb').
+#
+#   python -m flask_server.course_recommender.train --csv Coursera.csv [--version 2025-07-15] [--activate]
+#
+# Streams the Coursera CSV in chunks with the notebook's preprocessing (column renames, fillna, empty-title
+# filter, clean_text, skills repeated twice, de-duplication on title + description) and writes an artifact
+# set (see artifacts.py) to 'ML prediction/versions/<version>/', where the service and its file watcher pick
+# it up. The manifest's "training" entry records the source file's SHA-256, row counts, parameters and timings.
+#
+# Vectorizers:
+#   vocab    (default) two passes over the file. Pass 1 merges per-chunk document frequencies, so vocabulary
+#            and idf are exactly what TfidfVectorizer(stop_words='english', ngram_range=(1, 2), min_df=2,
+#            max_df=0.8).fit would give on the whole file; pass 2 transforms chunk by chunk. Memory grows with
+#            the number of distinct n-grams: past --max-df-terms, n-grams seen in only one document so far are
+#            dropped from the counts (the manifest records how many), which keeps long tails bounded.
+#   hashing  HashingVectorizer into --n-features columns. Pass 1 only counts per-column document frequencies,
+#            so memory does not depend on the catalog at all; colliding n-grams share a column.
+# Apart from that, peak memory is one chunk and its CSR block, plus 9 bytes per source row for de-duplication.
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+import numpy as np
+
+from .artifacts import (METADATA_COLUMNS, CourseArtifactWriter, _build_vectorizer, _vectorizer_params,
+                        hashing_vectorizer_params)
+from .model_store import CURRENT_VERSION_FILENAME, VERSIONS_DIRNAME, is_valid_version_name
+from .service import MODEL_DIR_PATH, _clean_text as clean_text
+
+logger = logging.getLogger(__name__)
+
+VECTORIZER_VOCAB = "vocab"
+VECTORIZER_HASHING = "hashing"
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_MAX_DF_TERMS = 5_000_000
+# Same settings as the notebook's TfidfVectorizer
+STOP_WORDS = 'english'
+NGRAM_RANGE = (1, 2)
+MIN_DF = 2
+MAX_DF = 0.8
+
+SOURCE_COLUMN_RENAMES = {'Course Name': 'course_title', 'Course Description': 'course_description', 'Skills': 'course_skills'}
+REQUIRED_COLUMNS = ['course_title', 'course_description', 'course_skills', 'Course URL']
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_chunks(csv_path, chunk_size):
+    """Yields preprocessed DataFrame chunks: metadata columns plus 'combined_features', empty titles dropped."""
+    import pandas as pd
+
+    wanted = set(SOURCE_COLUMN_RENAMES) | set(REQUIRED_COLUMNS)
+    reader = pd.read_csv(csv_path, chunksize=chunk_size, dtype=str, usecols=lambda col: col in wanted)
+    for chunk in reader:
+        chunk = chunk.rename(columns=SOURCE_COLUMN_RENAMES)
+        missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Required column(s) {missing} not found in {csv_path}.")
+        rows_read = len(chunk)
+        for col in ('course_description', 'course_skills', 'course_title'):
+            chunk[col] = chunk[col].fillna('')
+        chunk = chunk[chunk['course_title'].str.strip() != '']
+        chunk = chunk.assign(combined_features=chunk['course_title'].map(clean_text) + ' ' +
+                             chunk['course_description'].map(clean_text) + ' ' +
+                             (chunk['course_skills'].map(clean_text) + ' ') * 2) # Repeat skills
+        yield chunk, rows_read
+
+class _Deduplicator:
+    """Keeps the first row for each (title, description), like DataFrame.drop_duplicates, across chunks.
+
+    Rows are identified by a 64-bit hash, so memory is 8 bytes per distinct row.
+    """
+
+    def __init__(self):
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    @staticmethod
+    def _hashes(chunk):
+        return np.fromiter(
+            (int.from_bytes(hashlib.blake2b(f"{title}\0{description}".encode('utf-8'), digest_size=8).digest(), 'little')
+             for title, description in zip(chunk['course_title'], chunk['course_description'])),
+            dtype=np.uint64, count=len(chunk))
+
+    def keep_mask(self, chunk):
+        hashes = self._hashes(chunk)
+        keep = np.zeros(len(hashes), dtype=bool)
+        _, first = np.unique(hashes, return_index=True)
+        keep[first] = True
+        if len(self._seen):
+            pos = np.minimum(np.searchsorted(self._seen, hashes), len(self._seen) - 1)
+            keep &= self._seen[pos] != hashes
+        self._seen = np.union1d(self._seen, hashes[keep])
+        return keep
+
+def _analyzer_params():
+    return {"stop_words": STOP_WORDS, "ngram_range": NGRAM_RANGE}
+
+def _doc_count_limits(n_docs, min_df, max_df):
+    # Same interpretation as sklearn: floats are proportions of documents, ints are absolute counts
+    low = min_df if isinstance(min_df, int) else min_df * n_docs
+    high = max_df if isinstance(max_df, int) else max_df * n_docs
+    return low, high
+
+def _smooth_idf(document_frequency, n_docs):
+    return np.log((1 + n_docs) / (1 + document_frequency)) + 1
+
+class _VocabularyCounter:
+    def __init__(self, max_terms):
+        self.max_terms = max_terms
+        self.document_frequency = Counter()
+        self.pruned_terms = 0
+
+    def add(self, texts):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        vectorizer = CountVectorizer(binary=True, **_analyzer_params())
+        try:
+            counts = vectorizer.fit_transform(texts)
+        except ValueError: # Chunk with nothing but stop words
+            return
+        chunk_frequency = np.asarray(counts.sum(axis=0)).ravel().tolist()
+        self.document_frequency.update(dict(zip(vectorizer.get_feature_names_out().tolist(), chunk_frequency)))
+        if len(self.document_frequency) > self.max_terms:
+            singletons = [term for term, count in self.document_frequency.items() if count == 1]
+            for term in singletons:
+                del self.document_frequency[term]
+            self.pruned_terms += len(singletons)
+            logger.warning(f"Vocabulary counts exceeded {self.max_terms} terms; pruned {len(singletons)} single-document n-grams.")
+
+    def build(self, n_docs, min_df, max_df):
+        """Returns (vectorizer, params, terms, idf) with the vocabulary TfidfVectorizer.fit would select."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        low, high = _doc_count_limits(n_docs, min_df, max_df)
+        terms = sorted(term for term, count in self.document_frequency.items() if low <= count <= high)
+        if not terms:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        idf = _smooth_idf(np.array([self.document_frequency[term] for term in terms], dtype=np.float64), n_docs)
+        params = _vectorizer_params(TfidfVectorizer(min_df=min_df, max_df=max_df, **_analyzer_params()))
+        return _build_vectorizer(params, terms, idf), params, terms, idf
+
+class _HashedFrequencyCounter:
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.pruned_terms = 0
+
+    def _hashing_vectorizer(self, binary):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        return HashingVectorizer(n_features=self.n_features, binary=binary, norm=None, alternate_sign=False, **_analyzer_params())
+
+    def add(self, texts):
+        counts = self._hashing_vectorizer(binary=True).transform(texts)
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+
+    def build(self, n_docs, min_df, max_df):
+        """Returns (vectorizer, params, terms, idf). Columns outside [min_df, max_df] get idf 0, which drops them like
+        TfidfVectorizer drops those terms from its vocabulary."""
+        low, high = _doc_count_limits(n_docs, min_df, max_df)
+        idf = _smooth_idf(self.document_frequency.astype(np.float64), n_docs)
+        idf[(self.document_frequency < low) | (self.document_frequency > high) | (self.document_frequency == 0)] = 0.0
+        params = hashing_vectorizer_params(self._hashing_vectorizer(binary=False),
+                                           {"norm": "l2", "use_idf": True, "smooth_idf": True, "sublinear_tf": False})
+        return _build_vectorizer(params, [], idf), params, [], idf
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def train_course_model(csv_path, output_dir, vectorizer_kind=VECTORIZER_VOCAB, chunk_size=DEFAULT_CHUNK_SIZE,
+                       min_df=MIN_DF, max_df=MAX_DF, n_features=DEFAULT_N_FEATURES, max_df_terms=DEFAULT_MAX_DF_TERMS):
+    """Trains from csv_path and writes an artifact set to output_dir. Returns the manifest."""
+    started = time.perf_counter()
+    timings = {}
+
+    start = time.perf_counter()
+    source_sha256 = file_sha256(csv_path)
+    timings["hash_seconds"] = time.perf_counter() - start
+
+    # Pass 1: filter and de-duplicate rows, count document frequencies
+    start = time.perf_counter()
+    counter = _VocabularyCounter(max_df_terms) if vectorizer_kind == VECTORIZER_VOCAB else _HashedFrequencyCounter(n_features)
+    deduplicator = _Deduplicator()
+    keep_masks = []
+    rows_read = rows_titled = n_docs = 0
+    for chunk, chunk_rows_read in read_chunks(csv_path, chunk_size):
+        rows_read += chunk_rows_read
+        rows_titled += len(chunk)
+        keep = deduplicator.keep_mask(chunk)
+        keep_masks.append(keep)
+        if keep.any():
+            counter.add(chunk['combined_features'][keep].tolist())
+            n_docs += int(keep.sum())
+        logger.info(f"Pass 1: {rows_read} rows read, {n_docs} courses kept.")
+    del deduplicator
+    if not n_docs:
+        raise ValueError(f"No courses with a title found in {csv_path}.")
+    vectorizer, vectorizer_params, terms, idf = counter.build(n_docs, min_df, max_df)
+    timings["pass1_seconds"] = time.perf_counter() - start
+    n_terms = len(terms) if vectorizer_kind == VECTORIZER_VOCAB else n_features
+    logger.info(f"Pass 1 done in {timings['pass1_seconds']:.1f}s: {n_docs} courses, {n_terms} columns.")
+
+    # Pass 2: transform chunk by chunk straight into the artifact writer
+    start = time.perf_counter()
+    writer = CourseArtifactWriter(output_dir, n_terms, metadata_columns=METADATA_COLUMNS)
+    try:
+        for (chunk, _), keep in zip(read_chunks(csv_path, chunk_size), keep_masks):
+            if not keep.any():
+                continue
+            chunk = chunk[keep]
+            course_matrix = vectorizer.transform(chunk['combined_features'].tolist()).tocsr()
+            course_matrix.eliminate_zeros()
+            writer.append(course_matrix, chunk[METADATA_COLUMNS])
+            logger.info(f"Pass 2: {writer.n_courses} of {n_docs} courses written.")
+        if writer.n_courses != n_docs:
+            raise RuntimeError(f"{csv_path} changed during training ({writer.n_courses} courses in pass 2, {n_docs} in pass 1).")
+        timings["pass2_seconds"] = time.perf_counter() - start
+        timings["total_seconds"] = time.perf_counter() - started
+        training = {
+            "source": {"file": os.path.basename(csv_path), "sha256": source_sha256, "bytes": os.path.getsize(csv_path),
+                       "rows_read": rows_read, "rows_without_title": rows_read - rows_titled,
+                       "duplicates_dropped": rows_titled - n_docs, "courses": n_docs},
+            "vectorizer_kind": vectorizer_kind,
+            "params": {"chunk_size": chunk_size, "min_df": min_df, "max_df": max_df, "stop_words": STOP_WORDS,
+                       "ngram_range": list(NGRAM_RANGE), "n_features": n_features if vectorizer_kind == VECTORIZER_HASHING else None},
+            "df_pruned_terms": counter.pruned_terms,
+            "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+        return writer.finish(vectorizer_params, terms, idf, extra={"training": training})
+    except BaseException:
+        writer.abort()
+        raise
+
+def _parse_df(value):
+    return float(value) if '.' in value else int(value)
+
+def activate_version(model_dir, version):
+    """Points versions/CURRENT at `version`; the service's file watcher then hot-reloads it."""
+    current_file = os.path.join(model_dir, VERSIONS_DIRNAME, CURRENT_VERSION_FILENAME)
+    tmp_file = f"{current_file}.tmp-{os.getpid()}"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(version + "\n")
+    os.replace(tmp_file, current_file)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the course recommender from the Coursera CSV in bounded memory.")
+    parser.add_argument('--csv', required=True, help="Source CSV (Course Name, Course Description, Skills, Course URL)")
+    parser.add_argument('--model-dir', default=MODEL_DIR_PATH, help="'ML prediction' directory")
+    parser.add_argument('--version', default=None, help="Version name under versions/ (default: current UTC timestamp)")
+    parser.add_argument('--output-dir', default=None, help="Write the artifact set here instead of versions/<version>")
+    parser.add_argument('--activate', action='store_true', help="Write versions/CURRENT so running servers switch to the new version")
+    parser.add_argument('--vectorizer', choices=[VECTORIZER_VOCAB, VECTORIZER_HASHING], default=VECTORIZER_VOCAB)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="CSV rows per chunk")
+    parser.add_argument('--min-df', type=_parse_df, default=MIN_DF, help="Int: document count; float: proportion")
+    parser.add_argument('--max-df', type=_parse_df, default=MAX_DF, help="Int: document count; float: proportion")
+    parser.add_argument('--n-features', type=int, default=DEFAULT_N_FEATURES, help="Columns for --vectorizer hashing")
+    parser.add_argument('--max-df-terms', type=int, default=DEFAULT_MAX_DF_TERMS,
+                        help="Distinct n-grams counted before single-document ones are pruned (--vectorizer vocab)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    version = args.version or time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+    if args.output_dir:
+        output_dir = args.output_dir
+        if args.activate:
+            parser.error("--activate only applies to versions/<version>, not --output-dir")
+    else:
+        if not is_valid_version_name(version):
+            parser.error(f"Invalid version name '{version}'")
+        output_dir = os.path.join(args.model_dir, VERSIONS_DIRNAME, version)
+        os.makedirs(os.path.dirname(output_dir), exist_ok=True)
+
+    manifest = train_course_model(args.csv, output_dir, vectorizer_kind=args.vectorizer, chunk_size=args.chunk_size,
+                                  min_df=args.min_df, max_df=args.max_df, n_features=args.n_features,
+                                  max_df_terms=args.max_df_terms)
+    if args.activate:
+        activate_version(args.model_dir, version)
+        logger.info(f"Version '{version}' activated.")
+    print(json.dumps(manifest["training"], indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,51 @@
 # flask_server/features/ai_practice_routes.py
 from flask import Blueprint, request, jsonify, current_app
-from ..pages.ai_utils import generate_interview_questions_llm, evaluate_single_answer_llm
+from flask_login import current_user
+from ..pages.ai_utils import stream_interview_questions_llm
+from ..pages.answer_evaluation import evaluate_answers, iter_answer_evaluations
+from ..pages.llm_cache import get_interview_questions, interview_questions_key, lookup as llm_cache_lookup, store_interview_questions
+from ..pages.sse import sse_event, sse_error, sse_response
+from ..pages.task_queue import register_task, submit, is_enabled as task_queue_enabled
+from .task_routes import task_accepted_response
 
 ai_practice_bp = Blueprint('ai_practice', __name__, url_prefix='/api')
 
+DEFAULT_QUESTION_COUNTS = {"num_technical": 3, "num_behavioral": 2, "num_situational": 2}
+MAX_QUESTIONS_PER_CATEGORY = 20
+
+def _question_counts(data):
+    """Returns (counts, error_message) for the num_* fields of a question generation request."""
+    counts = {}
+    for name, default in DEFAULT_QUESTION_COUNTS.items():
+        value = data.get(name, default)
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            return None, f"'{name}' must be an integer between 0 and {MAX_QUESTIONS_PER_CATEGORY}"
+        try:
+            value = int(value)
+        except ValueError:
+            return None, f"'{name}' must be an integer between 0 and {MAX_QUESTIONS_PER_CATEGORY}"
+        if not 0 <= value <= MAX_QUESTIONS_PER_CATEGORY:
+            return None, f"'{name}' must be an integer between 0 and {MAX_QUESTIONS_PER_CATEGORY}"
+        counts[name] = value
+    return counts, None
+
 @ai_practice_bp.route('/generate_interview_questions', methods=['POST'])
 def generate_questions_route():
     data = request.get_json()
     job_role = data.get('job_role')
     if not job_role: return jsonify({"error": "Job role required"}), 400
+    counts, counts_error = _question_counts(data)
+    if counts_error: return jsonify({"error": counts_error}), 400
     
     try:
-        questions = generate_interview_questions_llm(
+        questions, from_cache = get_interview_questions(
             job_role,
             data.get('context_keywords', ''),
             current_app.logger,
-            num_technical=data.get('num_technical', 3),
-            num_behavioral=data.get('num_behavioral', 2),
-            num_situational=data.get('num_situational', 2),
-            model="tinyllama" # Or from config
+            model="tinyllama", # Or from config
+            **counts
         )
-        return jsonify({"questions": questions})
+        return jsonify({"questions": questions, "cached": from_cache})
     except ConnectionError as ce:
         current_app.logger.error(f"Ollama connection error in generate_questions: {ce}")
         return jsonify({"error": "AI service (Ollama) connection failed."}), 503
@@ -28,47 +53,162 @@ def generate_questions_route():
         current_app.logger.error(f"Error generating questions: {e}", exc_info=True)
         return jsonify({"error": f"Question generation failed: {str(e)}"}), 500
 
-@ai_practice_bp.route('/evaluate_answers', methods=['POST'])
-def evaluate_answers_route_handler():
-    data = request.get_json()
-    job_details = data.get('job_details')
-    q_and_a = data.get('questions_and_answers')
+def _overall_feedback(avg_score):
+    # Simple overall feedback based on average
+    overall_fb = f"Overall average score: {avg_score:.0f}%. "
+    if avg_score > 75: overall_fb += "Strong performance!"
+    elif avg_score > 50: overall_fb += "Good effort, room to improve."
+    else: overall_fb += "Needs significant improvement."
+    return overall_fb
 
-    if not job_details or not q_and_a: return jsonify({"error": "Missing data"}), 400
+def _evaluation_request(data):
+    """(job_title, job_desc, q_and_a) from an /evaluate_answers body, or None if data is missing."""
+    job_details = (data or {}).get('job_details')
+    q_and_a = (data or {}).get('questions_and_answers')
+    if not job_details or not q_and_a: return None
     job_title = job_details.get("title", "General Role")
     job_desc = (job_details.get("description") or "")[:300] # Snippet
+    return job_title, job_desc, q_and_a
+
+def _evaluation_body(results, evaluated):
+    scores = [result.get("score", 0) for result, counted in zip(results, evaluated) if counted]
+    avg_score = (sum(scores) / len(scores)) if scores else 0
+    return {
+        "score": avg_score,
+        "feedback": _overall_feedback(avg_score),
+        "detailed_feedback": results
+    }
+
+def _evaluate_answers(job_title, job_desc, q_and_a, logger, on_item=None):
+    """The /evaluate_answers response body. Answers are evaluated concurrently (pages/answer_evaluation.py);
+    on_item(done) is called after each one (task progress/cancellation)."""
+    results, evaluated = evaluate_answers(job_title, job_desc, q_and_a, logger, model="tinyllama", on_item=on_item)
+    return _evaluation_body(results, evaluated)
+
+@ai_practice_bp.route('/evaluate_answers', methods=['POST'])
+def evaluate_answers_route_handler():
+    parsed = _evaluation_request(request.get_json())
+    if parsed is None: return jsonify({"error": "Missing data"}), 400
+    job_title, job_desc, q_and_a = parsed
 
-    results = []
-    total_score_sum = 0
-    evaluated_count = 0
     try:
-        for item in q_and_a:
-            q_text = item.get("question")
-            answer = item.get("answer")
-            if not q_text or not answer:
-                results.append({"question_id": item.get("id"), "score": 0, "feedback_text": "Not answered."})
-                continue
-            
-            eval_result = evaluate_single_answer_llm(job_title, job_desc, q_text, answer, current_app.logger, model="tinyllama")
-            results.append({"question_id": item.get("id"), **eval_result})
-            total_score_sum += eval_result.get("score", 0)
-            evaluated_count +=1
-        
-        avg_score = (total_score_sum / evaluated_count) if evaluated_count > 0 else 0
-        # Simple overall feedback based on average
-        overall_fb = f"Overall average score: {avg_score:.0f}%. "
-        if avg_score > 75: overall_fb += "Strong performance!"
-        elif avg_score > 50: overall_fb += "Good effort, room to improve."
-        else: overall_fb += "Needs significant improvement."
-
-        return jsonify({
-            "score": avg_score,
-            "feedback": overall_fb,
-            "detailed_feedback": results
-        })
+        return jsonify(_evaluate_answers(job_title, job_desc, q_and_a, current_app.logger))
     except ConnectionError as ce:
         current_app.logger.error(f"Ollama connection error in evaluate_answers: {ce}")
         return jsonify({"error": "AI service (Ollama) connection failed."}), 503
     except Exception as e:
         current_app.logger.error(f"Error evaluating answers: {e}", exc_info=True)
-        return jsonify({"error": f"Answer evaluation failed: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Answer evaluation failed: {str(e)}"}), 500
+
+@ai_practice_bp.route('/generate_interview_questions/stream', methods=['POST'])
+def generate_questions_stream_route():
+    """SSE variant of /generate_interview_questions. Events: token {text} for each model chunk;
+    question {category, index, text} once a question is complete; done {questions, cached}; error {error, status}.
+    Questions served from the LLM cache arrive as question events only, without tokens."""
+    data = request.get_json()
+    job_role = data.get('job_role')
+    if not job_role: return jsonify({"error": "Job role required"}), 400
+    counts, counts_error = _question_counts(data)
+    if counts_error: return jsonify({"error": counts_error}), 400
+    logger = current_app._get_current_object().logger
+
+    model = "tinyllama" # Or from config
+    cache_key = interview_questions_key(job_role, data.get('context_keywords', ''), model, **counts)
+
+    def events():
+        cached = llm_cache_lookup(cache_key, logger)
+        if cached is not None:
+            for category, texts in cached.items():
+                for index, text in enumerate(texts):
+                    yield sse_event({"category": category, "index": index, "text": text}, event="question")
+            yield sse_event({"questions": cached, "cached": True}, event="done")
+            return
+        questions = {"technical_questions": [], "behavioral_questions": [], "situational_questions": []}
+        try:
+            for kind, payload in stream_interview_questions_llm(job_role, data.get('context_keywords', ''), logger,
+                                                                model=model, **counts):
+                if kind == "token":
+                    yield sse_event({"text": payload}, event="token")
+                else:
+                    questions[payload["category"]].append(payload["text"])
+                    yield sse_event(payload, event="question")
+            store_interview_questions(cache_key, questions, logger)
+            yield sse_event({"questions": questions, "cached": False}, event="done")
+        except ConnectionError as ce:
+            logger.error(f"Ollama connection error in generate_questions stream: {ce}")
+            yield sse_error("AI service (Ollama) connection failed.", 503)
+        except Exception as e:
+            logger.error(f"Error streaming questions: {e}", exc_info=True)
+            yield sse_error(f"Question generation failed: {str(e)}", 500)
+
+    return sse_response(events())
+
+@ai_practice_bp.route('/evaluate_answers/stream', methods=['POST'])
+def evaluate_answers_stream_route_handler():
+    """SSE variant of /evaluate_answers. Events: evaluation {question_id, score, feedback_text, ...} per answer,
+    in the order they finish; done {score, feedback, detailed_feedback} (the /evaluate_answers body, in question
+    order); error {error, status}."""
+    parsed = _evaluation_request(request.get_json())
+    if parsed is None: return jsonify({"error": "Missing data"}), 400
+    job_title, job_desc, q_and_a = parsed
+    logger = current_app._get_current_object().logger
+
+    def events():
+        results, evaluated = [None] * len(q_and_a), [False] * len(q_and_a)
+        try:
+            for index, result, counted in iter_answer_evaluations(job_title, job_desc, q_and_a, logger, model="tinyllama"):
+                results[index], evaluated[index] = result, counted
+                yield sse_event(result, event="evaluation")
+            yield sse_event(_evaluation_body(results, evaluated), event="done")
+        except ConnectionError as ce:
+            logger.error(f"Ollama connection error in evaluate_answers stream: {ce}")
+            yield sse_error("AI service (Ollama) connection failed.", 503)
+        except Exception as e:
+            logger.error(f"Error streaming answer evaluations: {e}", exc_info=True)
+            yield sse_error(f"Answer evaluation failed: {str(e)}", 500)
+
+    return sse_response(events())
+
+def _generate_questions_task(payload, context):
+    context.set_progress(stage="generating")
+    questions, from_cache = get_interview_questions(payload["job_role"], payload["context_keywords"], context.logger,
+                                                    model=payload["model"], **payload["counts"])
+    return {"questions": questions, "cached": from_cache}
+
+def _evaluate_answers_task(payload, context):
+    def on_item(done):
+        context.check_cancelled()
+        context.set_progress(evaluated=done, total=len(payload["questions_and_answers"]))
+    on_item(0)
+    return _evaluate_answers(payload["job_title"], payload["job_desc"], payload["questions_and_answers"], context.logger, on_item=on_item)
+
+register_task('generate_interview_questions', _generate_questions_task)
+register_task('evaluate_answers', _evaluate_answers_task)
+
+@ai_practice_bp.route('/generate_interview_questions/async', methods=['POST'])
+def generate_questions_async_route():
+    """Queues /generate_interview_questions as a background task (202 with the task URLs)."""
+    if not task_queue_enabled(): return jsonify({"error": "Background tasks are disabled."}), 503
+    data = request.get_json()
+    job_role = data.get('job_role')
+    if not job_role: return jsonify({"error": "Job role required"}), 400
+    counts, counts_error = _question_counts(data)
+    if counts_error: return jsonify({"error": counts_error}), 400
+    task_id = submit('generate_interview_questions', {
+        "job_role": job_role,
+        "context_keywords": data.get('context_keywords', ''),
+        "counts": counts,
+        "model": "tinyllama", # Or from config
+    }, user_id=current_user.id if current_user.is_authenticated else None)
+    return task_accepted_response(task_id)
+
+@ai_practice_bp.route('/evaluate_answers/async', methods=['POST'])
+def evaluate_answers_async_route_handler():
+    """Queues /evaluate_answers as a background task (202 with the task URLs)."""
+    if not task_queue_enabled(): return jsonify({"error": "Background tasks are disabled."}), 503
+    parsed = _evaluation_request(request.get_json())
+    if parsed is None: return jsonify({"error": "Missing data"}), 400
+    job_title, job_desc, q_and_a = parsed
+    task_id = submit('evaluate_answers', {"job_title": job_title, "job_desc": job_desc, "questions_and_answers": q_and_a},
+                     user_id=current_user.id if current_user.is_authenticated else None)
+    return task_accepted_response(task_id)
@@ -0,0 +1,40 @@
+# flask_server/features/health_routes.py
+from flask import Blueprint, jsonify
+from ..warmup import get_liveness, get_readiness
+from ..pages.embedding_cache import get_embedding_cache_stats
+from ..pages.inference_batcher import get_batcher_stats
+from ..pages.extract import get_pdf_extraction_stats
+from ..pages.parsed_resume_store import get_parsed_resume_stats
+from ..pages.task_queue import get_task_queue_stats
+from ..pages.fetch_data import get_adzuna_stats
+from ..pages.jobs_cache import get_jobs_cache_stats
+from ..pages.llm_cache import get_llm_cache_stats
+from ..pages.llm_client import get_llm_client_stats
+from ..course_recommender.service import get_cache_stats as get_course_cache_stats
+
+health_bp = Blueprint('health', __name__, url_prefix='/api')
+
+@health_bp.route('/livez', methods=['GET'])
+def liveness_route_handler():
+    # The process is up and serving requests; says nothing about whether the models are loaded
+    return jsonify(get_liveness())
+
+@health_bp.route('/readyz', methods=['GET'])
+def readiness_route_handler():
+    ready, report = get_readiness()
+    return jsonify(report), 200 if ready else 503
+
+@health_bp.route('/metrics', methods=['GET'])
+def metrics_route_handler():
+    return jsonify({
+        "embedding_cache": get_embedding_cache_stats(),
+        "sbert_batching": get_batcher_stats(),
+        "pdf_extraction": get_pdf_extraction_stats(),
+        "parsed_resumes": get_parsed_resume_stats(),
+        "task_queue": get_task_queue_stats(),
+        "adzuna": get_adzuna_stats(),
+        "jobs_cache": get_jobs_cache_stats(),
+        "llm": get_llm_client_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "course_recommendation_cache": get_course_cache_stats(),
+    })
@@ -1,6 +1,9 @@
 # flask_server/features/jobs_routes.py
 from flask import Blueprint, request, jsonify, current_app
-from ..pages.fetch_data import fetch_adzuna_jobs # Assuming fetch_data remains in 'pages'
+import math
+from ..pages.fetch_data import search_adzuna_jobs, AdzunaError, AdzunaUnavailable # Assuming fetch_data remains in 'pages'
+from ..pages.job_index import remember_jobs
+from ..pages.jobs_cache import get_jobs
 
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/api')
 
@@ -16,11 +19,32 @@ def fetch_jobs_route_handler():
         app_key = current_app.config.get('ADZUNA_APP_KEY')
 
         current_app.logger.info(f"Fetching Adzuna jobs: kw='{keywords}', loc='{location}', page={page}, country={country}")
-        jobs_data, total = fetch_adzuna_jobs(
-            app_id, app_key, current_app.logger,
-            country_code=country, page=page, keywords=keywords, location=location
-        )
-        return jsonify({"total_results": total, "jobs": jobs_data})
+        logger = current_app._get_current_object().logger # fetch() may run in a background refresh
+
+        def fetch():
+            jobs, count = search_adzuna_jobs(app_id, app_key, logger, country_code=country, page=page,
+                                             keywords=keywords, location=location)
+            remember_jobs(jobs, logger) # Lets /api/match_score_batch accept these jobs by id
+            return jobs, count
+
+        cache_status = None
+        try:
+            jobs_data, total, cache_status = get_jobs(fetch, keywords, location, country, page, logger)
+        except AdzunaUnavailable as e:
+            # Degraded answer, fast while the circuit breaker is open
+            current_app.logger.warning(f"Adzuna unavailable: {e}")
+            response = jsonify({"total_results": 0, "jobs": [], "degraded": True,
+                                "error": "Job listings are temporarily unavailable. Please try again shortly."})
+            if e.retry_after:
+                response.headers["Retry-After"] = str(math.ceil(e.retry_after))
+            return response, 503
+        except AdzunaError as e:
+            current_app.logger.error(f"Error fetching jobs from Adzuna: {e}")
+            jobs_data, total = [], 0
+        response = jsonify({"total_results": total, "jobs": jobs_data})
+        if cache_status:
+            response.headers["X-Cache"] = cache_status.upper()
+        return response
     except Exception as e:
         current_app.logger.error(f"Error in /fetch_jobs: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
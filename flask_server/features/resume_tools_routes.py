@@ -1,8 +1,16 @@
 # flask_server/features/resume_tools_routes.py
+import json
 from flask import Blueprint, request, jsonify, current_app
-from ..pages.extract import extract_text_from_pdf
-from ..pages.cosine_similarity import calculate_similarity
-from ..pages.ai_utils import parse_resume_with_llm, generate_tailored_section, reassemble_resume
+from flask_login import current_user
+from ..pages.extract import extract_text_from_pdf, PDFLimitError
+from ..pages.cosine_similarity import calculate_similarity, rank_by_similarity
+from ..pages.job_index import lookup_jobs
+from ..pages.ai_utils import reassemble_resume
+from ..pages.parsed_resume_store import get_or_parse_resume
+from ..pages.resume_tailoring import tailor_resume_sections, iter_tailored_sections, merge_tailored_sections, section_labels
+from ..pages.sse import sse_event, sse_error, sse_response
+from ..pages.task_queue import register_task, submit, is_enabled as task_queue_enabled
+from .task_routes import task_accepted_response
 # SBERT model will be accessed via current_app.sbert_model (set in create_app)
 
 resume_tools_bp = Blueprint('resume_tools', __name__, url_prefix='/api')
@@ -23,10 +31,108 @@ def match_score_route_handler():
         sbert_model = current_app.config.get('SBERT_MODEL')
         score = calculate_similarity(resume_text, job_desc, sbert_model, current_app.logger)
         return jsonify({"match_score": score})
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
     except Exception as e:
         current_app.logger.error(f"Error in match_score: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+MAX_MATCH_JOBS = 50 # Jobs per /match_score_batch request
+
+def _parse_match_jobs(raw_jobs):
+    """Normalizes the 'jobs' form field (a JSON list of description strings or {id, job_title, job_description} objects).
+
+    Returns (jobs, ids_to_resolve, error); jobs given only by id are filled in from the job index afterwards.
+    """
+    try:
+        items = json.loads(raw_jobs)
+    except (TypeError, ValueError):
+        return None, None, "'jobs' must be a JSON list"
+    if not isinstance(items, list) or not items:
+        return None, None, "'jobs' must be a non-empty JSON list"
+    if len(items) > MAX_MATCH_JOBS:
+        return None, None, f"At most {MAX_MATCH_JOBS} jobs per request"
+    jobs, ids_to_resolve = [], []
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"job_description": item}
+        if not isinstance(item, dict):
+            return None, None, f"Job {position} must be a string or an object"
+        job_id = item.get('id')
+        job = {"job_id": str(job_id) if job_id is not None else str(position),
+               "job_title": item.get('job_title') or item.get('title') or "",
+               "job_description": item.get('job_description') or item.get('description') or ""}
+        if not job["job_description"] and not job["job_title"]:
+            if job_id is None:
+                return None, None, f"Job {position} has neither an id nor a description"
+            ids_to_resolve.append(job["job_id"])
+        jobs.append(job)
+    return jobs, ids_to_resolve, None
+
+@resume_tools_bp.route('/match_score_batch', methods=['POST'])
+def match_score_batch_route_handler():
+    """Scores one resume against many jobs: the PDF is read once and all texts are embedded in one batch."""
+    if not current_app.config.get('SBERT_MODEL_LOADED'):
+        current_app.logger.error("Match score batch: SBERT model not loaded.")
+        return jsonify({"error": "Scoring engine unavailable."}), 503
+
+    if 'resume_file' not in request.files: return jsonify({"error": "No resume file"}), 400
+    jobs, ids_to_resolve, error = _parse_match_jobs(request.form.get('jobs'))
+    if error: return jsonify({"error": error}), 400
+
+    unresolved = []
+    if ids_to_resolve:
+        known = lookup_jobs(ids_to_resolve, current_app.logger)
+        for job in jobs:
+            if job["job_id"] in ids_to_resolve:
+                if job["job_id"] in known:
+                    job["job_title"] = known[job["job_id"]]["title"]
+                    job["job_description"] = known[job["job_id"]]["description"]
+                else:
+                    unresolved.append(job["job_id"])
+        jobs = [job for job in jobs if job["job_id"] not in unresolved]
+    if not jobs:
+        return jsonify({"error": "None of the job ids are known; fetch the jobs first or send their descriptions.",
+                        "unresolved_job_ids": unresolved}), 404
+
+    try:
+        resume_text = extract_text_from_pdf(request.files['resume_file'], current_app.logger)
+        sbert_model = current_app.config.get('SBERT_MODEL')
+        # A job without a description is scored on its title
+        scores = rank_by_similarity(resume_text, [job["job_description"] or job["job_title"] for job in jobs],
+                                    sbert_model, current_app.logger)
+        order = sorted(range(len(jobs)), key=lambda i: -scores[i])
+        results = [{"job_id": jobs[i]["job_id"], "job_title": jobs[i]["job_title"],
+                    "match_score": float(scores[i]), "rank": rank} for rank, i in enumerate(order, start=1)]
+        return jsonify({"results": results, "unresolved_job_ids": unresolved})
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        current_app.logger.error(f"Error in match_score_batch: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+def _generate_resume(base_resume_text, target_job_title, target_job_description, logger, model, user_id, on_stage=None):
+    """The /generate_resume response body. on_stage(name) is called before each step (task progress/cancellation)."""
+    if on_stage: on_stage("parsing")
+    # The LLM parse depends only on the resume; it is stored per user and reused for every target job
+    parsed_data, parsed_from_cache = get_or_parse_resume(base_resume_text, logger, model=model, user_id=user_id)
+
+    if on_stage: on_stage("tailoring")
+    # Sections are tailored concurrently; the pool threads get the logger object itself (no app context there)
+    modified_data, section_timings = tailor_resume_sections(parsed_data, target_job_title, target_job_description, logger, model=model)
+
+    generated_text = reassemble_resume(modified_data)
+    return {"generated_resume_text": generated_text, "parsed_resume_cached": parsed_from_cache, "section_timings": section_timings}
+
+def _generate_resume_task(payload, context):
+    def on_stage(stage):
+        context.check_cancelled()
+        context.set_progress(stage=stage)
+    return _generate_resume(payload["resume_text"], payload["target_job_title"], payload["target_job_description"],
+                            context.logger, payload["model"], context.user_id, on_stage=on_stage)
+
+register_task('generate_resume', _generate_resume_task)
+
 @resume_tools_bp.route('/generate_resume', methods=['POST'])
 def generate_resume_route_handler():
     ollama_model_name = "tinyllama" # Or from config
@@ -39,26 +145,85 @@ def generate_resume_route_handler():
 
     try:
         base_resume_text = extract_text_from_pdf(base_resume_file, current_app.logger)
-        parsed_data = parse_resume_with_llm(base_resume_text, current_app.logger, model=ollama_model_name)
-        
-        modified_data = parsed_data.copy() # Start with a copy
-        if modified_data.get("summary"):
-            modified_data["summary"] = generate_tailored_section("summary", modified_data["summary"], target_job_title, target_job_description, current_app.logger, model=ollama_model_name)
-        if modified_data.get("experience"):
-            updated_experience = []
-            for job in modified_data["experience"]:
-                 if job and job.get("responsibilities"):
-                     job["responsibilities"] = generate_tailored_section("experience_responsibilities", job["responsibilities"], target_job_title, target_job_description, current_app.logger, model=ollama_model_name)
-                 updated_experience.append(job)
-            modified_data["experience"] = updated_experience
-        if modified_data.get("skills"):
-             modified_data["skills"] = generate_tailored_section("skills", modified_data["skills"], target_job_title, target_job_description, current_app.logger, model=ollama_model_name)
-
-        generated_text = reassemble_resume(modified_data)
-        return jsonify({"generated_resume_text": generated_text})
+        user_id = current_user.id if current_user.is_authenticated else None
+        return jsonify(_generate_resume(base_resume_text, target_job_title, target_job_description,
+                                        current_app._get_current_object().logger, ollama_model_name, user_id))
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
     except ConnectionError as ce:
         current_app.logger.error(f"Ollama connection error in generate_resume: {ce}")
         return jsonify({"error": "AI service (Ollama) connection failed. Please ensure it's running."}), 503
     except Exception as e:
         current_app.logger.error(f"Error in generate_resume: {e}", exc_info=True)
-        return jsonify({"error": f"Resume generation failed: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Resume generation failed: {str(e)}"}), 500
+
+@resume_tools_bp.route('/generate_resume/stream', methods=['POST'])
+def generate_resume_stream_route_handler():
+    """SSE variant of /generate_resume. Events:
+    parsed {parsed_resume_cached, sections}; section {index, section, content, seconds, queued_seconds} as each
+    section finishes; resume {generated_resume_text, parsed_resume_cached, section_timings}; error {error, status}."""
+    ollama_model_name = "tinyllama" # Or from config
+    if 'base_resume_file' not in request.files: return jsonify({"error": "No base resume"}), 400
+    base_resume_file = request.files['base_resume_file']
+    target_job_title = request.form.get('target_job_title', '')
+    target_job_description = request.form.get('target_job_description', '')
+    if not target_job_title and not target_job_description:
+        return jsonify({"error": "Target job title or description required"}), 400
+    logger = current_app._get_current_object().logger
+    user_id = current_user.id if current_user.is_authenticated else None
+    # Extraction is fast (and usually cached) and the upload is closed once streaming starts, so it runs first
+    try:
+        base_resume_text = extract_text_from_pdf(base_resume_file, logger)
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        logger.error(f"Error in generate_resume stream: {e}", exc_info=True)
+        return jsonify({"error": f"Resume generation failed: {str(e)}"}), 500
+
+    def events():
+        try:
+            parsed_data, parsed_from_cache = get_or_parse_resume(base_resume_text, logger, model=ollama_model_name, user_id=user_id)
+            yield sse_event({"parsed_resume_cached": parsed_from_cache, "sections": section_labels(parsed_data)}, event="parsed")
+            contents, timings = {}, {}
+            for index, label, content, timing in iter_tailored_sections(parsed_data, target_job_title, target_job_description,
+                                                                        logger, model=ollama_model_name):
+                contents[index], timings[index] = content, timing
+                yield sse_event({"index": index, "section": label, "content": content,
+                                 "seconds": timing["seconds"], "queued_seconds": timing["queued_seconds"]}, event="section")
+            generated_text = reassemble_resume(merge_tailored_sections(parsed_data, contents))
+            yield sse_event({"generated_resume_text": generated_text, "parsed_resume_cached": parsed_from_cache,
+                             "section_timings": [timings[index] for index in sorted(timings)]}, event="resume")
+        except ConnectionError as ce:
+            logger.error(f"Ollama connection error in generate_resume stream: {ce}")
+            yield sse_error("AI service (Ollama) connection failed. Please ensure it's running.", 503)
+        except Exception as e:
+            logger.error(f"Error in generate_resume stream: {e}", exc_info=True)
+            yield sse_error(f"Resume generation failed: {str(e)}", 500)
+
+    return sse_response(events())
+
+@resume_tools_bp.route('/generate_resume/async', methods=['POST'])
+def generate_resume_async_route_handler():
+    """Queues /generate_resume as a background task; poll /api/tasks/<task_id> or stream its /events."""
+    ollama_model_name = "tinyllama" # Or from config
+    if not task_queue_enabled(): return jsonify({"error": "Background tasks are disabled."}), 503
+    if 'base_resume_file' not in request.files: return jsonify({"error": "No base resume"}), 400
+    target_job_title = request.form.get('target_job_title', '')
+    target_job_description = request.form.get('target_job_description', '')
+    if not target_job_title and not target_job_description:
+        return jsonify({"error": "Target job title or description required"}), 400
+
+    try:
+        # Extraction stays in the request (fast, cached, and keeps PDF errors synchronous); the LLM work is queued
+        base_resume_text = extract_text_from_pdf(request.files['base_resume_file'], current_app.logger)
+        user_id = current_user.id if current_user.is_authenticated else None
+        task_id = submit('generate_resume', {"resume_text": base_resume_text, "target_job_title": target_job_title,
+                                             "target_job_description": target_job_description, "model": ollama_model_name},
+                         user_id=user_id)
+        return task_accepted_response(task_id)
+    except PDFLimitError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        current_app.logger.error(f"Error in generate_resume async: {e}", exc_info=True)
+        return jsonify({"error": f"Resume generation failed: {str(e)}"}), 500
+
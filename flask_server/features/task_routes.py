@@ -0,0 +1,87 @@
+# flask_server/features/task_routes.py
+# Status, result, events and cancellation of background tasks (pages/task_queue.py). Tasks are submitted by
+# the /async variants of the LLM endpoints, which answer 202 with the URLs below.
+import time
+from flask import Blueprint, jsonify, current_app, url_for
+from flask_login import current_user
+from ..pages.task_queue import (get_task, cancel, task_status, task_result,
+                                STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED, FINISHED_STATUSES)
+from ..pages.sse import sse_event, sse_response
+
+tasks_bp = Blueprint('tasks', __name__, url_prefix='/api')
+
+EVENTS_POLL_SECONDS = 0.5
+EVENTS_MAX_SECONDS = 600 # Clients reconnect to /events after this
+
+def task_accepted_response(task_id):
+    """202 answer of the /async endpoints."""
+    return jsonify({
+        "task_id": task_id,
+        "status": "queued",
+        "status_url": url_for('tasks.task_status_route', task_id=task_id),
+        "result_url": url_for('tasks.task_result_route', task_id=task_id),
+        "events_url": url_for('tasks.task_events_route', task_id=task_id),
+    }), 202
+
+def _visible_task(task_id):
+    """The task, if it exists and belongs to the caller (tasks submitted anonymously are visible by id)."""
+    task = get_task(task_id)
+    if task is None:
+        return None
+    if task["user_id"] and (not current_user.is_authenticated or current_user.id != task["user_id"]):
+        return None
+    return task
+
+@tasks_bp.route('/tasks/<task_id>', methods=['GET'])
+def task_status_route(task_id):
+    task = _visible_task(task_id)
+    if task is None: return jsonify({"error": "Task not found"}), 404
+    return jsonify(task_status(task))
+
+@tasks_bp.route('/tasks/<task_id>/result', methods=['GET'])
+def task_result_route(task_id):
+    task = _visible_task(task_id)
+    if task is None: return jsonify({"error": "Task not found"}), 404
+    if task["status"] == STATUS_SUCCEEDED:
+        return jsonify(task_result(task))
+    if task["status"] == STATUS_FAILED:
+        return jsonify({"error": task["error"]}), task["error_status"] or 500
+    if task["status"] == STATUS_CANCELLED:
+        return jsonify({"error": "Task was cancelled"}), 410
+    return jsonify(task_status(task)), 202 # Not finished yet
+
+@tasks_bp.route('/tasks/<task_id>/events', methods=['GET'])
+def task_events_route(task_id):
+    """SSE: a status event whenever status or progress changes, then result (or error) when the task finishes."""
+    task = _visible_task(task_id)
+    if task is None: return jsonify({"error": "Task not found"}), 404
+    logger = current_app._get_current_object().logger
+
+    def events():
+        last, deadline = None, time.time() + EVENTS_MAX_SECONDS
+        while time.time() < deadline:
+            current = get_task(task_id)
+            if current is None:
+                return
+            status = task_status(current)
+            if (status["status"], status["progress"]) != last:
+                last = (status["status"], status["progress"])
+                yield sse_event(status, event="status")
+            if current["status"] in FINISHED_STATUSES:
+                if current["status"] == STATUS_SUCCEEDED:
+                    yield sse_event(task_result(current), event="result")
+                elif current["status"] == STATUS_FAILED:
+                    yield sse_event({"error": current["error"], "status": current["error_status"] or 500}, event="error")
+                return
+            time.sleep(EVENTS_POLL_SECONDS)
+        logger.debug(f"Task {task_id} event stream reached its time limit.")
+
+    return sse_response(events())
+
+@tasks_bp.route('/tasks/<task_id>/cancel', methods=['POST'])
+def task_cancel_route(task_id):
+    task = _visible_task(task_id)
+    if task is None: return jsonify({"error": "Task not found"}), 404
+    if task["status"] in FINISHED_STATUSES:
+        return jsonify(task_status(task)), 409
+    return jsonify(task_status(cancel(task_id)))
@@ -3,8 +3,13 @@
 # Ensure all functions take a `logger` argument and use it.
 # Ensure Ollama interactions are robust (e.g., try-except for ollama.chat).
 import json
+import re
 import time
-import ollama # Make sure ollama is installed
+# Ollama calls go through the shared client in llm_client.py (pooled connections, keep_alive, concurrency cap)
+from .llm_client import get_llm_client
+
+# Bump when the parse prompt or output structure changes; stored parses of an older version are not reused
+RESUME_PARSER_VERSION = 1
 
 # Placeholder for your functions - ensure they take logger
 def parse_resume_with_llm(resume_text, logger, model="tinyllama"):
@@ -51,4 +56,85 @@ def generate_interview_questions_llm(job_role, context_keywords, logger, num_tec
 def evaluate_single_answer_llm(job_title, job_description_snippet, question_text, candidate_answer, logger, model="tinyllama"):
     logger.info(f"Evaluating answer with {model} (stubbed)")
     # ... your actual implementation ...
-    return {"score": 80, "feedback_text": "Good answer (stubbed)."}
\ No newline at end of file
+    return {"score": 80, "feedback_text": "Good answer (stubbed)."}
+
+def stream_ollama_chat(prompt, logger, model="tinyllama", system=None):
+    """Yields the model's reply as text chunks while Ollama generates it. Raises ConnectionError if Ollama is unreachable."""
+    yield from get_llm_client().stream_chat(prompt, logger, model=model, system=system)
+
+QUESTION_CATEGORIES = {
+    "TECHNICAL": "technical_questions",
+    "BEHAVIORAL": "behavioral_questions",
+    "SITUATIONAL": "situational_questions",
+}
+_QUESTION_LINE = re.compile(r"^\s*(?:[-*]|\d+[.)])?\s*\**(TECHNICAL|BEHAVIOU?RAL|SITUATIONAL)\**\s*[:\-]\s*(.+?)\s*$", re.IGNORECASE)
+
+def _parse_question_line(line):
+    match = _QUESTION_LINE.match(line)
+    if not match:
+        return None, None
+    label = match.group(1).upper().replace("BEHAVIOURAL", "BEHAVIORAL")
+    return QUESTION_CATEGORIES[label], match.group(2)
+
+def stream_interview_questions_llm(job_role, context_keywords, logger, num_technical=3, num_behavioral=2, num_situational=2, model="tinyllama"):
+    """Streaming counterpart of generate_interview_questions_llm.
+
+    Yields ("token", text) for every chunk from the model and ("question", {"category", "index", "text"})
+    as soon as a question's line is complete. The categories match generate_interview_questions_llm's keys.
+    """
+    limits = {"technical_questions": num_technical, "behavioral_questions": num_behavioral, "situational_questions": num_situational}
+    prompt = (
+        f"Write interview questions for a {job_role} role."
+        + (f" Focus on: {context_keywords}." if context_keywords else "")
+        + f"\nWrite exactly {num_technical} technical, {num_behavioral} behavioral and {num_situational} situational questions,"
+        " one per line, each line starting with TECHNICAL:, BEHAVIORAL: or SITUATIONAL:. Write nothing else."
+    )
+    counts = {category: 0 for category in limits}
+    buffer = ""
+
+    def complete_lines(lines):
+        for line in lines:
+            category, text = _parse_question_line(line)
+            if category and counts[category] < limits[category]:
+                counts[category] += 1
+                yield "question", {"category": category, "index": counts[category] - 1, "text": text}
+
+    start = time.perf_counter()
+    for chunk in stream_ollama_chat(prompt, logger, model=model):
+        yield "token", chunk
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        yield from complete_lines(lines)
+    yield from complete_lines([buffer])
+    logger.info(f"Streamed {sum(counts.values())} interview questions for {job_role} from {model} in {time.perf_counter() - start:.2f}s")
+
+def evaluate_answers_batch_llm(job_title, job_description_snippet, items, logger, model="tinyllama"):
+    """Scores several answers with one structured prompt. items is [(key, question_text, candidate_answer)];
+    returns {key: {"score", "feedback_text"}} for the answers the model scored. Answers missing from the
+    reply are left out, so the caller can fall back to evaluate_single_answer_llm for them."""
+    numbered = "\n\n".join(f"ANSWER {number}\nQuestion: {question}\nCandidate answer: {answer}"
+                           for number, (_, question, answer) in enumerate(items, start=1))
+    prompt = (
+        f"You are interviewing a candidate for a {job_title} role."
+        + (f" Job description: {job_description_snippet}" if job_description_snippet else "")
+        + f"\nScore each of the {len(items)} answers below from 0 to 100 and give one or two sentences of feedback.\n\n"
+        + numbered
+        + '\n\nReply with only a JSON array, one object per answer: [{"answer": 1, "score": 0, "feedback_text": "..."}, ...]'
+    )
+    start = time.perf_counter()
+    reply = get_llm_client().chat(prompt, logger, model=model)
+    try:
+        entries = json.loads(reply[reply.index("["):reply.rindex("]") + 1])
+    except ValueError:
+        logger.warning(f"Batched answer evaluation from {model} returned no JSON array; {len(items)} answers unscored.")
+        return {}
+    results = {}
+    for entry in entries:
+        try:
+            number, score = int(entry["answer"]), float(entry["score"])
+        except (TypeError, KeyError, ValueError):
+            continue
+        if 1 <= number <= len(items):
+            results[items[number - 1][0]] = {"score": max(0.0, min(100.0, score)), "feedback_text": str(entry.get("feedback_text", ""))}
+    logger.info(f"Evaluated {len(results)}/{len(items)} answers in one prompt with {model} in {time.perf_counter() - start:.2f}s")
+    return results
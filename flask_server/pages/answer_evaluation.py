@@ -0,0 +1,78 @@
+# flask_server/pages/answer_evaluation.py
+# Evaluates the answers of a practice session concurrently. Each answer is an independent LLM round trip, so the
+# session takes about as long as its slowest evaluation. Like resume_tailoring.py, the threads come from one pool
+# shared by all requests; ANSWER_EVAL_MAX_CONCURRENCY bounds the evaluations in flight across the worker.
+# With ANSWER_EVAL_BATCH_SIZE = n > 1, answers are instead scored n at a time in one structured prompt
+# (evaluate_answers_batch_llm); any answer the model's reply leaves out is evaluated on its own.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .ai_utils import evaluate_answers_batch_llm, evaluate_single_answer_llm
+
+_executor = None # Created on first use
+_executor_lock = threading.Lock()
+_settings = {"max_concurrency": 4, "batch_size": 1}
+
+def init_app(app):
+    _settings["max_concurrency"] = max(1, app.config.get('ANSWER_EVAL_MAX_CONCURRENCY', 4))
+    _settings["batch_size"] = max(1, app.config.get('ANSWER_EVAL_BATCH_SIZE', 1))
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_settings["max_concurrency"], thread_name_prefix="answer-eval")
+        return _executor
+
+def _unanswered(item):
+    return {"question_id": item.get("id"), "score": 0, "feedback_text": "Not answered."}
+
+def _evaluate_one(item, job_title, job_desc, logger, model):
+    eval_result = evaluate_single_answer_llm(job_title, job_desc, item["question"], item["answer"], logger, model=model)
+    return {"question_id": item.get("id"), **eval_result}
+
+def _evaluate_group(group, job_title, job_desc, logger, model):
+    """[(index, result)] for a group of (index, item) answered questions."""
+    if len(group) == 1:
+        index, item = group[0]
+        return [(index, _evaluate_one(item, job_title, job_desc, logger, model))]
+    scored = evaluate_answers_batch_llm(job_title, job_desc, [(index, item["question"], item["answer"]) for index, item in group],
+                                        logger, model=model)
+    return [(index, {"question_id": item.get("id"), **scored[index]}) if index in scored
+            else (index, _evaluate_one(item, job_title, job_desc, logger, model))
+            for index, item in group]
+
+def iter_answer_evaluations(job_title, job_desc, q_and_a, logger, model="tinyllama"):
+    """Yields (index, result, evaluated) for every item of q_and_a as soon as it is scored (completion order);
+    index is the item's position in q_and_a. Unanswered questions come first, score 0 and are not evaluated
+    (evaluated=False: they do not count towards the average). Raises the first evaluation error."""
+    answered = []
+    for index, item in enumerate(q_and_a):
+        if item.get("question") and item.get("answer"):
+            answered.append((index, item))
+        else:
+            yield index, _unanswered(item), False
+
+    size = _settings["batch_size"]
+    executor = _get_executor()
+    futures = [executor.submit(_evaluate_group, answered[start:start + size], job_title, job_desc, logger, model)
+               for start in range(0, len(answered), size)]
+    try:
+        for future in as_completed(futures):
+            for index, result in future.result():
+                yield index, result, True
+    finally:
+        for future in futures: # No-op for finished ones; drops queued evaluations after an error or a closed stream
+            future.cancel()
+
+def evaluate_answers(job_title, job_desc, q_and_a, logger, model="tinyllama", on_item=None):
+    """(results, evaluated) in q_and_a order. on_item(done) is called after each answer is scored (task progress/cancellation)."""
+    start = time.perf_counter()
+    results, evaluated = [None] * len(q_and_a), [False] * len(q_and_a)
+    for done, (index, result, counted) in enumerate(iter_answer_evaluations(job_title, job_desc, q_and_a, logger, model=model), start=1):
+        results[index], evaluated[index] = result, counted
+        if on_item: on_item(done)
+    logger.info(f"Evaluated {sum(evaluated)} answers in {time.perf_counter() - start:.2f}s "
+                f"(concurrency cap {_settings['max_concurrency']}, batch size {_settings['batch_size']}).")
+    return results, evaluated
@@ -1,17 +1,38 @@
 # flask_server/pages/cosine_similarity.py
-from sklearn.metrics.pairwise import cosine_similarity
-# import numpy as np # Not strictly needed if only using reshape
+import numpy as np
 
 def calculate_similarity(text1, text2, sbert_model, logger):
     # ... (your existing code, ensure it uses passed sbert_model and logger) ...
     if not sbert_model:
         raise RuntimeError("SBERT model not provided for similarity calculation.")
+    from sklearn.metrics.pairwise import cosine_similarity # Deferred: sklearn is slow to import
     try:
         logger.debug("Generating embeddings for similarity.")
-        emb1 = sbert_model.encode(text1).reshape(1, -1)
-        emb2 = sbert_model.encode(text2).reshape(1, -1)
+        # One encode call for both texts; with the embedding cache (pages/embedding_cache.py) a text seen before is not re-encoded
+        emb1, emb2 = (row.reshape(1, -1) for row in sbert_model.encode([text1, text2]))
         score = cosine_similarity(emb1, emb2)[0][0]
         return max(0.0, min(1.0, float(score))) * 100
     except Exception as e:
         logger.error(f"Error in calculate_similarity: {e}", exc_info=True)
-        raise RuntimeError(f"Similarity calculation failed: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Similarity calculation failed: {e}")
+
+def rank_by_similarity(resume_text, job_texts, sbert_model, logger):
+    """Match scores (0-100, as calculate_similarity) of one resume against many job texts.
+
+    All texts go through a single encode call and the scores are one matrix-vector product.
+    """
+    if not sbert_model:
+        raise RuntimeError("SBERT model not provided for similarity calculation.")
+    if not job_texts:
+        return np.empty(0)
+    try:
+        logger.debug(f"Generating embeddings for 1 resume and {len(job_texts)} jobs.")
+        embeddings = np.asarray(sbert_model.encode([resume_text] + list(job_texts)), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1)
+        norms[norms == 0] = 1.0
+        embeddings = embeddings / norms[:, None]
+        scores = embeddings[1:] @ embeddings[0]
+        return np.clip(scores.astype(np.float64), 0.0, 1.0) * 100
+    except Exception as e:
+        logger.error(f"Error in rank_by_similarity: {e}", exc_info=True)
+        raise RuntimeError(f"Similarity calculation failed: {e}")
@@ -0,0 +1,246 @@
+# flask_server/pages/embedding_cache.py
+# Content-addressed cache of sentence embeddings, so a text already seen (a job description scored against
+# many resumes, a repeated course query) never costs another transformer forward pass.
+#   key     sha256 over (model name, text)
+#   memory  per-process LRU (result_cache.MemoryCacheBackend) of float32 vectors
+#   disk    table 'embedding_cache' in the host's local cache SQLite file, vectors stored as float32 BLOBs,
+#           shared by every worker on the host and kept across restarts (LRU-evicted past max_entries)
+# CachedEncoder wraps the SentenceTransformer from load_model.py with the same encode() call, and is what
+# create_app's warm-up puts in app.config['SBERT_MODEL'], so every SBERT caller goes through the cache.
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .result_cache import MemoryCacheBackend, make_cache_key
+
+_SQLITE_MAX_VARIABLES = 500 # Keys per SELECT ... IN (...)
+
+class SQLiteEmbeddingBackend:
+    """The LRU bound is enforced every trim_interval written vectors of this process, as in
+    result_cache.SQLiteCacheBackend, so the table can briefly hold up to trim_interval rows (per writing
+    process) above max_entries."""
+
+    def __init__(self, db_path, max_entries=200_000, timeout=5.0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.evictions = 0
+        self.trim_interval = max(1, min(256, max_entries // 16))
+        self._writes_since_trim = 0
+        self._trim_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_cache_lru ON embedding_cache (last_access)")
+
+    def _connection(self):
+        # One connection per thread, as in result_cache.SQLiteCacheBackend
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        """Returns {key: float32 vector} for the keys that are stored."""
+        conn = self._connection()
+        found = {}
+        for start in range(0, len(keys), _SQLITE_MAX_VARIABLES):
+            batch = keys[start:start + _SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(batch))
+            for key, vector in conn.execute(f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", batch):
+                found[key] = np.frombuffer(vector, dtype=np.float32)
+            if found:
+                conn.execute(f"UPDATE embedding_cache SET last_access = ? WHERE key IN ({placeholders})", [time.time(), *batch])
+        return found
+
+    def set_many(self, items, model_name):
+        """items: [(key, float32 vector)]"""
+        conn = self._connection()
+        now = time.time()
+        conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (key, model, dim, vector, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, model_name, int(vector.shape[0]), vector.astype(np.float32).tobytes(), now, now) for key, vector in items]
+        )
+        with self._trim_lock:
+            self._writes_since_trim += len(items)
+            if self._writes_since_trim < self.trim_interval:
+                return
+            self._writes_since_trim = 0
+        self._trim(conn)
+
+    def _trim(self, conn):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            cursor = conn.execute(
+                "DELETE FROM embedding_cache WHERE key IN (SELECT key FROM embedding_cache ORDER BY last_access LIMIT ?)", (excess,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM embedding_cache")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+class EmbeddingStore:
+    """In-process LRU in front of an optional SQLiteEmbeddingBackend, with hit/miss counters."""
+
+    def __init__(self, memory_entries=4096, disk_backend=None):
+        self.memory = MemoryCacheBackend(max_entries=memory_entries)
+        self.disk = disk_backend
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.encode_calls = 0
+        self.encode_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name, text):
+        return make_cache_key("embedding", model_name, text)
+
+    def encode(self, model, model_name, texts, batch_size=32, logger=None):
+        """(len(texts), dim) float32 embeddings; only texts in neither cache reach model.encode, in one call."""
+        keys = [self.key(model_name, text) for text in texts]
+        vectors = {}
+        for key in set(keys):
+            entry = self.memory.get(key)
+            if entry is not None:
+                vectors[key] = entry[0]
+        memory_hits = len(vectors)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        disk_hits = 0
+        if missing and self.disk is not None:
+            try:
+                found = self.disk.get_many(missing)
+            except Exception as e:
+                found = {}
+                if logger: logger.warning(f"Embedding cache read failed: {e}")
+            for key, vector in found.items():
+                vectors[key] = vector
+                self.memory.set(key, vector, time.time())
+            disk_hits = len(found)
+            missing = [key for key in missing if key not in found]
+
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            start = time.perf_counter()
+            encoded = np.asarray(model.encode([text_by_key[key] for key in missing], batch_size=batch_size,
+                                              convert_to_numpy=True, show_progress_bar=False), dtype=np.float32)
+            elapsed = time.perf_counter() - start
+            new_items = list(zip(missing, np.atleast_2d(encoded)))
+            for key, vector in new_items:
+                vectors[key] = vector
+                self.memory.set(key, vector, time.time())
+            if self.disk is not None:
+                try:
+                    self.disk.set_many(new_items, model_name)
+                except Exception as e:
+                    if logger: logger.warning(f"Embedding cache write failed: {e}")
+            with self._lock:
+                self.encode_calls += 1
+                self.encode_seconds += elapsed
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += disk_hits
+            self.misses += len(missing)
+        return np.stack([vectors[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        disk_entries = None
+        if self.disk is not None:
+            try:
+                disk_entries = len(self.disk)
+            except Exception:
+                pass
+        return {
+            "backend": "sqlite" if self.disk is not None else "memory",
+            "memory_entries": len(self.memory),
+            "memory_max_entries": self.memory.max_entries,
+            "disk_entries": disk_entries,
+            "disk_max_entries": self.disk.max_entries if self.disk is not None else None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.memory.evictions + (self.disk.evictions if self.disk is not None else 0),
+            "encode_calls": self.encode_calls,
+            "encode_seconds": round(self.encode_seconds, 3),
+        }
+
+class CachedEncoder:
+    """Drop-in for SentenceTransformer.encode() that goes through an EmbeddingStore.
+
+    The store holds the model's raw output; normalize_embeddings is applied on the way out.
+    """
+
+    def __init__(self, model, model_name, store, logger=None):
+        self.model = model
+        self.model_name = model_name
+        self.store = store
+        self.logger = logger
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = self.store.encode(self.model, self.model_name, texts, batch_size=batch_size, logger=self.logger)
+        if normalize_embeddings and len(vectors):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+        return vectors[0] if single else vectors
+
+_store = None # Configured by init_app()
+
+def init_app(app):
+    """Creates the embedding store from app.config (EMBEDDING_CACHE_BACKEND: 'sqlite', 'memory' or 'none')."""
+    global _store
+    backend_name = app.config.get('EMBEDDING_CACHE_BACKEND', 'sqlite')
+    if not backend_name or backend_name == 'none':
+        _store = None
+        app.logger.info("Embedding cache disabled.")
+        return
+    disk_backend = None
+    if backend_name == 'sqlite':
+        try:
+            disk_backend = SQLiteEmbeddingBackend(app.config.get('LOCAL_CACHE_DB_PATH'),
+                                                  max_entries=app.config.get('EMBEDDING_CACHE_DISK_ENTRIES', 200_000))
+        except Exception as e:
+            app.logger.error(f"Could not open embedding cache database: {e}. Using the in-process cache only.", exc_info=True)
+    elif backend_name != 'memory':
+        app.logger.error(f"Unknown EMBEDDING_CACHE_BACKEND '{backend_name}'. Using the in-process cache only.")
+    _store = EmbeddingStore(memory_entries=app.config.get('EMBEDDING_CACHE_MEMORY_ENTRIES', 4096), disk_backend=disk_backend)
+    app.logger.info(f"Embedding cache enabled: backend={'sqlite' if disk_backend else 'memory'}, memory_entries={_store.memory.max_entries}")
+
+def get_embedding_store():
+    return _store
+
+def wrap_encoder(model, model_name, logger=None):
+    """The model behind the embedding cache, or the model itself when the cache is disabled."""
+    if _store is None or model is None:
+        return model
+    return CachedEncoder(model, model_name, _store, logger=logger)
+
+def get_embedding_cache_stats():
+    if _store is None:
+        return {"backend": "disabled"}
+    return _store.stats()
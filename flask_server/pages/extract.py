@@ -1,15 +1,230 @@
 # flask_server/pages/extract.py
+# Resume PDF text extraction.
+#   limits    uploads over PDF_MAX_BYTES or PDF_MAX_PAGES are rejected (PDFLimitError) before any page is parsed
+#   cache     text by SHA-256 of the uploaded bytes ('pdf_text' namespace of the local result cache), so the
+#             same resume uploaded again to /api/match_score or /api/generate_resume skips extraction entirely
+#   parallel  opt-in (PDF_WORKERS > 1): documents with PDF_PARALLEL_MIN_PAGES pages or more are split into page
+#             ranges of PDF_PAGES_PER_TASK, extracted in a process pool (created on first use). Every task
+#             re-parses the whole file, so this only pays off for PDFs whose pages are slow to extract;
+#             `python -m flask_server.pages.extract benchmark FILE.pdf` compares both paths on a given file.
+# Each page's extract_text() runs exactly once.
+import argparse
+import hashlib
+import io
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
 import PyPDF2
 
+from .result_cache import ResultCache, create_cache_backend, make_cache_key
+
+class PDFLimitError(ValueError):
+    """The upload exceeds PDF_MAX_BYTES or PDF_MAX_PAGES."""
+
+_settings = {
+    "max_bytes": 10 * 1024 * 1024,
+    "max_pages": 50,
+    "parallel_min_pages": 16,
+    "pages_per_task": 8,
+    "workers": 1,
+    "timeout_seconds": 60,
+}
+_text_cache = None # Configured by init_app()
+_pool = None
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"documents": 0, "cache_hits": 0, "parallel_documents": 0, "pages": 0, "rejected": 0, "extract_seconds": 0.0}
+
+def init_app(app):
+    global _text_cache
+    _settings["max_bytes"] = app.config.get('PDF_MAX_BYTES', _settings["max_bytes"])
+    _settings["max_pages"] = app.config.get('PDF_MAX_PAGES', _settings["max_pages"])
+    _settings["parallel_min_pages"] = app.config.get('PDF_PARALLEL_MIN_PAGES', _settings["parallel_min_pages"])
+    _settings["pages_per_task"] = max(1, app.config.get('PDF_PAGES_PER_TASK', _settings["pages_per_task"]))
+    _settings["workers"] = app.config.get('PDF_WORKERS', _settings["workers"])
+    _settings["timeout_seconds"] = app.config.get('PDF_EXTRACT_TIMEOUT_SECONDS', _settings["timeout_seconds"])
+
+    backend_name = app.config.get('PDF_TEXT_CACHE_BACKEND', 'sqlite')
+    if not backend_name or backend_name == 'none':
+        _text_cache = None
+        return
+    try:
+        backend = create_cache_backend(backend_name, namespace='pdf_text',
+                                       max_entries=app.config.get('PDF_TEXT_CACHE_MAX_ENTRIES', 2000),
+                                       sqlite_path=app.config.get('LOCAL_CACHE_DB_PATH'))
+    except Exception as e:
+        app.logger.error(f"Could not create PDF text cache ({backend_name}): {e}. Extraction results will not be cached.", exc_info=True)
+        _text_cache = None
+        return
+    _text_cache = ResultCache(backend, ttl_seconds=app.config.get('PDF_TEXT_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+
+def _extract_pages(pages):
+    texts = []
+    for page in pages:
+        text = page.extract_text()
+        if text:
+            texts.append(text)
+    return texts
+
+def _extract_page_range(data, start, stop):
+    """Process-pool task: text of pages [start, stop) of the PDF in data."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return _extract_pages(reader.pages[start:stop])
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver/spawn: forking a threaded server process can deadlock the child
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                # The default preload imports __main__ into the fork server, whose process name is still
+                # 'MainProcess'; an entry module that calls create_app() would start the app's threads there
+                context.set_forkserver_preload(['PyPDF2'])
+            _pool = ProcessPoolExecutor(max_workers=_settings["workers"], mp_context=context)
+        return _pool
+
+def _reset_pool(terminate=False):
+    """Drops the pool; with terminate, also kills its processes (a worker stuck on a page would otherwise
+    keep running and hold its slot)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            processes = list((getattr(_pool, '_processes', None) or {}).values()) if terminate else []
+            _pool.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+            _pool = None
+
+def _extract_parallel(data, n_pages, logger):
+    step = _settings["pages_per_task"]
+    futures = [_get_pool().submit(_extract_page_range, data, start, min(start + step, n_pages))
+               for start in range(0, n_pages, step)]
+    texts = []
+    try:
+        for future in futures: # Submission order is page order
+            texts.extend(future.result(timeout=_settings["timeout_seconds"]))
+    except FutureTimeoutError:
+        logger.error(f"PDF extraction timed out after {_settings['timeout_seconds']}s; restarting the process pool.")
+        _reset_pool(terminate=True)
+        raise
+    return texts
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+def _read_upload(file_stream):
+    max_bytes = _settings["max_bytes"]
+    data = file_stream.read(max_bytes + 1) if max_bytes else file_stream.read()
+    if max_bytes and len(data) > max_bytes:
+        _count(rejected=1)
+        raise PDFLimitError(f"PDF is larger than the {max_bytes // 1024} KB limit.")
+    return data
+
 def extract_text_from_pdf(file_stream, logger):
-    # ... (your existing code, ensure it uses the passed logger) ...
-    try:
-        pdf_reader = PyPDF2.PdfReader(file_stream)
-        text_parts = [page.extract_text() for page in pdf_reader.pages if page.extract_text()]
-        if not text_parts:
-            logger.warning("No text extracted from PDF or PDF is empty.")
-            return ""
-        return "\n".join(text_parts).strip()
+    data = _read_upload(file_stream)
+    digest = hashlib.sha256(data).hexdigest()
+    cache_key = make_cache_key("pdf_text", PyPDF2.__version__, digest)
+    if _text_cache is not None:
+        try:
+            cached = _text_cache.get(cache_key)
+        except Exception as e:
+            cached = None
+            logger.warning(f"PDF text cache read failed: {e}")
+        if cached is not None:
+            _count(documents=1, cache_hits=1)
+            logger.debug(f"PDF text cache hit for {digest[:12]}.")
+            return cached
+
+    start = time.perf_counter()
+    try:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        n_pages = len(pdf_reader.pages)
+        max_pages = _settings["max_pages"]
+        if max_pages and n_pages > max_pages:
+            _count(rejected=1)
+            raise PDFLimitError(f"PDF has {n_pages} pages; the limit is {max_pages}.")
+        parallel = _settings["workers"] > 1 and n_pages >= _settings["parallel_min_pages"]
+        if parallel:
+            try:
+                text_parts = _extract_parallel(data, n_pages, logger)
+            except BrokenProcessPool as e:
+                logger.warning(f"PDF process pool failed ({e}); extracting in-process.")
+                _reset_pool()
+                parallel = False
+                text_parts = _extract_pages(pdf_reader.pages)
+        else:
+            text_parts = _extract_pages(pdf_reader.pages)
+    except PDFLimitError:
+        raise
     except Exception as e:
         logger.error(f"Error reading PDF: {e}", exc_info=True)
-        raise ValueError(f"Could not process PDF: {e}")
\ No newline at end of file
+        raise ValueError(f"Could not process PDF: {e}")
+    elapsed = time.perf_counter() - start
+    _count(documents=1, parallel_documents=int(parallel), pages=n_pages, extract_seconds=elapsed)
+    logger.debug(f"Extracted {n_pages} PDF pages in {elapsed:.3f}s{' (process pool)' if parallel else ''}.")
+
+    text = "\n".join(text_parts).strip() if text_parts else ""
+    if not text:
+        logger.warning("No text extracted from PDF or PDF is empty.")
+    if _text_cache is not None:
+        try:
+            _text_cache.set(cache_key, text)
+        except Exception as e:
+            logger.warning(f"PDF text cache write failed: {e}")
+    return text
+
+def get_pdf_extraction_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["extract_seconds"] = round(stats["extract_seconds"], 3)
+    stats["limits"] = {"max_bytes": _settings["max_bytes"], "max_pages": _settings["max_pages"]}
+    stats["cache"] = _text_cache.stats() if _text_cache is not None else {"backend": "disabled"}
+    return stats
+
+def _time_extraction(data, runs, parallel):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if parallel:
+            _extract_parallel(data, len(PyPDF2.PdfReader(io.BytesIO(data)).pages), None)
+        else:
+            _extract_pages(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def benchmark(path, workers=4, pages_per_task=8, runs=5):
+    """Serial vs process-pool extraction of one PDF; the pool's first run includes starting its processes."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    _settings["workers"], _settings["pages_per_task"] = workers, max(1, pages_per_task)
+    serial = _time_extraction(data, runs, parallel=False)
+    try:
+        pool = _time_extraction(data, runs + 1, parallel=True)
+    finally:
+        _reset_pool()
+    n_pages = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+    print(f"{path}: {n_pages} pages, {len(data) // 1024} KB")
+    print(f"  serial                   best {min(serial):.3f}s  mean {sum(serial) / len(serial):.3f}s")
+    print(f"  pool ({workers} workers) first  {pool[0]:.3f}s (includes process start-up)")
+    print(f"  pool ({workers} workers) warm   best {min(pool[1:]):.3f}s  mean {sum(pool[1:]) / len(pool[1:]):.3f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume PDF extraction tools.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench = subparsers.add_parser('benchmark', help="Compare serial and process-pool extraction of a PDF")
+    bench.add_argument('pdf')
+    bench.add_argument('--workers', type=int, default=4)
+    bench.add_argument('--pages-per-task', type=int, default=8)
+    bench.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+    benchmark(args.pdf, workers=args.workers, pages_per_task=args.pages_per_task, runs=args.runs)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# flask_server/pages/fake_adzuna.py
+# A stand-in for the Adzuna search API (GET /v1/api/jobs/<country>/search/<page>) for local runs and for trying
+# fetch_data.py's timeouts, retries and circuit breaker without spending API quota. Each response has the
+# Adzuna shape ({"count", "results": [{id, title, company, location, description, redirect_url, ...}]}).
+# Failure modes, settable from the command line or on the server object while it runs:
+#   latency_seconds   delay before every response (set it above ADZUNA_READ_TIMEOUT_SECONDS to force timeouts)
+#   fail_status       answer every request with this status (e.g. 503) ...
+#   fail_next         ... or only the next n requests
+#   retry_after       Retry-After header sent with failures
+#
+#   python -m flask_server.pages.fake_adzuna --port 8765 --fail-status 503 --retry-after 1
+#   ADZUNA_BASE_URL=http://127.0.0.1:8765/v1/api/jobs ADZUNA_APP_ID=x ADZUNA_APP_KEY=x flask run
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_SEARCH_PATH = re.compile(r"^/v1/api/jobs/(?P<country>[a-z]{2})/search/(?P<page>\d+)$")
+_TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Frontend Developer", "DevOps Engineer",
+           "Machine Learning Engineer", "QA Engineer", "Full Stack Developer"]
+_COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TOTAL_RESULTS = 480
+
+class FakeAdzunaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_seconds=0.0, fail_status=None, fail_next=0, retry_after=None):
+        super().__init__(address, _Handler)
+        self.latency_seconds = latency_seconds
+        self.fail_status = fail_status
+        self.fail_next = fail_next
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def handle_error(self, request, client_address):
+        pass # Clients that gave up on a slow response (read timeouts) are expected here
+
+    def next_failure(self):
+        """The status to fail the current request with, or None."""
+        with self.lock:
+            self.requests += 1
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return self.fail_status or 503
+            return self.fail_status
+
+def _jobs(country, page, what, where, per_page):
+    results = []
+    for i in range(per_page):
+        n = (page - 1) * per_page + i
+        if n >= TOTAL_RESULTS:
+            break
+        job_id = str(int(hashlib.sha1(f"{country}/{what}/{where}/{n}".encode()).hexdigest()[:10], 16))
+        title = f"{_TITLES[n % len(_TITLES)]}" + (f" ({what})" if what else "")
+        results.append({
+            "id": job_id,
+            "title": title,
+            "company": {"display_name": _COMPANIES[n % len(_COMPANIES)]},
+            "location": {"display_name": where or country.upper()},
+            "description": f"{title} wanted. Work with Python, SQL and cloud services on a team of {3 + n % 9}.",
+            "redirect_url": f"https://example.com/jobs/{job_id}",
+            "created": "2026-01-01T00:00:00Z",
+            "salary_min": 60000 + 1000 * (n % 40),
+        })
+    return results
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, so connection reuse by the client is visible in server.connections
+    disable_nagle_algorithm = True # Headers and body go out in separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _send_json(self, body, status=200, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        match = _SEARCH_PATH.match(url.path)
+        if not match:
+            return self._send_json({"exception": "NOT_FOUND"}, 404)
+        if server.latency_seconds:
+            time.sleep(server.latency_seconds)
+        status = server.next_failure()
+        if status:
+            headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else None
+            return self._send_json({"exception": "UNAVAILABLE", "display": "Service unavailable"}, status, headers)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if not query.get("app_id") or not query.get("app_key"):
+            return self._send_json({"exception": "AUTH_FAIL", "display": "Authorisation failed"}, 401)
+        per_page = min(50, int(query.get("results_per_page", 20)))
+        results = _jobs(match.group("country"), int(match.group("page")), query.get("what", ""), query.get("where", ""), per_page)
+        self._send_json({"count": TOTAL_RESULTS, "mean": 75000, "results": results})
+
+def start_fake_adzuna(host="127.0.0.1", port=8765, **options):
+    """Starts a FakeAdzunaServer in a daemon thread and returns it (port=0 picks a free port: server.server_address)."""
+    server = FakeAdzunaServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="fake-adzuna", daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in Adzuna search API for local runs.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds before every response")
+    parser.add_argument('--fail-status', type=int, help="Fail every request with this HTTP status (e.g. 503, 429)")
+    parser.add_argument('--retry-after', help="Retry-After value sent with failures")
+    args = parser.parse_args(argv)
+    server = FakeAdzunaServer((args.host, args.port), latency_seconds=args.latency, fail_status=args.fail_status,
+                              retry_after=args.retry_after)
+    print(f"Fake Adzuna listening on http://{args.host}:{server.server_address[1]}/v1/api/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# flask_server/pages/fake_ollama.py
+# A stand-in Ollama server for local runs and benchmarks without a GPU or downloaded models. It speaks the parts
+# of the API this app uses: POST /api/chat (streamed NDJSON or one JSON object), POST /api/generate (an empty
+# prompt only loads the model), GET /api/ps, /api/tags and /api/version. It behaves like the real server where
+# that matters for latency:
+#   - a model that is not resident takes --load-seconds to load and stays loaded for the request's keep_alive
+#     ('30m', '10s', seconds as a number, -1 forever, 0 unload at once; default 5m)
+#   - replies come out at --tokens-per-second (one "token" per word), at most --parallel generations at a time
+#   - responses carry prompt_eval_count, eval_count and the *_duration fields in nanoseconds
+#
+#   python -m flask_server.pages.fake_ollama --port 11434 --load-seconds 3
+#   OLLAMA_HOST=http://127.0.0.1:11434 flask run
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "TECHNICAL: Explain how you would design a REST API for a job board.\n"
+    "TECHNICAL: How do you find and fix a slow database query?\n"
+    "TECHNICAL: What are the trade-offs of caching API responses?\n"
+    "BEHAVIORAL: Tell me about a time you disagreed with a teammate.\n"
+    "BEHAVIORAL: Describe a project you are proud of.\n"
+    "SITUATIONAL: Production is down on a Friday evening; what do you do first?\n"
+    "SITUATIONAL: A stakeholder asks for a feature that conflicts with the roadmap; how do you respond?\n"
+)
+_DURATION = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+def _keep_alive_seconds(value):
+    """Seconds the model stays loaded after a request (None: forever)."""
+    if value is None:
+        return 300.0
+    match = _DURATION.match(str(value))
+    if not match:
+        return 300.0
+    seconds = float(match.group(1)) * _UNITS[match.group(2)]
+    return None if seconds < 0 else seconds
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, reply=DEFAULT_REPLY, load_seconds=2.0, tokens_per_second=50.0, parallel=4):
+        super().__init__(address, _Handler)
+        self.reply = reply
+        self.load_seconds = load_seconds
+        self.tokens_per_second = tokens_per_second
+        self.slots = threading.BoundedSemaphore(max(1, parallel))
+        self.lock = threading.Lock()
+        self.resident = {} # model -> expiry time (None: never)
+        self.loads = 0
+        self.requests = 0
+
+    def ensure_loaded(self, model, keep_alive):
+        """Seconds spent loading model (0.0 if it was resident); sets its expiry from keep_alive."""
+        with self.lock:
+            now = time.time()
+            expiry = self.resident.get(model, 0.0)
+            resident = model in self.resident and (expiry is None or expiry > now)
+            if not resident:
+                self.loads += 1
+                time.sleep(self.load_seconds) # Loads are serialized, as on a single GPU
+            keep = _keep_alive_seconds(keep_alive)
+            if keep == 0:
+                self.resident.pop(model, None)
+            else:
+                self.resident[model] = None if keep is None else time.time() + keep
+            return 0.0 if resident else self.load_seconds
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive connections, as the real server
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        if self.path == "/api/version":
+            return self._send_json({"version": "0.0.0-fake"})
+        if self.path in ("/api/ps", "/api/tags"):
+            with server.lock:
+                now = time.time()
+                models = [name for name, expiry in server.resident.items() if expiry is None or expiry > now]
+            return self._send_json({"models": [{"name": name, "model": name} for name in models]})
+        self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json({"error": "invalid JSON"}, 400)
+        if self.path == "/api/chat":
+            prompt = " ".join(message.get("content", "") for message in body.get("messages") or [])
+            return self._generate(body, prompt, "message")
+        if self.path == "/api/generate":
+            return self._generate(body, body.get("prompt") or "", "response")
+        self._send_json({"error": "not found"}, 404)
+
+    def _chunk(self, body, field, text, done, **extra):
+        content = {"role": "assistant", "content": text} if field == "message" else text
+        return {"model": body.get("model", ""), "created_at": datetime.now(timezone.utc).isoformat(),
+                field: content, "done": done, **extra}
+
+    def _generate(self, body, prompt, field):
+        server = self.server
+        model = body.get("model")
+        if not model:
+            return self._send_json({"error": "model is required"}, 400)
+        started = time.perf_counter()
+        with server.slots:
+            with server.lock:
+                server.requests += 1
+            load_seconds = server.ensure_loaded(model, body.get("keep_alive"))
+            words = server.reply.split(" ") if prompt else []
+            tokens = [word + " " for word in words[:-1]] + words[-1:]
+            delay = 1.0 / server.tokens_per_second if server.tokens_per_second > 0 else 0.0
+            stream = body.get("stream", True) and prompt
+            if stream:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+            eval_started = time.perf_counter()
+            for token in tokens:
+                time.sleep(delay)
+                if stream:
+                    self._write_chunk(self._chunk(body, field, token, False))
+            eval_seconds = time.perf_counter() - eval_started
+        final = {
+            "done_reason": "stop" if prompt else "load",
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": int(load_seconds * 1e9),
+            "prompt_eval_count": len(prompt.split()),
+            "prompt_eval_duration": 0,
+            "eval_count": len(tokens),
+            "eval_duration": int(eval_seconds * 1e9),
+        }
+        if stream:
+            self._write_chunk(self._chunk(body, field, "", True, **final))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self._send_json(self._chunk(body, field, "".join(tokens), True, **final))
+
+    def _write_chunk(self, obj):
+        data = (json.dumps(obj) + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+def start_fake_ollama(host="127.0.0.1", port=11434, **options):
+    """Starts a FakeOllamaServer in a daemon thread and returns it (port=0 picks a free port: server.server_address)."""
+    server = FakeOllamaServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="fake-ollama", daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in Ollama server for local runs and benchmarks.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--load-seconds', type=float, default=2.0, help="Time to load a model that is not resident")
+    parser.add_argument('--tokens-per-second', type=float, default=50.0)
+    parser.add_argument('--parallel', type=int, default=4, help="Generations served at once (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument('--reply-file', help="Text to reply with instead of the built-in interview questions")
+    args = parser.parse_args(argv)
+    reply = DEFAULT_REPLY
+    if args.reply_file:
+        with open(args.reply_file, encoding='utf-8') as f:
+            reply = f.read()
+    server = FakeOllamaServer((args.host, args.port), reply=reply, load_seconds=args.load_seconds,
+                              tokens_per_second=args.tokens_per_second, parallel=args.parallel)
+    print(f"Fake Ollama listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,205 @@
 # flask_server/pages/fetch_data.py
-import requests
+# Adzuna job search over one pooled requests.Session per process:
+#   pool     keep-alive connections (ADZUNA_POOL_SIZE per host), so repeat searches skip the TCP/TLS handshake
+#   timeouts ADZUNA_CONNECT_TIMEOUT_SECONDS / ADZUNA_READ_TIMEOUT_SECONDS; a slow upstream no longer holds a worker
+#   retries  connection errors, timeouts, 429 and 5xx are retried up to ADZUNA_MAX_RETRIES times with exponential
+#            backoff, or after the response's Retry-After when it is no longer than ADZUNA_MAX_RETRY_AFTER_SECONDS
+#   breaker  after ADZUNA_BREAKER_FAILURES failed searches in a row, searches fail at once (AdzunaUnavailable)
+#            for ADZUNA_BREAKER_RESET_SECONDS; then one trial search decides whether to close it again
+# `python -m flask_server.pages.fake_adzuna` is a local stand-in (ADZUNA_BASE_URL=http://127.0.0.1:8765/v1/api/jobs).
+import email.utils
 import json
-import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
 # from dotenv import load_dotenv # No need to load .env here, config.py does it
 
 # ADZUNA_APP_ID and ADZUNA_APP_KEY will be accessed from app.config now
 
-def fetch_adzuna_jobs(app_id, app_key, logger, country_code="in", page=1, keywords="python", location="india"):
-    if not app_id or not app_key:
-        logger.error("Error: ADZUNA_APP_ID and ADZUNA_APP_KEY must be provided.")
-        return [], 0
+DEFAULT_BASE_URL = "http://api.adzuna.com/v1/api/jobs"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class AdzunaError(Exception):
+    """The search failed: bad request, bad credentials or an unreadable response."""
+
+class AdzunaUnavailable(AdzunaError):
+    """Adzuna is unreachable, timing out, rate limiting or failing, or the circuit breaker is open.
+    retry_after is the number of seconds until the next attempt makes sense (None if unknown)."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open after failure_threshold failures -> half-open after
+    reset_seconds (one trial call at a time) -> closed on success, open again on failure."""
+
+    def __init__(self, failure_threshold=5, reset_seconds=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self.times_opened = 0
+
+    def allow(self):
+        """True if a call may go out now. In half-open state only one caller gets True until it reports back."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def retry_after(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.times_opened += 1
+                self._opened_at = time.monotonic() # A failed trial starts a new open period
+            self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_seconds else "open"
 
-    BASE_URL = "http://api.adzuna.com/v1/api/jobs"
-    url = f"{BASE_URL}/{country_code}/search/{page}"
+_settings = {
+    "base_url": DEFAULT_BASE_URL,
+    "connect_timeout": 3.05,
+    "read_timeout": 10.0,
+    "max_retries": 2,
+    "backoff_seconds": 0.5,
+    "max_retry_after_seconds": 5.0,
+    "pool_size": 10,
+}
+_session = None # Created on first use (after init_app) and shared by all threads
+_session_lock = threading.Lock()
+_breaker = CircuitBreaker()
+_stats_lock = threading.Lock()
+_stats = {"searches": 0, "failed": 0, "short_circuited": 0, "attempts": 0, "retries": 0, "upstream_seconds": 0.0}
 
+def init_app(app):
+    global _session, _breaker
+    _settings["base_url"] = (app.config.get('ADZUNA_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+    _settings["connect_timeout"] = app.config.get('ADZUNA_CONNECT_TIMEOUT_SECONDS', _settings["connect_timeout"])
+    _settings["read_timeout"] = app.config.get('ADZUNA_READ_TIMEOUT_SECONDS', _settings["read_timeout"])
+    _settings["max_retries"] = max(0, app.config.get('ADZUNA_MAX_RETRIES', _settings["max_retries"]))
+    _settings["backoff_seconds"] = app.config.get('ADZUNA_BACKOFF_SECONDS', _settings["backoff_seconds"])
+    _settings["max_retry_after_seconds"] = app.config.get('ADZUNA_MAX_RETRY_AFTER_SECONDS', _settings["max_retry_after_seconds"])
+    _settings["pool_size"] = max(1, app.config.get('ADZUNA_POOL_SIZE', _settings["pool_size"]))
+    _breaker = CircuitBreaker(app.config.get('ADZUNA_BREAKER_FAILURES', 5), app.config.get('ADZUNA_BREAKER_RESET_SECONDS', 30.0))
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are done in _get() so Retry-After and the breaker see every attempt
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=_settings["pool_size"], max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            _session = session
+        return _session
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+def _retry_after_seconds(response):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _backoff(attempt):
+    base = _settings["backoff_seconds"] * (2 ** attempt)
+    return base + random.uniform(0, base / 2) # Jitter, so workers that failed together do not retry together
+
+def _get(url, params, logger):
+    """response.json() of a successful GET, retrying transient failures. Raises AdzunaUnavailable or AdzunaError."""
+    session = _get_session()
+    timeout = (_settings["connect_timeout"], _settings["read_timeout"])
+    max_retries = _settings["max_retries"]
+    for attempt in range(max_retries + 1):
+        _count(attempts=1)
+        started = time.perf_counter()
+        retry_after = None
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+            problem = f"HTTP {response.status_code}" if response.status_code in RETRY_STATUSES else None
+            if problem:
+                retry_after = _retry_after_seconds(response)
+                response.close() # Back to the pool for the retry
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            response, problem = None, f"{type(e).__name__}: {e}"
+        except requests.exceptions.RequestException as e:
+            raise AdzunaError(f"Error fetching jobs from Adzuna: {e}") from None
+        finally:
+            _count(upstream_seconds=time.perf_counter() - started)
+
+        if problem is None:
+            try:
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.HTTPError as e:
+                raise AdzunaError(f"Adzuna rejected the search: {e}") from None
+            except json.JSONDecodeError:
+                raise AdzunaError("Error decoding JSON from Adzuna.") from None
+
+        if attempt == max_retries:
+            raise AdzunaUnavailable(f"Adzuna search failed after {attempt + 1} attempts: {problem}", retry_after)
+        if retry_after is not None and retry_after > _settings["max_retry_after_seconds"]:
+            raise AdzunaUnavailable(f"Adzuna asked to retry after {retry_after:.0f}s: {problem}", retry_after)
+        delay = retry_after if retry_after is not None else _backoff(attempt)
+        logger.warning(f"Adzuna search attempt {attempt + 1} failed ({problem}); retrying in {delay:.2f}s.")
+        _count(retries=1)
+        time.sleep(delay)
+
+def search_adzuna_jobs(app_id, app_key, logger, country_code="in", page=1, keywords="python", location="india"):
+    """Returns (results, count). Raises AdzunaUnavailable (transient; the breaker may be open) or AdzunaError."""
+    if not app_id or not app_key:
+        raise AdzunaError("ADZUNA_APP_ID and ADZUNA_APP_KEY must be provided.")
+    _count(searches=1)
+    if not _breaker.allow():
+        _count(short_circuited=1)
+        raise AdzunaUnavailable("Adzuna circuit breaker is open.", _breaker.retry_after())
+
+    url = f"{_settings['base_url']}/{country_code}/search/{page}"
     search_params = {
         "app_id": app_id,
         "app_key": app_key,
@@ -23,15 +209,36 @@ def fetch_adzuna_jobs(app_id, app_key, logger, country_code="in", page=1, keywor
         "sort_by": "date",
         "content-type": "application/json"
     }
-    logger.info(f"Fetching Adzuna jobs from: {url} with params: {search_params}")
+    logger.info(f"Fetching Adzuna jobs from: {url} with params: {dict(search_params, app_key='***')}")
     try:
-        response = requests.get(url, params=search_params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("results", []), data.get("count", 0)
-    except requests.exceptions.RequestException as e:
+        data = _get(url, search_params, logger)
+    except AdzunaUnavailable:
+        _count(failed=1)
+        _breaker.record_failure()
+        raise
+    except AdzunaError:
+        _count(failed=1)
+        _breaker.record_success() # Adzuna answered; the request itself was wrong
+        raise
+    except Exception:
+        _count(failed=1)
+        _breaker.record_failure()
+        raise
+    _breaker.record_success()
+    return data.get("results", []), data.get("count", 0)
+
+def fetch_adzuna_jobs(app_id, app_key, logger, country_code="in", page=1, keywords="python", location="india"):
+    try:
+        return search_adzuna_jobs(app_id, app_key, logger, country_code=country_code, page=page,
+                                  keywords=keywords, location=location)
+    except AdzunaError as e:
         logger.error(f"Error fetching jobs from Adzuna: {e}")
         return [], 0
-    except json.JSONDecodeError:
-        logger.error(f"Error decoding JSON from Adzuna.")
-        return [], 0
\ No newline at end of file
+
+def get_adzuna_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["upstream_seconds"] = round(stats["upstream_seconds"], 3)
+    stats["breaker"] = {"state": _breaker.state, "times_opened": _breaker.times_opened,
+                        "retry_after_seconds": round(_breaker.retry_after(), 1)}
+    return stats
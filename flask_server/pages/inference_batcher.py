@@ -0,0 +1,243 @@
+# flask_server/pages/inference_batcher.py
+# Cross-request micro-batching for SBERT. Request threads no longer call SentenceTransformer.encode() themselves;
+# they queue their texts and wait. One worker thread takes whatever is queued, up to SBERT_BATCH_MAX_SIZE texts,
+# waiting at most SBERT_BATCH_MAX_WAIT_MS after the first request for others to arrive. It runs a single forward
+# pass and hands each request its rows. On CPU, one batch of 32 costs far less than 32 batches of 1, and only one
+# thread uses torch's intra-op pool at a time.
+# Order in app.config['SBERT_MODEL']: CachedEncoder (embedding_cache.py) -> MicroBatcher -> SentenceTransformer,
+# so texts that are already cached never enter the queue.
+#
+#   python -m flask_server.pages.inference_batcher --threads 16 --requests 400
+#
+# compares direct and batched encode throughput under concurrent callers.
+import argparse
+import bisect
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128) # Histogram upper bounds, in texts per forward pass
+_RECENT_SAMPLES = 2048 # Wait times kept for percentiles
+
+class _EncodeRequest:
+    __slots__ = ('texts', 'future', 'enqueued_at')
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class MicroBatcher:
+    """Drop-in for SentenceTransformer.encode() that merges concurrent calls into shared forward passes."""
+
+    def __init__(self, model, max_batch_size=32, max_wait_ms=5.0, logger=None):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.logger = logger
+        self._queue = collections.deque()
+        self._queued_texts = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        # Metrics (guarded by _condition)
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.errors = 0
+        self.encode_seconds = 0.0
+        self.max_queue_depth = 0
+        self._batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._waits = collections.deque(maxlen=_RECENT_SAMPLES)
+        self._worker = threading.Thread(target=self._run, name="sbert-batcher", daemon=True)
+        self._worker.start()
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        request = _EncodeRequest(texts)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SBERT batcher is closed.")
+            self._queue.append(request)
+            self._queued_texts += len(texts)
+            self.max_queue_depth = max(self.max_queue_depth, self._queued_texts)
+            self._condition.notify()
+        vectors = request.future.result()
+        if normalize_embeddings and len(vectors):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+        return vectors[0] if single else vectors
+
+    def _next_batch(self):
+        """Blocks for the first request, then gathers more until the batch is full or max_wait has passed."""
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return None
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while self._queued_texts < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, size = [], 0
+            # A request is never split; one larger than max_batch_size runs as its own batch
+            while self._queue and (not batch or size + len(self._queue[0].texts) <= self.max_batch_size):
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            self._queued_texts -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                encoded = np.atleast_2d(np.asarray(self.model.encode(texts, batch_size=max(len(texts), 1), convert_to_numpy=True,
+                                                                     show_progress_bar=False), dtype=np.float32))
+                error = None
+            except Exception as e:
+                error = e
+                if self.logger: self.logger.error(f"SBERT batch of {len(texts)} texts failed: {e}", exc_info=True)
+            elapsed = time.perf_counter() - started
+
+            offset = 0
+            for request in batch:
+                if error is None:
+                    request.future.set_result(encoded[offset:offset + len(request.texts)])
+                else:
+                    request.future.set_exception(error)
+                offset += len(request.texts)
+
+            with self._condition:
+                self.batches += 1
+                self.requests += len(batch)
+                self.texts += len(texts)
+                self.encode_seconds += elapsed
+                self.errors += error is not None
+                self._batch_size_counts[bisect.bisect_left(BATCH_SIZE_BUCKETS, len(texts))] += 1
+                self._waits.extend(started - request.enqueued_at for request in batch)
+
+    def close(self):
+        """Stops the worker once the queued requests have been served."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join()
+
+    def stats(self):
+        with self._condition:
+            waits_ms = np.array(self._waits) * 1000.0
+            counts = list(self._batch_size_counts)
+            queue_requests, queue_texts = len(self._queue), self._queued_texts
+            stats = {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000.0, 3),
+                "queue_depth_requests": queue_requests,
+                "queue_depth_texts": queue_texts,
+                "max_queue_depth_texts": self.max_queue_depth,
+                "requests": self.requests,
+                "texts": self.texts,
+                "batches": self.batches,
+                "errors": self.errors,
+                "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "encode_seconds": round(self.encode_seconds, 3),
+            }
+        labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        stats["batch_size_histogram"] = dict(zip(labels, counts))
+        stats["wait_ms"] = {
+            "samples": int(waits_ms.size),
+            "mean": round(float(waits_ms.mean()), 3) if waits_ms.size else None,
+            "p50": round(float(np.percentile(waits_ms, 50)), 3) if waits_ms.size else None,
+            "p95": round(float(np.percentile(waits_ms, 95)), 3) if waits_ms.size else None,
+            "max": round(float(waits_ms.max()), 3) if waits_ms.size else None,
+        }
+        return stats
+
+_batcher = None # The batcher wrapped around the loaded model, if any
+_settings = {"enabled": True, "max_batch_size": 32, "max_wait_ms": 5.0}
+
+def init_app(app):
+    _settings["enabled"] = app.config.get('SBERT_BATCHING_ENABLED', True)
+    _settings["max_batch_size"] = app.config.get('SBERT_BATCH_MAX_SIZE', 32)
+    _settings["max_wait_ms"] = app.config.get('SBERT_BATCH_MAX_WAIT_MS', 5.0)
+
+def wrap_batcher(model, logger=None):
+    """The model behind a MicroBatcher, or the model itself when batching is disabled or it failed to load."""
+    global _batcher
+    if model is None or not _settings["enabled"]:
+        return model
+    if _batcher is not None:
+        _batcher.close()
+    _batcher = MicroBatcher(model, max_batch_size=_settings["max_batch_size"], max_wait_ms=_settings["max_wait_ms"], logger=logger)
+    if logger: logger.info(f"SBERT micro-batching enabled: max_batch_size={_batcher.max_batch_size}, max_wait_ms={_settings['max_wait_ms']}")
+    return _batcher
+
+def get_batcher_stats():
+    if _batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **_batcher.stats()}
+
+def _throughput(encoder, texts, threads):
+    """Texts per second with `threads` callers each encoding one text per call, as /api/match_score handlers do."""
+    position = iter(range(len(texts)))
+    lock = threading.Lock()
+
+    def caller():
+        while True:
+            with lock:
+                index = next(position, None)
+            if index is None:
+                return
+            encoder.encode(texts[index])
+
+    workers = [threading.Thread(target=caller) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers: worker.start()
+    for worker in workers: worker.join()
+    return len(texts) / (time.perf_counter() - start)
+
+def main(argv=None):
+    import logging
+    from .load_model import load_bert_model
+    parser = argparse.ArgumentParser(description="Compare direct and micro-batched SBERT encode throughput under concurrent callers.")
+    parser.add_argument('--threads', type=int, default=16, help="Concurrent callers")
+    parser.add_argument('--requests', type=int, default=400, help="Texts to encode, one per call")
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger("inference_batcher")
+    model, loaded = load_bert_model(logger)
+    if not loaded:
+        raise SystemExit("SBERT model could not be loaded (is sentence-transformers installed?).")
+    texts = [f"Candidate {i}: experienced engineer with skills in python, data analysis and cloud platform {i % 37}."
+             for i in range(args.requests)]
+    model.encode(texts[:8]) # Warm the model before timing
+
+    direct = _throughput(model, texts, args.threads)
+    batcher = MicroBatcher(model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    batched = _throughput(batcher, texts, args.threads)
+    stats = batcher.stats()
+    batcher.close()
+
+    print(f"{'mode':<10} {'texts/s':>10}")
+    print(f"{'direct':<10} {direct:>10.1f}")
+    print(f"{'batched':<10} {batched:>10.1f}   ({batched / direct:.2f}x)")
+    print(f"mean batch size {stats['mean_batch_size']}, wait p50 {stats['wait_ms']['p50']} ms, p95 {stats['wait_ms']['p95']} ms")
+    print(f"batch sizes: {stats['batch_size_histogram']}")
+
+if __name__ == '__main__':
+    main()
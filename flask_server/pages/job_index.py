@@ -0,0 +1,49 @@
+# flask_server/pages/job_index.py
+# Jobs recently returned by /api/fetch_jobs, by Adzuna job id, so endpoints can accept job ids instead of
+# the client re-sending each job's title and description. Entries expire after JOB_INDEX_TTL_SECONDS;
+# with the 'sqlite' backend every worker on the host sees jobs fetched through any of them.
+from .result_cache import ResultCache, create_cache_backend
+
+_job_cache = None # Configured by init_app()
+
+def init_app(app):
+    global _job_cache
+    backend_name = app.config.get('JOB_INDEX_BACKEND', 'sqlite')
+    if not backend_name or backend_name == 'none':
+        _job_cache = None
+        return
+    try:
+        backend = create_cache_backend(backend_name, namespace='recent_jobs',
+                                       max_entries=app.config.get('JOB_INDEX_MAX_ENTRIES', 20000),
+                                       sqlite_path=app.config.get('LOCAL_CACHE_DB_PATH'))
+    except Exception as e:
+        app.logger.error(f"Could not create job index ({backend_name}): {e}. Job id lookups disabled.", exc_info=True)
+        _job_cache = None
+        return
+    _job_cache = ResultCache(backend, ttl_seconds=app.config.get('JOB_INDEX_TTL_SECONDS', 86400))
+
+def remember_jobs(jobs, logger):
+    """Stores id, title and description of Adzuna result dicts."""
+    if _job_cache is None:
+        return
+    try:
+        for job in jobs:
+            if isinstance(job, dict) and job.get('id') is not None:
+                _job_cache.set(str(job['id']), {"id": str(job['id']), "title": job.get('title') or "",
+                                                "description": job.get('description') or ""})
+    except Exception as e:
+        logger.warning(f"Could not index fetched jobs: {e}")
+
+def lookup_jobs(job_ids, logger):
+    """Returns {job_id: {"id", "title", "description"}} for the ids still in the index."""
+    if _job_cache is None:
+        return {}
+    found = {}
+    try:
+        for job_id in job_ids:
+            job = _job_cache.get(str(job_id))
+            if job is not None:
+                found[str(job_id)] = job
+    except Exception as e:
+        logger.warning(f"Job index lookup failed: {e}")
+    return found
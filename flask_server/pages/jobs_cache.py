@@ -0,0 +1,122 @@
+# flask_server/pages/jobs_cache.py
+# Cache of Adzuna search results for /api/fetch_jobs, keyed on the normalized search (keywords as a sorted word
+# set, location, country, page; case and whitespace ignored). Most visitors land on the same default search,
+# so most requests are answered without spending Adzuna quota.
+#   fresh  entries younger than JOBS_CACHE_TTL_SECONDS are served as they are
+#   stale  for JOBS_CACHE_STALE_SECONDS after that they are still served, and one background refresh per
+#          key replaces them (stale-while-revalidate); if Adzuna is down the stale entry keeps being served
+#   miss   concurrent misses for one key in this process share a single upstream call (single flight)
+# Backends (result_cache.py): 'sqlite' (per host, survives restarts), 'memory' (per worker) or 'none'.
+# Failed searches are not cached.
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .result_cache import ResultCache, create_cache_backend, make_cache_key
+
+CACHE_FRESH = 'hit'
+CACHE_STALE = 'stale'
+CACHE_MISS = 'miss'
+
+_cache = None # Configured by init_app()
+_refresh_executor = None
+_in_flight = {} # key -> Future of the upstream call running for it in this process
+_in_flight_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"upstream_calls": 0, "collapsed": 0, "refreshes": 0, "refresh_errors": 0}
+
+def init_app(app):
+    global _cache, _refresh_executor
+    backend_name = app.config.get('JOBS_CACHE_BACKEND', 'sqlite')
+    if not backend_name or backend_name == 'none':
+        _cache = None
+        return
+    try:
+        backend = create_cache_backend(backend_name, namespace='adzuna_searches',
+                                       max_entries=app.config.get('JOBS_CACHE_MAX_ENTRIES', 2000),
+                                       sqlite_path=app.config.get('LOCAL_CACHE_DB_PATH'))
+    except Exception as e:
+        app.logger.error(f"Could not create jobs cache ({backend_name}): {e}. Job searches will not be cached.", exc_info=True)
+        _cache = None
+        return
+    _cache = ResultCache(backend, ttl_seconds=app.config.get('JOBS_CACHE_TTL_SECONDS', 600),
+                         stale_seconds=app.config.get('JOBS_CACHE_STALE_SECONDS', 3600))
+    if _refresh_executor is None:
+        _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jobs-refresh")
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", str(text or "")).strip().lower()
+
+def search_key(keywords, location, country, page):
+    # Adzuna matches all the words of 'what' in any order
+    return make_cache_key("adzuna_search", _normalize(country), " ".join(sorted(set(_normalize(keywords).split()))),
+                          _normalize(location), int(page))
+
+def _count(name, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+def _single_flight(key, fetch, logger):
+    """Runs fetch() for key unless a call for key is already running here, in which case its result is shared.
+    Successful results are stored. Returns (jobs, total); raises what fetch raised."""
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    if not leader:
+        _count("collapsed")
+        return future.result()
+    try:
+        _count("upstream_calls")
+        jobs, total = fetch()
+        try:
+            _cache.set(key, {"jobs": jobs, "total": total})
+        except Exception as e:
+            logger.warning(f"Jobs cache write failed: {e}")
+        future.set_result((jobs, total))
+        return jobs, total
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+def _refresh(key, fetch, logger):
+    _count("refreshes")
+    try:
+        _single_flight(key, fetch, logger)
+    except Exception as e:
+        _count("refresh_errors")
+        logger.warning(f"Background refresh of a cached job search failed; the stale entry stays: {e}")
+
+def get_jobs(fetch, keywords, location, country, page, logger):
+    """Returns (jobs, total, cache_status) with cache_status CACHE_FRESH, CACHE_STALE or CACHE_MISS.
+    fetch() performs the upstream search and returns (jobs, total); on a miss its exceptions propagate.
+    fetch may run in a background thread, so it must not need the request or app context."""
+    if _cache is None:
+        jobs, total = fetch()
+        return jobs, total, CACHE_MISS
+    key = search_key(keywords, location, country, page)
+    try:
+        entry = _cache.get_entry(key)
+    except Exception as e:
+        logger.warning(f"Jobs cache read failed: {e}")
+        entry = None
+    if entry is not None:
+        value, fresh = entry
+        if not fresh:
+            with _in_flight_lock:
+                refreshing = key in _in_flight
+            if not refreshing:
+                _refresh_executor.submit(_refresh, key, fetch, logger)
+        return value["jobs"], value["total"], CACHE_FRESH if fresh else CACHE_STALE
+    jobs, total = _single_flight(key, fetch, logger)
+    return jobs, total, CACHE_MISS
+
+def get_jobs_cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["cache"] = _cache.stats() if _cache is not None else {"backend": "disabled"}
+    return stats
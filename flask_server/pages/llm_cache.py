@@ -0,0 +1,105 @@
+# flask_server/pages/llm_cache.py
+# Prompt-level cache of LLM generations, on the result_cache backends ('sqlite' by default, so every worker
+# on the host shares it). Keys are normalized inputs plus the model name: role and keywords are case- and
+# whitespace-insensitive, keyword order and duplicates do not matter.
+# With LLM_CACHE_VARIANTS = n > 1 a key is generated n times (keeping the distinct generations, so a deterministic
+# model stores one); after that, requests are answered with a random stored generation.
+# Question sets without a single parsed question are never stored.
+import random
+import re
+import threading
+
+from .ai_utils import generate_interview_questions_llm
+from .result_cache import ResultCache, create_cache_backend, make_cache_key
+
+_cache = None # Configured by init_app()
+_variants = 1
+_stats_lock = threading.Lock()
+_stats = {"generated": 0, "served_from_cache": 0}
+
+def init_app(app):
+    global _cache, _variants
+    _variants = max(1, app.config.get('LLM_CACHE_VARIANTS', 1))
+    backend_name = app.config.get('LLM_CACHE_BACKEND', 'sqlite')
+    if not backend_name or backend_name == 'none':
+        _cache = None
+        return
+    try:
+        backend = create_cache_backend(backend_name, namespace='llm_responses',
+                                       max_entries=app.config.get('LLM_CACHE_MAX_ENTRIES', 5000),
+                                       sqlite_path=app.config.get('LOCAL_CACHE_DB_PATH'))
+    except Exception as e:
+        app.logger.error(f"Could not create LLM response cache ({backend_name}): {e}. LLM responses will not be cached.", exc_info=True)
+        _cache = None
+        return
+    _cache = ResultCache(backend, ttl_seconds=app.config.get('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+
+def _normalize_text(text):
+    return re.sub(r"\s+", " ", str(text or "")).strip().lower()
+
+def _normalize_keywords(keywords):
+    if isinstance(keywords, (list, tuple)):
+        keywords = ",".join(str(keyword) for keyword in keywords)
+    return ",".join(sorted({_normalize_text(keyword) for keyword in str(keywords or "").split(",")} - {""}))
+
+def interview_questions_key(job_role, context_keywords, model, num_technical, num_behavioral, num_situational):
+    return make_cache_key("interview_questions", model, _normalize_text(job_role), _normalize_keywords(context_keywords),
+                          int(num_technical), int(num_behavioral), int(num_situational))
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+def lookup(key, logger):
+    """A stored generation for key, or None when the key should be generated (missing or still collecting variants)."""
+    if _cache is None:
+        return None
+    try:
+        entry = _cache.get(key)
+    except Exception as e:
+        logger.warning(f"LLM cache read failed: {e}")
+        return None
+    if not entry or entry.get("generations", len(entry["variants"])) < _variants:
+        return None
+    _count("served_from_cache")
+    return random.choice(entry["variants"])
+
+def store(key, response, logger):
+    _count("generated")
+    if _cache is None:
+        return
+    try:
+        entry = _cache.get(key) or {"variants": []}
+        entry["generations"] = entry.get("generations", len(entry["variants"])) + 1
+        if response not in entry["variants"]:
+            entry["variants"] = (entry["variants"] + [response])[-_variants:]
+        _cache.set(key, entry)
+    except Exception as e:
+        logger.warning(f"LLM cache write failed: {e}")
+
+def store_interview_questions(key, questions, logger):
+    """Stores a generated question set unless no question was parsed from the model's reply."""
+    if not any(questions.get(category) for category in ("technical_questions", "behavioral_questions", "situational_questions")):
+        _count("generated")
+        logger.warning("No interview questions parsed from the model's reply; not caching it.")
+        return
+    store(key, questions, logger)
+
+def get_interview_questions(job_role, context_keywords, logger, num_technical=3, num_behavioral=2, num_situational=2, model="tinyllama"):
+    """generate_interview_questions_llm through the cache. Returns (questions, from_cache)."""
+    key = interview_questions_key(job_role, context_keywords, model, num_technical, num_behavioral, num_situational)
+    cached = lookup(key, logger)
+    if cached is not None:
+        logger.info(f"Interview questions for '{job_role}' served from the LLM cache.")
+        return cached, True
+    questions = generate_interview_questions_llm(job_role, context_keywords, logger, num_technical=num_technical,
+                                                 num_behavioral=num_behavioral, num_situational=num_situational, model=model)
+    store_interview_questions(key, questions, logger)
+    return questions, False
+
+def get_llm_cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["variants_per_key"] = _variants
+    stats["cache"] = _cache.stats() if _cache is not None else {"backend": "disabled"}
+    return stats
@@ -0,0 +1,292 @@
+# flask_server/pages/llm_client.py
+# The one way this app talks to Ollama. A single LLMClient per process holds:
+#   pool         one ollama.Client (httpx connection pool) shared by every request thread, with connect/read
+#                timeouts (OLLAMA_CONNECT_TIMEOUT_SECONDS, OLLAMA_TIMEOUT_SECONDS)
+#   residency    every call passes OLLAMA_KEEP_ALIVE, so the model stays loaded between requests; warm-up
+#                pre-loads LLM_MODEL (component 'llm') so the first user request does not pay the load
+#   concurrency  at most LLM_MAX_CONCURRENCY generations in flight per worker (match OLLAMA_NUM_PARALLEL);
+#                callers wait up to LLM_QUEUE_TIMEOUT_SECONDS for a slot, then get LLMBusyError
+#   retries      connection failures before any output are retried OLLAMA_MAX_RETRIES times
+#   accounting   per-model calls, prompt/completion tokens, latency, time to first token and model load time,
+#                in /api/metrics under "llm"
+# Connection failures and timeouts raise ConnectionError, which the routes turn into 503.
+#
+#   python -m flask_server.pages.llm_client --fake --requests 32 --threads 8
+#
+# measures cold and warm latency against a server (--fake starts pages/fake_ollama.py in-process).
+import argparse
+import collections
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_HOST = 'http://127.0.0.1:11434'
+_RECENT_SAMPLES = 1024 # Latencies kept per model for percentiles
+
+class LLMBusyError(ConnectionError):
+    """No generation slot became free within the queue timeout."""
+
+class _ModelStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
+        self.queue_seconds = 0.0
+        self.load_seconds = 0.0
+        self.cold_loads = 0
+        self.latencies = collections.deque(maxlen=_RECENT_SAMPLES)
+        self.first_token = collections.deque(maxlen=_RECENT_SAMPLES)
+
+def _percentiles(samples):
+    values = np.array(samples) * 1000.0
+    if not values.size:
+        return {"samples": 0, "p50": None, "p95": None, "max": None}
+    return {"samples": int(values.size), "p50": round(float(np.percentile(values, 50)), 1),
+            "p95": round(float(np.percentile(values, 95)), 1), "max": round(float(values.max()), 1)}
+
+class LLMClient:
+    """Thread-safe Ollama chat client; see the module header."""
+
+    def __init__(self, host=None, timeout_seconds=120.0, connect_timeout_seconds=5.0, keep_alive='30m',
+                 max_concurrency=4, queue_timeout_seconds=60.0, max_retries=1):
+        import httpx
+        import ollama
+        self.host = host or DEFAULT_HOST
+        self.keep_alive = keep_alive
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.queue_timeout = queue_timeout_seconds
+        self.max_retries = max(0, int(max_retries))
+        self._client = ollama.Client(host=self.host, timeout=httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds),
+                                     limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                                         max_keepalive_connections=self.max_concurrency))
+        self._connect_errors = (httpx.ConnectError, httpx.RemoteProtocolError, ConnectionError)
+        self._timeout_errors = (httpx.TimeoutException,)
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._waiters = collections.deque() # FIFO: a thread that just released a slot cannot jump the queue
+        self._in_flight = 0
+        self._models = collections.defaultdict(_ModelStats)
+
+    def _messages(self, prompt, system):
+        return ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": prompt}]
+
+    def _acquire(self, model):
+        started = time.perf_counter()
+        ticket = object()
+        with self._slot_freed:
+            self._waiters.append(ticket)
+            acquired = self._slot_freed.wait_for(lambda: self._waiters[0] is ticket and self._in_flight < self.max_concurrency,
+                                                 timeout=self.queue_timeout)
+            self._waiters.remove(ticket)
+            waited = time.perf_counter() - started
+            if acquired:
+                self._in_flight += 1
+                self._models[model].queue_seconds += waited
+            else:
+                self._models[model].errors += 1
+            self._slot_freed.notify_all() # The next in line may be able to go too
+        if not acquired:
+            raise LLMBusyError(f"No LLM slot free after {waited:.1f}s ({self.max_concurrency} generations in flight).")
+
+    def _release(self):
+        with self._slot_freed:
+            self._in_flight -= 1
+            self._slot_freed.notify_all()
+
+    def _record(self, model, started, final, first_token_at=None, error=False):
+        with self._lock:
+            stats = self._models[model]
+            stats.calls += 1
+            stats.errors += error
+            elapsed = time.perf_counter() - started
+            stats.seconds += elapsed
+            if not error:
+                stats.latencies.append(elapsed)
+            if first_token_at is not None:
+                stats.first_token.append(first_token_at - started)
+            if final is not None:
+                stats.prompt_tokens += final.get("prompt_eval_count") or 0
+                stats.completion_tokens += final.get("eval_count") or 0
+                load_seconds = (final.get("load_duration") or 0) / 1e9
+                stats.load_seconds += load_seconds
+                stats.cold_loads += load_seconds > 1.0 # Sub-second "loads" are Ollama's bookkeeping on a resident model
+
+    def _connection_error(self, e, model, logger):
+        if isinstance(e, self._timeout_errors):
+            logger.error(f"Ollama call to {model} timed out: {e}")
+            return ConnectionError(f"Ollama timed out: {e}")
+        logger.error(f"Ollama connection failed for {model}: {e}")
+        return ConnectionError(f"Could not connect to Ollama: {e}")
+
+    def _retry_delay(self, attempt, model, e, logger):
+        delay = 0.5 * (2 ** attempt)
+        logger.warning(f"Ollama call to {model} failed ({e}); retrying in {delay:.1f}s.")
+        time.sleep(delay)
+
+    def chat(self, prompt, logger, model="tinyllama", system=None, format=None, options=None):
+        """The model's whole reply as text."""
+        self._acquire(model)
+        try:
+            for attempt in range(self.max_retries + 1):
+                started = time.perf_counter()
+                try:
+                    response = self._client.chat(model=model, messages=self._messages(prompt, system), stream=False,
+                                                 format=format, options=options, keep_alive=self.keep_alive)
+                except self._connect_errors + self._timeout_errors as e:
+                    self._record(model, started, None, error=True)
+                    if attempt < self.max_retries and not isinstance(e, self._timeout_errors):
+                        self._retry_delay(attempt, model, e, logger)
+                        continue
+                    raise self._connection_error(e, model, logger) from None
+                except Exception:
+                    self._record(model, started, None, error=True)
+                    raise
+                self._record(model, started, response)
+                return response["message"]["content"]
+        finally:
+            self._release()
+
+    def stream_chat(self, prompt, logger, model="tinyllama", system=None, options=None):
+        """Yields the model's reply as text chunks while Ollama generates it. The generation slot is held
+        until the stream ends or the generator is closed."""
+        self._acquire(model)
+        try:
+            for attempt in range(self.max_retries + 1):
+                started, first_token_at, final = time.perf_counter(), None, None
+                try:
+                    for part in self._client.chat(model=model, messages=self._messages(prompt, system), stream=True,
+                                                  options=options, keep_alive=self.keep_alive):
+                        content = part["message"]["content"]
+                        if content:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            yield content
+                        if part.get("done"):
+                            final = part
+                except self._connect_errors + self._timeout_errors as e:
+                    self._record(model, started, None, first_token_at, error=True)
+                    # Once text has been yielded a retry would repeat it
+                    if attempt < self.max_retries and first_token_at is None and not isinstance(e, self._timeout_errors):
+                        self._retry_delay(attempt, model, e, logger)
+                        continue
+                    raise self._connection_error(e, model, logger) from None
+                except GeneratorExit:
+                    self._record(model, started, None, first_token_at)
+                    raise
+                except Exception:
+                    self._record(model, started, None, first_token_at, error=True)
+                    raise
+                self._record(model, started, final, first_token_at)
+                return
+        finally:
+            self._release()
+
+    def preload(self, model, logger):
+        """Loads model into Ollama's memory (an empty generate) and keeps it there for keep_alive. Returns True on success."""
+        started = time.perf_counter()
+        try:
+            response = self._client.generate(model=model, prompt="", keep_alive=self.keep_alive)
+        except Exception as e:
+            logger.error(f"Could not pre-load {model} from {self.host}: {e}")
+            return False
+        load_seconds = (response.get("load_duration") or 0) / 1e9
+        with self._lock:
+            self._models[model].load_seconds += load_seconds
+            self._models[model].cold_loads += load_seconds > 1.0
+        logger.info(f"Pre-loaded {model} in {time.perf_counter() - started:.2f}s (keep_alive={self.keep_alive}).")
+        return True
+
+    def stats(self):
+        with self._lock:
+            models = {}
+            for model, stats in self._models.items():
+                models[model] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "seconds": round(stats.seconds, 3),
+                    "queue_seconds": round(stats.queue_seconds, 3),
+                    "load_seconds": round(stats.load_seconds, 3),
+                    "cold_loads": stats.cold_loads,
+                    "completion_tokens_per_second": round(stats.completion_tokens / stats.seconds, 1) if stats.seconds else None,
+                    "latency_ms": _percentiles(stats.latencies),
+                    "first_token_ms": _percentiles(stats.first_token),
+                }
+            return {"host": self.host, "keep_alive": self.keep_alive, "max_concurrency": self.max_concurrency,
+                    "in_flight": self._in_flight, "waiting": len(self._waiters), "models": models}
+
+_client = None # Created by init_app(), or on first use with the defaults
+_client_lock = threading.Lock()
+_settings = {}
+
+def init_app(app):
+    global _client
+    _settings.update(
+        host=app.config.get('OLLAMA_HOST'),
+        timeout_seconds=app.config.get('OLLAMA_TIMEOUT_SECONDS', 120.0),
+        connect_timeout_seconds=app.config.get('OLLAMA_CONNECT_TIMEOUT_SECONDS', 5.0),
+        keep_alive=app.config.get('OLLAMA_KEEP_ALIVE', '30m'),
+        max_concurrency=app.config.get('LLM_MAX_CONCURRENCY', 4),
+        queue_timeout_seconds=app.config.get('LLM_QUEUE_TIMEOUT_SECONDS', 60.0),
+        max_retries=app.config.get('OLLAMA_MAX_RETRIES', 1),
+    )
+    with _client_lock:
+        _client = None # Rebuilt with the new settings on first use
+
+def get_llm_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(**_settings)
+        return _client
+
+def get_llm_client_stats():
+    with _client_lock:
+        client = _client
+    return client.stats() if client is not None else {"host": _settings.get("host") or DEFAULT_HOST, "models": {}}
+
+def _one_call(client, model, logger):
+    started = time.perf_counter()
+    client.chat("Name three skills a backend developer needs.", logger, model=model)
+    return time.perf_counter() - started
+
+def main(argv=None):
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+    parser = argparse.ArgumentParser(description="Cold and warm chat latency through LLMClient.")
+    parser.add_argument('--host', default=None, help=f"Ollama URL (default {DEFAULT_HOST})")
+    parser.add_argument('--model', default='tinyllama')
+    parser.add_argument('--requests', type=int, default=32, help="Warm calls after the first one")
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent callers for the warm calls")
+    parser.add_argument('--max-concurrency', type=int, default=4)
+    parser.add_argument('--keep-alive', default='30m')
+    parser.add_argument('--fake', action='store_true', help="Start pages/fake_ollama.py in-process and use it")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("llm_client")
+    host = args.host
+    if args.fake:
+        from .fake_ollama import start_fake_ollama
+        server = start_fake_ollama(port=0)
+        host = f"http://127.0.0.1:{server.server_address[1]}"
+    client = LLMClient(host=host, keep_alive=args.keep_alive, max_concurrency=args.max_concurrency)
+
+    cold = _one_call(client, args.model, logger)
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        started = time.perf_counter()
+        warm = list(pool.map(lambda _: _one_call(client, args.model, logger), range(args.requests)))
+        wall = time.perf_counter() - started
+    stats = client.stats()["models"][args.model]
+    print(f"first call (cold)   {cold * 1000:8.1f} ms")
+    print(f"warm calls          p50 {np.percentile(warm, 50) * 1000:.1f} ms, p95 {np.percentile(warm, 95) * 1000:.1f} ms, "
+          f"{args.requests / wall:.1f} calls/s with {args.threads} callers, cap {args.max_concurrency}")
+    print(f"tokens              {stats['prompt_tokens']} prompt, {stats['completion_tokens']} completion; "
+          f"model load {stats['load_seconds']:.2f}s over {stats['cold_loads']} cold load(s)")
+
+if __name__ == '__main__':
+    main()
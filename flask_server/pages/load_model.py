@@ -1,5 +1,7 @@
 # flask_server/pages/load_model.py
 # (Your existing load_bert_model function)
+SBERT_MODEL_NAME = 'all-MiniLM-L6-v2' # Also recorded in course_recommender embeddings manifests
+
 def load_bert_model(logger):
     sbert_model_instance = None
     model_loaded_flag = False
@@ -12,7 +14,7 @@ def load_bert_model(logger):
 
     if model_loaded_flag:
         try:
-            model_name = 'all-MiniLM-L6-v2'
+            model_name = SBERT_MODEL_NAME
             logger.info(f"Loading Sentence Transformer model: {model_name}...")
             sbert_model_instance = SentenceTransformer(model_name)
             logger.info("Sentence Transformer model loaded successfully.")
@@ -20,4 +22,25 @@ def load_bert_model(logger):
             logger.error(f"Failed to load Sentence Transformer model: {e}", exc_info=True)
             sbert_model_instance = None
             model_loaded_flag = False
-    return sbert_model_instance, model_loaded_flag
\ No newline at end of file
+    return sbert_model_instance, model_loaded_flag
+
+def load_onnx_bert_model(logger, model_dir, quantized=True, intra_op_threads=0):
+    """SBERT on onnxruntime (pages/onnx_encoder.py); same (model, loaded) return as load_bert_model."""
+    try:
+        from .onnx_encoder import OnnxSentenceEncoder, has_onnx_model
+    except ImportError as e:
+        logger.warning(f"ONNX SBERT backend unavailable: {e}")
+        return None, False
+    if not has_onnx_model(model_dir, quantized):
+        logger.error(f"No exported ONNX SBERT model in {model_dir}. Run `python -m flask_server.pages.onnx_encoder export`.")
+        return None, False
+    try:
+        logger.info(f"Loading ONNX Sentence Transformer model from {model_dir} ({'int8' if quantized else 'fp32'})...")
+        encoder = OnnxSentenceEncoder(model_dir, quantized=quantized, intra_op_threads=intra_op_threads)
+        logger.info("ONNX Sentence Transformer model loaded successfully.")
+        return encoder, True
+    except ImportError as e:
+        logger.warning(f"`onnxruntime`/`tokenizers` library not found ({e}). SBERT features unavailable.")
+    except Exception as e:
+        logger.error(f"Failed to load ONNX Sentence Transformer model: {e}", exc_info=True)
+    return None, False
@@ -0,0 +1,299 @@
+# flask_server/pages/onnx_encoder.py
+# ONNX Runtime backend for the SBERT model (SBERT_BACKEND=onnx). Serving needs only onnxruntime, tokenizers
+# and numpy, not torch; with int8 weights the model is about a quarter of the fp32 size.
+#
+#   python -m flask_server.pages.onnx_encoder export [--output-dir DIR]     # needs sentence-transformers, onnx, onnxruntime
+#   python -m flask_server.pages.onnx_encoder check  [--texts-file FILE]    # drift against the torch model
+#   python -m flask_server.pages.onnx_encoder benchmark                     # throughput and memory, torch vs onnx
+#
+# export writes to DIR (default: 'ML prediction/sbert_onnx'):
+#   model.onnx          fp32 transformer (token embeddings out)
+#   model.int8.onnx     the same with dynamically quantized int8 weights
+#   tokenizer.json      the model's fast tokenizer
+#   onnx_manifest.json  base model name, max_seq_length, pooling, normalization
+# OnnxSentenceEncoder reproduces the SentenceTransformer pipeline (tokenize, transformer, mean pooling, optional
+# L2 normalization) with the same encode() call, so calculate_similarity and the caches work unchanged.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from .load_model import SBERT_MODEL_NAME
+
+MANIFEST_FILE = 'onnx_manifest.json'
+FP32_MODEL_FILE = 'model.onnx'
+INT8_MODEL_FILE = 'model.int8.onnx'
+TOKENIZER_FILE = 'tokenizer.json'
+DEFAULT_ONNX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'ML prediction', 'sbert_onnx')
+ONNX_OPSET = 14
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer.encode() on onnxruntime for an exported model directory."""
+
+    def __init__(self, model_dir, quantized=True, intra_op_threads=0):
+        import onnxruntime
+        from tokenizers import Tokenizer
+        with open(os.path.join(model_dir, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("pooling") != "mean":
+            raise ValueError(f"Unsupported pooling '{self.manifest.get('pooling')}' in {model_dir}")
+        self.quantized = quantized
+        self.model_name = variant_name(self.manifest["model_name"], quantized)
+        self.max_seq_length = self.manifest["max_seq_length"]
+        self.normalize = self.manifest["normalize"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.manifest["pad_token_id"], pad_token=self.manifest["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        model_file = INT8_MODEL_FILE if quantized else FP32_MODEL_FILE
+        self.session = onnxruntime.InferenceSession(os.path.join(model_dir, model_file), options,
+                                                    providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        feed = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        }
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        token_embeddings = self.session.run(None, feed)[0]
+        # Mean pooling over real tokens, as sentence_transformers.models.Pooling does
+        mask = feed["attention_mask"][:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self.manifest["dimension"]), dtype=np.float32)
+        # Sort by length so each batch pads to similar lengths, then restore the caller's order
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        vectors = np.empty((len(texts), self.manifest["dimension"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            vectors[batch] = self._encode_batch([texts[i] for i in batch])
+        if normalize_embeddings:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors[0] if single else vectors
+
+def variant_name(model_name, quantized):
+    """Name the ONNX vectors are cached under; they differ slightly from the torch model's."""
+    return f"{model_name}-onnx-int8" if quantized else f"{model_name}-onnx"
+
+def has_onnx_model(model_dir, quantized=True):
+    model_file = INT8_MODEL_FILE if quantized else FP32_MODEL_FILE
+    return all(os.path.exists(os.path.join(model_dir, name)) for name in (MANIFEST_FILE, TOKENIZER_FILE, model_file))
+
+def export_onnx_model(sentence_transformer, model_name, output_dir, logger=None):
+    """Exports the transformer of a loaded SentenceTransformer to ONNX, quantizes it to int8 and writes the manifest."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers.models import Normalize, Pooling
+
+    transformer = sentence_transformer[0]
+    pooling = next((module for module in sentence_transformer if isinstance(module, Pooling)), None)
+    pooling_mode = pooling and (pooling.get_config_dict().get("pooling_mode") or pooling.get_pooling_mode_str())
+    if pooling_mode != "mean":
+        raise ValueError("Only mean-pooled SentenceTransformer models can be exported.")
+    tokenizer = transformer.tokenizer
+    os.makedirs(output_dir, exist_ok=True)
+
+    auto_model = transformer.auto_model.eval()
+    sample = tokenizer(["An example sentence for tracing."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    fp32_path = os.path.join(output_dir, FP32_MODEL_FILE)
+    start = time.perf_counter()
+    with torch.no_grad():
+        torch.onnx.export(_TokenEmbeddings(auto_model), tuple(sample[name] for name in input_names), fp32_path,
+                          input_names=input_names, output_names=["token_embeddings"], dynamic_axes=dynamic_axes,
+                          opset_version=ONNX_OPSET, do_constant_folding=True, dynamo=False)
+    quantize_dynamic(fp32_path, os.path.join(output_dir, INT8_MODEL_FILE), weight_type=QuantType.QInt8)
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, TOKENIZER_FILE))
+
+    manifest = {
+        "model_name": model_name,
+        "dimension": int(sentence_transformer.get_sentence_embedding_dimension()),
+        "max_seq_length": int(sentence_transformer.max_seq_length),
+        "pooling": "mean",
+        "normalize": any(isinstance(module, Normalize) for module in sentence_transformer),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": int(tokenizer.pad_token_id),
+        "opset": ONNX_OPSET,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    if logger:
+        sizes = {name: round(os.path.getsize(os.path.join(output_dir, name)) / 2**20, 1) for name in (FP32_MODEL_FILE, INT8_MODEL_FILE)}
+        logger.info(f"Exported {model_name} to {output_dir} in {time.perf_counter() - start:.1f}s (MB: {sizes})")
+    return manifest
+
+# Resume and job snippets for the drift check; pass --texts-file to use real ones
+SAMPLE_TEXTS = [
+    "Senior Python developer with 6 years building REST APIs in Flask and Django, PostgreSQL and AWS.",
+    "Data scientist experienced in scikit-learn, pandas, A/B testing and presenting insights to stakeholders.",
+    "Frontend engineer: React, TypeScript, accessibility, design systems and performance tuning.",
+    "Registered nurse with ICU experience, patient assessment, medication administration and charting.",
+    "Accountant handling month-end close, reconciliations, accounts payable and IFRS reporting.",
+    "Machine learning engineer deploying NLP models, sentence embeddings and vector search to production.",
+    "Warehouse associate: forklift certified, inventory counts, picking and packing, shipping schedules.",
+    "We are hiring a backend engineer to design scalable microservices in Python and Go on Kubernetes.",
+    "Looking for a data analyst fluent in SQL, dashboards (Tableau/Power BI) and statistics.",
+    "Join our team as a UX designer creating wireframes, prototypes and running usability studies.",
+    "Hospital seeks a critical care nurse for night shifts; BLS and ACLS certification required.",
+    "Junior accountant position: bookkeeping, invoices, bank reconciliations, Excel proficiency.",
+    "DevOps engineer to own CI/CD pipelines, Terraform, monitoring and on-call rotation.",
+    "Retail store manager responsible for staffing, sales targets, merchandising and customer service.",
+    "Teacher of secondary mathematics, curriculum planning, classroom management, student assessment.",
+    "Chef de partie with experience in high-volume kitchens, menu preparation and food safety standards.",
+]
+
+def check_drift(reference, candidate, texts):
+    """Compares two encoders on texts: per-text cosine between their vectors, and the change in match scores
+    (calculate_similarity's 0-100 scale) for every pair of texts."""
+    a = np.asarray(reference.encode(texts, show_progress_bar=False), dtype=np.float64)
+    b = np.asarray(candidate.encode(texts, show_progress_bar=False), dtype=np.float64)
+    a /= np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b /= np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    cosines = (a * b).sum(axis=1)
+    scores_a = np.clip(a @ a.T, 0.0, 1.0) * 100
+    scores_b = np.clip(b @ b.T, 0.0, 1.0) * 100
+    off_diagonal = ~np.eye(len(texts), dtype=bool)
+    deltas = np.abs(scores_a - scores_b)[off_diagonal]
+    # Does each text still rank the others in the same order?
+    same_top1 = float(np.mean([np.argmax(np.where(off_diagonal[i], scores_a[i], -1)) == np.argmax(np.where(off_diagonal[i], scores_b[i], -1))
+                               for i in range(len(texts))]))
+    return {
+        "texts": len(texts),
+        "cosine_min": round(float(cosines.min()), 5),
+        "cosine_mean": round(float(cosines.mean()), 5),
+        "score_delta_max": round(float(deltas.max()), 3) if deltas.size else 0.0,
+        "score_delta_mean": round(float(deltas.mean()), 3) if deltas.size else 0.0,
+        "top1_agreement": round(same_top1, 4),
+    }
+
+def _load_torch_model(model_name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+def _max_rss_mb():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10
+
+def _benchmark_backend(backend, model_name, model_dir, n_texts, batch_size):
+    """Runs in a fresh interpreter (see benchmark()) so import and model memory are measured per backend."""
+    baseline_mb = _max_rss_mb()
+    start = time.perf_counter()
+    if backend == 'torch':
+        encoder = _load_torch_model(model_name)
+    else:
+        encoder = OnnxSentenceEncoder(model_dir, quantized=(backend == 'onnx-int8'))
+    load_seconds = time.perf_counter() - start
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" ({i})" for i in range(n_texts)]
+    encoder.encode(texts[:batch_size], batch_size=batch_size) # Warm-up
+
+    start = time.perf_counter()
+    encoder.encode(texts, batch_size=batch_size)
+    batched_seconds = time.perf_counter() - start
+    singles = texts[:min(100, n_texts)]
+    start = time.perf_counter()
+    for text in singles:
+        encoder.encode(text)
+    single_seconds = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "batched_texts_per_second": round(n_texts / batched_seconds, 1),
+        "single_latency_ms": round(single_seconds / len(singles) * 1000, 2),
+        "max_rss_mb": round(_max_rss_mb(), 1),
+        "model_rss_mb": round(_max_rss_mb() - baseline_mb, 1),
+    }
+
+def benchmark(model_name, model_dir, backends, n_texts, batch_size):
+    results = []
+    for backend in backends:
+        output = subprocess.run([sys.executable, '-m', __spec__.name, '_bench-one', '--backend', backend, '--model-name', model_name, '--model-dir', model_dir,
+                                 '--texts', str(n_texts), '--batch-size', str(batch_size)], capture_output=True, text=True)
+        if output.returncode != 0:
+            print(f"{backend}: failed\n{output.stderr.strip()[-2000:]}", file=sys.stderr)
+            continue
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return results
+
+def main(argv=None):
+    import logging
+    parser = argparse.ArgumentParser(description="Export, check and benchmark the ONNX SBERT backend.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help="Export the torch model to ONNX (fp32 + int8)")
+    check_parser = subparsers.add_parser('check', help="Accuracy drift of the ONNX model against the torch model")
+    check_parser.add_argument('--texts-file', help="One text per line (default: built-in resume/job snippets)")
+    check_parser.add_argument('--fp32', action='store_true', help="Check the fp32 ONNX model instead of int8")
+    check_parser.add_argument('--min-cosine', type=float, default=0.99, help="Fail below this per-text cosine")
+    check_parser.add_argument('--max-score-delta', type=float, default=2.0, help="Fail above this match-score change (points)")
+    bench_parser = subparsers.add_parser('benchmark', help="Throughput and memory per backend")
+    bench_parser.add_argument('--backends', default="torch,onnx,onnx-int8")
+    bench_one_parser = subparsers.add_parser('_bench-one') # Internal: one backend, in its own process
+    bench_one_parser.add_argument('--backend', required=True)
+    for sub in (export_parser, check_parser, bench_parser, bench_one_parser):
+        sub.add_argument('--model-dir', '--output-dir', dest='model_dir', default=DEFAULT_ONNX_DIR, help="ONNX model directory")
+        sub.add_argument('--model-name', default=SBERT_MODEL_NAME, help="SentenceTransformer model name or path")
+    for sub in (bench_parser, bench_one_parser):
+        sub.add_argument('--texts', type=int, default=512, help="Texts to encode")
+        sub.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args(argv)
+
+    if args.command == '_bench-one':
+        print(json.dumps(_benchmark_backend(args.backend, args.model_name, args.model_dir, args.texts, args.batch_size)))
+        return
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger("onnx_encoder")
+    if args.command == 'export':
+        manifest = export_onnx_model(_load_torch_model(args.model_name), args.model_name, args.model_dir, logger)
+        print(json.dumps(manifest, indent=2))
+    elif args.command == 'check':
+        if args.texts_file:
+            with open(args.texts_file, encoding='utf-8') as f:
+                texts = [line.strip() for line in f if line.strip()]
+        else:
+            texts = SAMPLE_TEXTS
+        reference = _load_torch_model(args.model_name)
+        candidate = OnnxSentenceEncoder(args.model_dir, quantized=not args.fp32)
+        report = check_drift(reference, candidate, texts)
+        passed = report["cosine_min"] >= args.min_cosine and report["score_delta_max"] <= args.max_score_delta
+        print(json.dumps({**report, "model": candidate.model_name, "passed": passed}, indent=2))
+        if not passed:
+            raise SystemExit(1)
+    elif args.command == 'benchmark':
+        results = benchmark(args.model_name, args.model_dir, [name.strip() for name in args.backends.split(',') if name.strip()], args.texts, args.batch_size)
+        print(f"{'backend':<10} {'load s':>7} {'texts/s':>9} {'1-text ms':>10} {'max RSS MB':>11} {'model MB':>9}")
+        for r in results:
+            print(f"{r['backend']:<10} {r['load_seconds']:>7} {r['batched_texts_per_second']:>9} {r['single_latency_ms']:>10} {r['max_rss_mb']:>11} {r['model_rss_mb']:>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# flask_server/pages/parsed_resume_store.py
+# parse_resume_with_llm output depends only on the resume text and the model, so it is stored in the app
+# database (user.models.ParsedResume) and reused: tailoring one resume to ten jobs costs one LLM parse.
+# Entries belong to the logged-in user (user_id) or, for anonymous uploads, to no one (user_id None).
+# Before any of that, the rule-based parser (resume_parser.py) gets a go; resumes it parses with at least
+# RESUME_RULE_PARSER_MIN_CONFIDENCE never reach the LLM or the database.
+import hashlib
+import threading
+import time
+
+from .ai_utils import RESUME_PARSER_VERSION, parse_resume_with_llm
+from .resume_parser import parse_resume_rules
+
+_enabled = True
+_rules = {"enabled": True, "min_confidence": 0.75}
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "store_errors": 0, "rule_parses": 0, "rule_fallbacks": 0, "rule_parse_seconds": 0.0}
+
+def init_app(app):
+    global _enabled
+    _enabled = app.config.get('PARSED_RESUME_CACHE_ENABLED', True)
+    _rules["enabled"] = app.config.get('RESUME_RULE_PARSER_ENABLED', True)
+    _rules["min_confidence"] = app.config.get('RESUME_RULE_PARSER_MIN_CONFIDENCE', 0.75)
+
+def resume_text_hash(resume_text):
+    return hashlib.sha256(resume_text.strip().encode('utf-8')).hexdigest()
+
+def _count(name, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+def _parse_with_rules(resume_text, logger):
+    """The rule-based parse if it is confident enough, else None."""
+    start = time.perf_counter()
+    parsed, confidence = parse_resume_rules(resume_text)
+    _count("rule_parse_seconds", time.perf_counter() - start)
+    if confidence >= _rules["min_confidence"]:
+        _count("rule_parses")
+        logger.info(f"Resume parsed by rules (confidence {confidence:.2f}); LLM skipped.")
+        return parsed
+    _count("rule_fallbacks")
+    logger.info(f"Rule-based resume parse confidence {confidence:.2f} is below {_rules['min_confidence']}; using the LLM.")
+    return None
+
+def get_or_parse_resume(resume_text, logger, model="tinyllama", user_id=None):
+    """Returns (parsed_data, from_cache). parsed_data is a fresh dict the caller may modify."""
+    if _rules["enabled"] and resume_text:
+        parsed = _parse_with_rules(resume_text, logger)
+        if parsed is not None:
+            return parsed, False
+    if not _enabled or not resume_text:
+        return parse_resume_with_llm(resume_text, logger, model=model), False
+    from ..user.models import ParsedResume # Deferred: models import the SQLAlchemy app state
+    text_hash = resume_text_hash(resume_text)
+    try:
+        entry = ParsedResume.lookup(user_id, text_hash, model, RESUME_PARSER_VERSION)
+    except Exception as e:
+        logger.warning(f"Parsed resume lookup failed: {e}")
+        entry = None
+    if entry is not None:
+        _count("hits")
+        logger.info(f"Reusing parsed resume {text_hash[:12]} ({model}) for user {user_id}.")
+        return entry.parsed, True
+
+    _count("misses")
+    parsed = parse_resume_with_llm(resume_text, logger, model=model)
+    try:
+        if ParsedResume.store(user_id, text_hash, model, RESUME_PARSER_VERSION, parsed) is None:
+            _count("store_errors")
+    except Exception as e:
+        _count("store_errors")
+        logger.warning(f"Could not store parsed resume: {e}")
+    return parsed, False
+
+def get_parsed_resume_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["enabled"] = _enabled
+    stats["rule_parser"] = dict(_rules)
+    stats["rule_parse_seconds"] = round(stats["rule_parse_seconds"], 3)
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
@@ -0,0 +1,225 @@
+# flask_server/pages/result_cache.py
+# Bounded result caches with LRU eviction and a TTL.
+#   MemoryCacheBackend  per-process OrderedDict
+#   SQLiteCacheBackend  one SQLite file per host, so every worker on the host shares entries
+# ResultCache wraps a backend with TTL handling, version-based invalidation and hit/miss/eviction counters;
+# with stale_seconds, expired entries are kept that much longer for get_entry() (stale-while-revalidate).
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def make_cache_key(*parts):
+    """SHA-256 over the string form of each part (NUL-separated so parts cannot run together)."""
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+class MemoryCacheBackend:
+    name = "memory"
+    shared = False # Only this process sees the entries
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (value, stored_at) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """Values are stored as JSON. Several caches can share one file through distinct namespaces.
+    The LRU bound is enforced every trim_interval writes of this process rather than on each write, so a
+    namespace can briefly hold up to trim_interval entries (per writing process) above max_entries."""
+    name = "sqlite"
+    shared = True # Every process using the file sees the entries
+
+    def __init__(self, db_path, namespace, max_entries=10000, timeout=5.0):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.evictions = 0
+        self.trim_interval = max(1, min(256, max_entries // 16))
+        self._writes_since_trim = 0
+        self._trim_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries (namespace, last_access)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, stored_at FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?", (time.time(), self.namespace, key)
+        )
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), stored_at, time.time())
+        )
+        with self._trim_lock:
+            self._writes_since_trim += 1
+            if self._writes_since_trim < self.trim_interval:
+                return
+            self._writes_since_trim = 0
+        self._trim(conn)
+
+    def _trim(self, conn):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache_entries WHERE namespace = ? ORDER BY last_access LIMIT ?)",
+                (self.namespace, self.namespace, excess)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+def create_cache_backend(backend_name, namespace, max_entries, sqlite_path=None):
+    if backend_name == "memory":
+        return MemoryCacheBackend(max_entries=max_entries)
+    if backend_name == "sqlite":
+        if not sqlite_path:
+            raise ValueError("sqlite cache backend requires a database path.")
+        return SQLiteCacheBackend(sqlite_path, namespace, max_entries=max_entries)
+    raise ValueError(f"Unknown cache backend '{backend_name}'. Expected 'memory' or 'sqlite'.")
+
+class ResultCache:
+    """TTL + LRU cache in front of a backend. Entries older than ttl_seconds count as misses.
+
+    set_version() records the version (e.g. a model fingerprint) and, for a per-process backend, clears it
+    when the version changes. A shared backend is left alone, since other workers may still be serving the
+    old version or already be on the new one: callers must include the version in their keys, and entries
+    of an old version age out through LRU and TTL.
+    """
+
+    def __init__(self, backend, ttl_seconds=3600, version=None, stale_seconds=0):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.version = version
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        entry = self.get_entry(key, allow_stale=False)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key, allow_stale=True):
+        """(value, fresh) or None. A stale entry (older than ttl_seconds, younger than ttl_seconds + stale_seconds)
+        comes back with fresh=False if allow_stale, for the caller to serve while it refreshes the entry."""
+        entry = self.backend.get(key)
+        if entry is None:
+            self._count('misses')
+            return None
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if self.ttl_seconds and age > self.ttl_seconds:
+            if age > self.ttl_seconds + self.stale_seconds:
+                self.backend.delete(key)
+                self._count('expirations')
+            if not allow_stale or age > self.ttl_seconds + self.stale_seconds:
+                self._count('misses')
+                return None
+            self._count('stale_hits')
+            return value, False
+        self._count('hits')
+        return value, True
+
+    def set(self, key, value):
+        self.backend.set(key, value, time.time())
+
+    def set_version(self, version):
+        if version != self.version:
+            self.version = version
+            if not self.backend.shared:
+                self.backend.clear()
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        stats = {
+            "backend": self.backend.name,
+            "entries": len(self.backend),
+            "max_entries": self.backend.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions + self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "version": self.version,
+        }
+        if self.stale_seconds:
+            stats["stale_seconds"] = self.stale_seconds
+            stats["stale_hits"] = self.stale_hits
+        return stats
@@ -0,0 +1,274 @@
+# flask_server/pages/resume_parser.py
+# Rule-based resume parser: the fast path in front of parse_resume_with_llm. Most resumes use standard section
+# headings, so splitting them needs no LLM:
+#   headings     lines matching the precompiled heading patterns below ("EXPERIENCE", "Work History:", ...)
+#   experience   entries split on their header lines and date ranges ("Jan 2020 - Present"); bullets become
+#                responsibilities, wrapped bullet lines are joined back
+#   education    one entry per degree/institution, dates pulled out
+#   skills       split on commas, bullets, pipes and semicolons; "Languages: ..." category prefixes dropped
+# parse_resume_rules() returns the parse_resume_with_llm dict shape plus a confidence in [0, 1]; the caller
+# (parsed_resume_store.py) uses the LLM only when the confidence is below RESUME_RULE_PARSER_MIN_CONFIDENCE.
+#
+#   python -m flask_server.pages.resume_parser benchmark path/to/resumes   (.txt and .pdf files)
+#   python -m flask_server.pages.resume_parser parse resume.pdf
+#
+# reports parse latency, confidence and how often the LLM would be skipped.
+import argparse
+import json
+import os
+import re
+import time
+
+SECTION_SUMMARY = 'summary'
+SECTION_EXPERIENCE = 'experience'
+SECTION_EDUCATION = 'education'
+SECTION_SKILLS = 'skills'
+SECTION_OTHER = 'other' # Known headings whose content this parser does not keep (projects, certifications, ...)
+
+_HEADINGS = [
+    (SECTION_SUMMARY, r"(?:professional |career |executive )?(?:summary|profile|objective)|about me|summary of qualifications"),
+    (SECTION_EXPERIENCE, r"(?:professional |work |relevant |employment )?(?:experience|history)|employment|work history|career history"),
+    (SECTION_EDUCATION, r"education(?:al background)?(?: (?:and|&) (?:training|certifications?))?|academic (?:background|qualifications)"),
+    (SECTION_SKILLS, r"(?:technical |core |key |professional )?(?:skills|competencies|proficiencies)(?: (?:and|&) \w+)?|technologies|tools(?: (?:and|&) technologies)?"),
+    (SECTION_OTHER, r"projects?|personal projects|certifications?|licenses(?: (?:and|&) certifications)?|awards?(?: (?:and|&) honou?rs)?|honou?rs"
+                    r"|publications|languages|interests|hobbies|references|volunteer(?:ing| experience| work)?|activities|achievements|courses|coursework"),
+]
+# A heading alone on its line, or followed by ':' and content ("Skills: Python, SQL")
+_HEADING_LINE = [(section, re.compile(rf"^[\s#*_]*(?:{pattern})[\s*_]*(?::\s*(?P<rest>.*))?$", re.IGNORECASE))
+                 for section, pattern in _HEADINGS]
+_MAX_HEADING_LENGTH = 45
+
+_MONTH = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d{{2}})"
+_DATE_RANGE = re.compile(rf"{_DATE}\s*(?:-|–|—|to|until)\s*(?:{_DATE}|present|current|now|today)", re.IGNORECASE)
+_SINGLE_DATE = re.compile(rf"(?:(?:expected|graduat(?:ed|ion))\s*:?\s*)?{_DATE}", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-•*▪●◦·‣–—>]|o\s|\d+[.)]\s)\s*")
+_SEPARATORS = re.compile(r"\s*(?:\||•|·|\t|\s{2,}|\s[-–—]\s|,\s|\sat\s|@)\s*")
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin|github|\+?\d[\d\s().-]{7,}\d", re.IGNORECASE)
+_DEGREE = re.compile(r"\b(?:bachelor|master|doctor|ph\.?\s?d|mba|b\.?\s?(?:sc|s|a|e|tech|eng)\b\.?|m\.?\s?(?:sc|s|a|e|tech|eng)\b\.?"
+                     r"|associate|diploma|degree|certificate|high school|a-levels?|gcse)", re.IGNORECASE)
+_FIELD_LESS_DEGREE = re.compile(r"^(?:\s+(?:of|in)\s+\w+)?\W*$") # What may follow _DEGREE in "Bachelor of Arts", "B.S."
+_INSTITUTION = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+_SKILL_SPLIT = re.compile(r"\s*(?:[,;|•·▪●]|\s[-–]\s|\n)\s*")
+_SKILL_CATEGORY = re.compile(r"^[A-Za-z][\w &/+-]{1,30}:\s*")
+_MAX_SKILL_LENGTH = 40
+_LONG_LINE = 60 # Unbulleted lines at least this long are sentences, not entry headers
+
+def _heading(line):
+    """(section, rest of the line) if line is a section heading, else (None, None)."""
+    if len(line) > _MAX_HEADING_LENGTH and ':' not in line:
+        return None, None
+    for section, pattern in _HEADING_LINE:
+        match = pattern.match(line)
+        if match:
+            rest = (match.group('rest') or '').strip()
+            # "Experience: 5 years leading teams" in a summary is a sentence, not a heading with content
+            if rest and len(line.split(':', 1)[0]) > _MAX_HEADING_LENGTH:
+                return None, None
+            return section, rest
+    return None, None
+
+def split_sections(resume_text):
+    """(preamble lines, {section: [lines]}) with lines stripped and blank lines dropped. A section that
+    appears twice (e.g. 'Technical Skills' and 'Soft Skills') gets both blocks' lines."""
+    preamble, sections, current = [], {}, None
+    for raw in resume_text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section, rest = _heading(line)
+        if section and rest and current == SECTION_SKILLS and section in (SECTION_SKILLS, SECTION_OTHER):
+            section = None # "Languages: Python, Go" inside the skills section is a skill category
+        if section:
+            current = section
+            sections.setdefault(section, [])
+            if rest:
+                sections[section].append(rest)
+        elif current is None:
+            preamble.append(line)
+        else:
+            sections[current].append(line)
+    return preamble, sections
+
+def _strip_bullet(line):
+    match = _BULLET.match(line)
+    return (line[match.end():].strip(), True) if match else (line, False)
+
+def _header_fields(header_lines):
+    """(title, company, dates) from an entry's header lines."""
+    text = " | ".join(header_lines)
+    dates = ""
+    match = _DATE_RANGE.search(text) or _SINGLE_DATE.search(text)
+    if match:
+        dates = match.group(0).strip()
+        text = text[:match.start()] + " | " + text[match.end():]
+    text = re.sub(r"[()]", " ", text)
+    parts = [part.strip(" ,;:-–—") for part in _SEPARATORS.split(text)]
+    parts = [part for part in parts if part]
+    return (parts[0] if parts else ""), (" ".join(parts[1:2]) if len(parts) > 1 else ""), dates
+
+def parse_experience(lines):
+    entries, header, bullets, has_dates = [], [], [], False
+
+    def close():
+        if header or bullets:
+            title, company, dates = _header_fields(header)
+            entries.append({"title": title, "company": company, "dates": dates, "responsibilities": list(bullets)})
+
+    for line in lines:
+        text, bulleted = _strip_bullet(line)
+        dated = bool(_DATE_RANGE.search(text)) and not bulleted
+        if bulleted or (has_dates and len(text) >= _LONG_LINE):
+            bullets.append(text)
+        elif bullets and text[:1].islower():
+            bullets[-1] = f"{bullets[-1]} {text}" # Wrapped bullet
+        elif bullets or (dated and has_dates):
+            close() # A header line after the bullets, or a second date range: the next entry starts
+            header, bullets, has_dates = [text], [], dated
+        else:
+            header.append(text)
+            has_dates = has_dates or dated
+    close()
+    return entries
+
+def parse_education(lines):
+    entries = []
+    for line in lines:
+        text, _ = _strip_bullet(line)
+        current = entries[-1] if entries else None
+        has_degree, has_institution = bool(_DEGREE.search(text)), bool(_INSTITUTION.search(text))
+        starts_entry = (current is None
+                        or (has_degree and current["degree"])
+                        or (has_institution and current["institution"] and not has_degree))
+        if not (has_degree or has_institution) and current is not None:
+            match = _DATE_RANGE.search(text) or _SINGLE_DATE.search(text)
+            if match and not current["dates"]:
+                current["dates"] = match.group(0).strip()
+            continue # Grades, coursework and other detail lines
+        if starts_entry:
+            current = {"degree": "", "institution": "", "dates": ""}
+            entries.append(current)
+        match = _DATE_RANGE.search(text) or _SINGLE_DATE.search(text)
+        if match:
+            if not current["dates"]:
+                current["dates"] = match.group(0).strip()
+            text = text[:match.start()] + " | " + text[match.end():]
+        leftover = []
+        for part in (part.strip(" ,;:-–—()") for part in _SEPARATORS.split(text)):
+            if not part:
+                continue
+            if _INSTITUTION.search(part) and not current["institution"]:
+                current["institution"] = part
+            elif not current["degree"] and (_DEGREE.search(part) or not has_degree):
+                current["degree"] = part
+            else:
+                leftover.append(part)
+        for part in leftover:
+            degree = _DEGREE.search(current["degree"])
+            if degree and _FIELD_LESS_DEGREE.match(current["degree"][degree.end():]):
+                current["degree"] = f"{current['degree']}, {part}" # "B.S., Computer Science"
+            elif not current["institution"]:
+                current["institution"] = part # "B.A. Psychology, UCLA"
+    return [entry for entry in entries if entry["degree"] or entry["institution"]]
+
+def parse_skills(lines):
+    skills, seen = [], set()
+    for line in lines:
+        text, _ = _strip_bullet(line)
+        text = _SKILL_CATEGORY.sub("", text)
+        for item in _SKILL_SPLIT.split(text):
+            item = item.strip(" .")
+            if 1 <= len(item) <= _MAX_SKILL_LENGTH and item.lower() not in seen:
+                seen.add(item.lower())
+                skills.append(item)
+    return skills
+
+def _preamble_summary(preamble):
+    """Resumes without a summary heading often open with one after the name and contact lines."""
+    sentences = [line for line in preamble if len(line) >= _LONG_LINE and not _CONTACT.search(line)]
+    return " ".join(sentences)
+
+def _confidence(parsed, sections, preamble):
+    score = 0.0
+    experience = parsed["experience"]
+    if experience:
+        quality = [(bool(entry["title"]) + bool(entry["dates"]) + bool(entry["responsibilities"])) / 3 for entry in experience]
+        score += 0.35 * sum(quality) / len(quality)
+    if parsed["education"]:
+        score += 0.2
+    score += 0.25 * min(1.0, len(parsed["skills"]) / 3)
+    if parsed["summary"]:
+        score += 0.1
+    # Text under no recognized heading (apart from a short header block) is text this parser may have lost
+    section_lines = sum(len(lines) for lines in sections.values())
+    total_lines = section_lines + len(preamble)
+    stray = max(0, len(preamble) - 8)
+    score += 0.1 * (1 - stray / total_lines) if total_lines else 0.0
+    return round(min(1.0, score), 3)
+
+def parse_resume_rules(resume_text):
+    """Returns (parsed, confidence). parsed has parse_resume_with_llm's shape: summary, experience
+    [{title, company, dates, responsibilities}], education [{degree, institution, dates}], skills."""
+    preamble, sections = split_sections(resume_text or "")
+    summary_lines = sections.get(SECTION_SUMMARY)
+    parsed = {
+        "summary": " ".join(summary_lines) if summary_lines else _preamble_summary(preamble),
+        "experience": parse_experience(sections.get(SECTION_EXPERIENCE, [])),
+        "education": parse_education(sections.get(SECTION_EDUCATION, [])),
+        "skills": parse_skills(sections.get(SECTION_SKILLS, [])),
+    }
+    return parsed, _confidence(parsed, sections, preamble)
+
+def _read_resume(path):
+    if path.lower().endswith('.pdf'):
+        import logging
+        from .extract import extract_text_from_pdf
+        with open(path, 'rb') as f:
+            return extract_text_from_pdf(f, logging.getLogger("resume_parser"))
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def _benchmark(paths, min_confidence, repeat):
+    import numpy as np
+    rows = []
+    for path in paths:
+        text = _read_resume(path)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parsed, confidence = parse_resume_rules(text)
+            timings.append(time.perf_counter() - start)
+        rows.append((os.path.basename(path), float(np.median(timings)) * 1000.0, confidence, parsed))
+    if not rows:
+        raise SystemExit("No .txt or .pdf resumes found.")
+    print(f"{'resume':<32} {'ms':>7} {'conf':>6}  {'exp':>3} {'edu':>3} {'skills':>6}  path")
+    for name, ms, confidence, parsed in rows:
+        path = "rules" if confidence >= min_confidence else "LLM"
+        print(f"{name[:32]:<32} {ms:>7.2f} {confidence:>6.3f}  {len(parsed['experience']):>3} {len(parsed['education']):>3} "
+              f"{len(parsed['skills']):>6}  {path}")
+    latencies = np.array([ms for _, ms, _, _ in rows])
+    skipped = sum(confidence >= min_confidence for _, _, confidence, _ in rows)
+    print(f"\n{len(rows)} resumes: parse p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms; "
+          f"LLM skipped for {skipped}/{len(rows)} ({skipped / len(rows):.0%}) at min confidence {min_confidence}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rule-based resume parser: parse one resume or benchmark a corpus.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    parse_cmd = commands.add_parser('parse', help="Print the parse of one .txt or .pdf resume as JSON")
+    parse_cmd.add_argument('path')
+    bench_cmd = commands.add_parser('benchmark', help="Latency, confidence and LLM skip rate over a directory of resumes")
+    bench_cmd.add_argument('corpus', help="Directory of .txt and .pdf resumes")
+    bench_cmd.add_argument('--min-confidence', type=float, default=0.75, help="RESUME_RULE_PARSER_MIN_CONFIDENCE")
+    bench_cmd.add_argument('--repeat', type=int, default=20, help="Parses per resume (the median is reported)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'parse':
+        parsed, confidence = parse_resume_rules(_read_resume(args.path))
+        print(json.dumps({"confidence": confidence, **parsed}, indent=2, ensure_ascii=False))
+    else:
+        paths = sorted(os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+                       if name.lower().endswith(('.txt', '.pdf')))
+        _benchmark(paths, args.min_confidence, max(1, args.repeat))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# flask_server/pages/resume_tailoring.py
+# Tailors the sections of a parsed resume (summary, each experience entry's responsibilities, skills)
+# concurrently. Every section is an independent LLM round trip, so the request takes about as long as the
+# slowest section instead of the sum of all of them. The threads come from one pool shared by all requests,
+# so RESUME_TAILOR_MAX_CONCURRENCY bounds the calls in flight to the Ollama server across the whole worker.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .ai_utils import generate_tailored_section
+
+_executor = None # Created by init_app()
+_executor_lock = threading.Lock()
+_max_concurrency = 4
+
+def init_app(app):
+    global _max_concurrency
+    _max_concurrency = max(1, app.config.get('RESUME_TAILOR_MAX_CONCURRENCY', 4))
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_concurrency, thread_name_prefix="resume-tailor")
+        return _executor
+
+def _section_tasks(parsed_data):
+    """(label, section_type, content, place) for every non-empty section, in resume order."""
+    tasks = []
+    if parsed_data.get("summary"):
+        tasks.append(("summary", "summary", parsed_data["summary"], ("summary",)))
+    for index, job in enumerate(parsed_data.get("experience") or []):
+        if job and job.get("responsibilities"):
+            tasks.append((f"experience[{index}].responsibilities", "experience_responsibilities", job["responsibilities"], ("experience", index)))
+    if parsed_data.get("skills"):
+        tasks.append(("skills", "skills", parsed_data["skills"], ("skills",)))
+    return tasks
+
+def iter_tailored_sections(parsed_data, job_title, job_description, logger, model="tinyllama"):
+    """Yields (index, label, content, timing) for each section as soon as it is tailored (completion order);
+    index is the section's position in resume order. Raises the first section error."""
+    submitted_at = time.perf_counter()
+
+    def run(label, section_type, content):
+        started = time.perf_counter()
+        result = generate_tailored_section(section_type, content, job_title, job_description, logger, model=model)
+        return result, {"section": label, "queued_seconds": round(started - submitted_at, 3),
+                        "seconds": round(time.perf_counter() - started, 3)}
+
+    tasks = _section_tasks(parsed_data)
+    executor = _get_executor()
+    futures = {executor.submit(run, label, section_type, content): index
+               for index, (label, section_type, content, _) in enumerate(tasks)}
+    try:
+        for future in as_completed(futures):
+            content, timing = future.result()
+            index = futures[future]
+            yield index, tasks[index][0], content, timing
+    finally:
+        for future in futures: # No-op for finished ones; drops queued sections after an error or a closed stream
+            future.cancel()
+
+def section_labels(parsed_data):
+    return [label for label, _, _, _ in _section_tasks(parsed_data)]
+
+def merge_tailored_sections(parsed_data, contents):
+    """parsed_data with the tailored section contents ({index: content}, indices as from iter_tailored_sections).
+    parsed_data is not modified."""
+    tailored = dict(parsed_data)
+    if parsed_data.get("experience"):
+        tailored["experience"] = [dict(job) if job else job for job in parsed_data["experience"]]
+    for index, (_, _, _, place) in enumerate(_section_tasks(parsed_data)):
+        if index not in contents:
+            continue
+        if place[0] == "experience":
+            tailored["experience"][place[1]]["responsibilities"] = contents[index]
+        else:
+            tailored[place[0]] = contents[index]
+    return tailored
+
+def tailor_resume_sections(parsed_data, job_title, job_description, logger, model="tinyllama"):
+    """Returns (tailored_data, timings). tailored_data has the structure and order of parsed_data, which is not
+    modified; timings lists each section's queue wait and LLM time, in resume order. Raises the first section error."""
+    start = time.perf_counter()
+    contents, timings = {}, {}
+    for index, _, content, timing in iter_tailored_sections(parsed_data, job_title, job_description, logger, model=model):
+        contents[index], timings[index] = content, timing
+    timings = [timings[index] for index in sorted(timings)]
+    logger.info(f"Tailored {len(timings)} resume sections in {time.perf_counter() - start:.2f}s "
+                f"(slowest: {max((t['seconds'] for t in timings), default=0):.2f}s, concurrency cap {_max_concurrency}).")
+    return merge_tailored_sections(parsed_data, contents), timings
@@ -0,0 +1,23 @@
+# flask_server/pages/sse.py
+# Server-Sent Events for the streaming endpoints. Each event's data is one JSON document; an 'error'
+# event carries {"error", "status"} because the HTTP status (200) is already sent when a stream fails.
+import json
+
+from flask import Response, stream_with_context
+
+def sse_event(data, event=None):
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in json.dumps(data).split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+def sse_response(events):
+    """Streams an iterator of sse_event() strings. A comment goes out first so the client gets its first
+    byte before any model work starts."""
+    def with_preamble():
+        yield ": stream open\n\n"
+        yield from events
+    return Response(stream_with_context(with_preamble()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}) # No proxy buffering (nginx)
+
+def sse_error(message, status=500):
+    return sse_event({"error": message, "status": status}, event="error")
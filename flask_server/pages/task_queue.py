@@ -0,0 +1,326 @@
+# flask_server/pages/task_queue.py
+# Background tasks for long LLM requests, so a slow /generate_resume or /evaluate_answers no longer holds a
+# gunicorn worker for its whole run.
+#   queue    table 'tasks' in TASK_QUEUE_DB_PATH (SQLite, WAL): queued tasks and finished results survive restarts
+#            and are shared by every worker process on the host
+#   workers  TASK_QUEUE_WORKERS threads per process claim queued tasks (BEGIN IMMEDIATE, so one claimant each) and
+#            run the handler registered for the task's kind inside an app context
+#   restarts a heartbeat thread refreshes the running tasks of this process; running tasks whose heartbeat is older
+#            than TASK_STALE_SECONDS (their process died) are queued again, up to TASK_MAX_ATTEMPTS runs
+#   cancel   queued tasks are cancelled at once; running ones are flagged and stop at their next
+#            context.check_cancelled(), and their result is discarded
+# Handlers: register_task(kind, func) with func(payload, context) -> JSON-serializable result.
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+class TaskCancelled(Exception):
+    """Raised by TaskContext.check_cancelled() once cancellation of a running task was requested."""
+
+class TaskStore:
+    """SQLite persistence for tasks; one connection per thread."""
+
+    def __init__(self, db_path, timeout=10.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, user_id TEXT,"
+            " status TEXT NOT NULL, progress TEXT, result TEXT, error TEXT, error_status INTEGER,"
+            " attempts INTEGER NOT NULL DEFAULT 0, cancel_requested INTEGER NOT NULL DEFAULT 0, worker TEXT,"
+            " created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def insert(self, kind, payload, user_id=None):
+        task_id = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO tasks (id, kind, payload, user_id, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, kind, json.dumps(payload), user_id, STATUS_QUEUED, time.time())
+        )
+        return task_id
+
+    def get(self, task_id):
+        row = self._connection().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, worker, kinds):
+        """Marks the oldest queued task of one of kinds as running by worker and returns it, or None."""
+        conn = self._connection()
+        placeholders = ",".join("?" * len(kinds))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT * FROM tasks WHERE status = ? AND kind IN ({placeholders}) ORDER BY created_at LIMIT 1",
+                (STATUS_QUEUED, *kinds)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker = ?, started_at = ?, heartbeat_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (STATUS_RUNNING, worker, now, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        task = dict(row)
+        task.update(status=STATUS_RUNNING, worker=worker, started_at=now, attempts=task["attempts"] + 1)
+        return task
+
+    def finish(self, task_id, status, result=None, error=None, error_status=None):
+        self._connection().execute(
+            "UPDATE tasks SET status = ?, result = ?, error = ?, error_status = ?, finished_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, error_status, time.time(), task_id)
+        )
+
+    def set_progress(self, task_id, progress):
+        self._connection().execute("UPDATE tasks SET progress = ? WHERE id = ?", (json.dumps(progress), task_id))
+
+    def request_cancel(self, task_id):
+        """Cancels a queued task, flags a running one. Returns the task afterwards (None if unknown)."""
+        conn = self._connection()
+        conn.execute("UPDATE tasks SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                     (STATUS_CANCELLED, time.time(), task_id, STATUS_QUEUED))
+        conn.execute("UPDATE tasks SET cancel_requested = 1 WHERE id = ? AND status = ?", (task_id, STATUS_RUNNING))
+        return self.get(task_id)
+
+    def cancel_requested(self, task_id):
+        row = self._connection().execute("SELECT cancel_requested FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return bool(row and row[0])
+
+    def heartbeat(self, task_ids):
+        if task_ids:
+            placeholders = ",".join("?" * len(task_ids))
+            self._connection().execute(f"UPDATE tasks SET heartbeat_at = ? WHERE id IN ({placeholders})", (time.time(), *task_ids))
+
+    def recover_stale(self, stale_seconds, max_attempts):
+        """Requeues running tasks whose process stopped heartbeating; fails those out of attempts. Returns (requeued, failed)."""
+        conn = self._connection()
+        cutoff = time.time() - stale_seconds
+        failed = conn.execute(
+            "UPDATE tasks SET status = ?, error = 'Worker stopped while running the task.', error_status = 500, finished_at = ?"
+            " WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+            (STATUS_FAILED, time.time(), STATUS_RUNNING, cutoff, max_attempts)
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE tasks SET status = ?, worker = NULL, started_at = NULL WHERE status = ? AND heartbeat_at < ?",
+            (STATUS_QUEUED, STATUS_RUNNING, cutoff)
+        ).rowcount
+        return requeued, failed
+
+    def purge_finished(self, older_than_seconds):
+        placeholders = ",".join("?" * len(FINISHED_STATUSES))
+        return self._connection().execute(
+            f"DELETE FROM tasks WHERE status IN ({placeholders}) AND finished_at < ?",
+            (*FINISHED_STATUSES, time.time() - older_than_seconds)
+        ).rowcount
+
+    def counts(self):
+        return dict(self._connection().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+class TaskContext:
+    """Passed to handlers: logger, progress reporting and cooperative cancellation."""
+
+    def __init__(self, store, task, logger):
+        self.store = store
+        self.task_id = task["id"]
+        self.user_id = task["user_id"]
+        self.logger = logger
+
+    def set_progress(self, **progress):
+        self.store.set_progress(self.task_id, progress)
+
+    def check_cancelled(self):
+        if self.store.cancel_requested(self.task_id):
+            raise TaskCancelled()
+
+_handlers = {} # kind -> func(payload, context)
+_store = None
+_app = None
+_settings = {"workers": 2, "poll_seconds": 1.0, "stale_seconds": 300, "max_attempts": 2, "result_ttl_seconds": 86400}
+_wakeup = threading.Condition()
+_running = {} # task id -> worker name, for this process's heartbeat
+_running_lock = threading.Lock()
+_started_pid = None
+_start_lock = threading.Lock()
+
+def register_task(kind, func):
+    _handlers[kind] = func
+
+def init_app(app):
+    """Opens the queue (TASK_QUEUE_ENABLED) and starts this process's workers (TASK_QUEUE_WORKERS; 0 = submit only)."""
+    global _store, _app
+    if not app.config.get('TASK_QUEUE_ENABLED', True):
+        _store = None
+        app.logger.info("Task queue disabled.")
+        return
+    _settings["workers"] = app.config.get('TASK_QUEUE_WORKERS', 2)
+    _settings["poll_seconds"] = app.config.get('TASK_QUEUE_POLL_SECONDS', 1.0)
+    _settings["stale_seconds"] = app.config.get('TASK_STALE_SECONDS', 300)
+    _settings["max_attempts"] = app.config.get('TASK_MAX_ATTEMPTS', 2)
+    _settings["result_ttl_seconds"] = app.config.get('TASK_RESULT_TTL_SECONDS', 86400)
+    try:
+        _store = TaskStore(app.config.get('TASK_QUEUE_DB_PATH'))
+    except Exception as e:
+        _store = None
+        app.logger.error(f"Could not open task queue database: {e}. Async endpoints disabled.", exc_info=True)
+        return
+    _app = app
+    _ensure_workers()
+
+def _ensure_workers():
+    """Starts worker threads once per process (again after a fork, e.g. gunicorn --preload)."""
+    global _started_pid
+    if _store is None or _settings["workers"] <= 0 or _started_pid == os.getpid():
+        return
+    if multiprocessing.current_process().name != 'MainProcess':
+        return # Pool processes (e.g. pages/extract.py) re-importing the entry module must not claim tasks
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        _started_pid = os.getpid()
+        with _running_lock:
+            _running.clear()
+        for index in range(_settings["workers"]):
+            threading.Thread(target=_worker_loop, args=(f"{os.getpid()}:{index}",), name=f"task-worker-{index}", daemon=True).start()
+        threading.Thread(target=_maintenance_loop, name="task-maintenance", daemon=True).start()
+        _app.logger.info(f"Task queue: {_settings['workers']} workers started (pid {os.getpid()}).")
+
+def is_enabled():
+    return _store is not None
+
+def submit(kind, payload, user_id=None):
+    """Queues a task and returns its id."""
+    if _store is None:
+        raise RuntimeError("Task queue is not enabled.")
+    if kind not in _handlers:
+        raise ValueError(f"Unknown task kind '{kind}'.")
+    task_id = _store.insert(kind, payload, user_id=user_id)
+    _ensure_workers()
+    with _wakeup:
+        _wakeup.notify()
+    return task_id
+
+def _error_status(exc):
+    if isinstance(exc, ConnectionError):
+        return 503
+    return getattr(exc, 'http_status', None) or 500
+
+def _run_task(task, worker):
+    logger = _app.logger
+    context = TaskContext(_store, task, logger)
+    with _running_lock:
+        _running[task["id"]] = worker
+    start = time.perf_counter()
+    try:
+        with _app.app_context():
+            context.check_cancelled()
+            result = _handlers[task["kind"]](json.loads(task["payload"]), context)
+        if _store.cancel_requested(task["id"]):
+            raise TaskCancelled()
+        _store.finish(task["id"], STATUS_SUCCEEDED, result=result)
+        logger.info(f"Task {task['id']} ({task['kind']}) succeeded in {time.perf_counter() - start:.2f}s.")
+    except TaskCancelled:
+        _store.finish(task["id"], STATUS_CANCELLED)
+        logger.info(f"Task {task['id']} ({task['kind']}) cancelled.")
+    except Exception as e:
+        logger.error(f"Task {task['id']} ({task['kind']}) failed: {e}", exc_info=True)
+        _store.finish(task["id"], STATUS_FAILED, error=str(e), error_status=_error_status(e))
+    finally:
+        with _running_lock:
+            _running.pop(task["id"], None)
+
+def _worker_loop(worker):
+    while True:
+        try:
+            task = _store.claim(worker, list(_handlers)) if _handlers else None
+        except Exception as e:
+            _app.logger.error(f"Task queue claim failed: {e}", exc_info=True)
+            task = None
+        if task is None:
+            with _wakeup:
+                _wakeup.wait(_settings["poll_seconds"]) # Woken by submit() in this process; polls for the others
+            continue
+        _run_task(task, worker)
+
+def _maintenance_loop():
+    interval = max(1.0, _settings["stale_seconds"] / 3)
+    last_purge = 0.0
+    while True:
+        try:
+            with _running_lock:
+                running = list(_running)
+            _store.heartbeat(running)
+            requeued, failed = _store.recover_stale(_settings["stale_seconds"], _settings["max_attempts"])
+            if requeued or failed:
+                _app.logger.warning(f"Task queue: requeued {requeued} and failed {failed} tasks of stopped workers.")
+                with _wakeup:
+                    _wakeup.notify_all()
+            if time.time() - last_purge > 3600:
+                _store.purge_finished(_settings["result_ttl_seconds"])
+                last_purge = time.time()
+        except Exception as e:
+            _app.logger.error(f"Task queue maintenance failed: {e}", exc_info=True)
+        time.sleep(interval)
+
+def get_task(task_id):
+    return _store.get(task_id) if _store is not None else None
+
+def cancel(task_id):
+    return _store.request_cancel(task_id) if _store is not None else None
+
+def task_status(task):
+    """Public view of a task row (no payload or result)."""
+    return {
+        "task_id": task["id"],
+        "kind": task["kind"],
+        "status": task["status"],
+        "progress": json.loads(task["progress"]) if task["progress"] else None,
+        "error": task["error"],
+        "attempts": task["attempts"],
+        "cancel_requested": bool(task["cancel_requested"]),
+        "created_at": task["created_at"],
+        "started_at": task["started_at"],
+        "finished_at": task["finished_at"],
+    }
+
+def task_result(task):
+    return json.loads(task["result"]) if task["result"] else None
+
+def get_task_queue_stats():
+    if _store is None:
+        return {"enabled": False}
+    try:
+        counts = _store.counts()
+    except Exception as e:
+        counts = {"error": str(e)}
+    with _running_lock:
+        running_here = len(_running)
+    return {"enabled": True, "workers": _settings["workers"], "running_in_this_process": running_here, "tasks": counts}
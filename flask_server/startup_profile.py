@@ -0,0 +1,105 @@
+# flask_server/startup_profile.py
+# Reports where worker startup time goes, import by import.
+#
+#   python -m flask_server.startup_profile [--top 25] [--min-ms 20] [--no-warmup]
+#
+# Starts a fresh interpreter with `python -X importtime`, imports flask_server, calls create_app() and then
+# waits for the background warm-up (see warmup.py). Imports are attributed to the phase they happened in:
+#   import     `import flask_server` (module-level imports of every blueprint)
+#   create_app create_app() itself
+#   warmup     deferred imports and model loads in the warm-up thread
+# For each phase it prints the wall time and the most expensive imports (cumulative, i.e. including the
+# modules they pull in), so a new module-level import of something heavy shows up immediately.
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PHASE_MARKER = "--- startup-profile phase: "
+
+_CHILD_SCRIPT = """
+import json, sys, time
+def mark(phase):
+    sys.stderr.write("%s" + phase + "\\n"); sys.stderr.flush()
+timings = {}
+mark("import")
+start = time.perf_counter()
+import flask_server
+from flask_server.warmup import get_readiness
+timings["import"] = time.perf_counter() - start
+mark("create_app")
+start = time.perf_counter()
+app = flask_server.create_app()
+timings["create_app"] = time.perf_counter() - start
+mark("warmup")
+start = time.perf_counter()
+report = get_readiness()[1]
+while %s and report["warmup_seconds"] is None and time.perf_counter() - start < %f:
+    time.sleep(0.05)
+    report = get_readiness()[1]
+timings["warmup"] = time.perf_counter() - start
+mark("done")
+print(json.dumps({"timings": timings, "readiness": report}))
+"""
+
+def parse_importtime(stderr_text):
+    """Returns {phase: [(cumulative_us, self_us, depth, module), ...]} from `-X importtime` output."""
+    phases, phase = {}, "interpreter"
+    for line in stderr_text.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER):].strip()
+            continue
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue # Header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        phases.setdefault(phase, []).append((cumulative_us, self_us, depth, name.strip()))
+    return phases
+
+def run_profile(wait_for_warmup=True, timeout_seconds=300.0):
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = project_root + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+    env.setdefault("COURSE_MODEL_WATCH_INTERVAL_SECONDS", "0")
+    script = _CHILD_SCRIPT % (PHASE_MARKER, bool(wait_for_warmup), timeout_seconds)
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", script], cwd=project_root, env=env,
+                               capture_output=True, text=True, timeout=timeout_seconds + 60)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Profiled app startup failed:\n{completed.stderr[-4000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(completed.stderr)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-import startup cost of the Flask app.")
+    parser.add_argument('--top', type=int, default=25, help="Imports listed per phase")
+    parser.add_argument('--min-ms', type=float, default=20.0, help="Hide imports cheaper than this (cumulative)")
+    parser.add_argument('--no-warmup', action='store_true', help="Do not wait for the background warm-up")
+    args = parser.parse_args(argv)
+
+    result = run_profile(wait_for_warmup=not args.no_warmup)
+    timings = result["timings"]
+    print(f"import flask_server {timings['import'] * 1000:9.1f} ms")
+    print(f"create_app()        {timings['create_app'] * 1000:9.1f} ms")
+    if not args.no_warmup:
+        print(f"warm-up             {timings['warmup'] * 1000:9.1f} ms")
+        for name, info in result["readiness"]["components"].items():
+            seconds = f"{info['seconds'] * 1000:9.1f} ms" if info["seconds"] is not None else f"{'-':>12}"
+            print(f"  {name:<18}{seconds}  {info['status']}" + (f" ({info['error']})" if info["error"] else ""))
+
+    for phase in ("import", "create_app", "warmup"):
+        entries = [e for e in result["imports"].get(phase, []) if e[0] / 1000 >= args.min_ms]
+        if not entries:
+            continue
+        entries.sort(reverse=True)
+        print(f"\n{phase}: imports >= {args.min_ms:g} ms (cumulative, self, module)")
+        for cumulative_us, self_us, depth, name in entries[:args.top]:
+            print(f"{cumulative_us / 1000:9.1f} {self_us / 1000:8.1f}  {'  ' * depth}{name}")
+
+if __name__ == '__main__':
+    main()
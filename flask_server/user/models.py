@@ -33,6 +33,8 @@
 
 
     # flask_server/user/models.py
+import json
+from datetime import datetime, timezone
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from flask import current_app # For logging within static methods if needed
@@ -79,4 +81,55 @@ class User(UserMixin, db.Model):
             db.session.rollback()
             current_app.logger.error(f"Error committing user {id} to database: {e}", exc_info=True)
             raise # Re-raise the exception to be handled by the caller
-        return user
\ No newline at end of file
+        return user
+
+class ParsedResume(db.Model):
+    """Structured output of parse_resume_with_llm, keyed by SHA-256 of the resume text, the LLM and the parser
+    version, so a resume is parsed once however many jobs it is tailored to. user_id is None for anonymous uploads."""
+    __tablename__ = 'jobber_parsed_resumes'
+    __table_args__ = (db.UniqueConstraint('user_id', 'text_hash', 'model_name', 'parser_version', name='uq_parsed_resume_key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String, db.ForeignKey('jobber_users.id', ondelete='CASCADE'), nullable=True, index=True)
+    text_hash = db.Column(db.String(64), nullable=False, index=True)
+    model_name = db.Column(db.String(100), nullable=False)
+    parser_version = db.Column(db.Integer, nullable=False)
+    parsed_json = db.Column(db.Text, nullable=False) # {"summary", "experience", "education", "skills"}
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_used_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    use_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ParsedResume {self.text_hash[:12]} {self.model_name} user={self.user_id}>'
+
+    @property
+    def parsed(self):
+        return json.loads(self.parsed_json)
+
+    @staticmethod
+    def lookup(user_id, text_hash, model_name, parser_version):
+        entry = ParsedResume.query.filter_by(user_id=user_id, text_hash=text_hash, model_name=model_name,
+                                             parser_version=parser_version).first()
+        if entry:
+            entry.last_used_at = datetime.now(timezone.utc)
+            entry.use_count += 1
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning(f"Could not update parsed resume usage: {e}")
+        return entry
+
+    @staticmethod
+    def store(user_id, text_hash, model_name, parser_version, parsed):
+        entry = ParsedResume(user_id=user_id, text_hash=text_hash, model_name=model_name,
+                             parser_version=parser_version, parsed_json=json.dumps(parsed), use_count=1)
+        db.session.add(entry)
+        try:
+            db.session.commit()
+        except Exception as e:
+            # Most likely a concurrent request stored the same resume first; its entry is equivalent
+            db.session.rollback()
+            current_app.logger.warning(f"Could not store parsed resume {text_hash[:12]}: {e}")
+            return None
+        return entry
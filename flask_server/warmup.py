@@ -0,0 +1,140 @@
+# flask_server/warmup.py
+# Startup warm-up. create_app only wires things up; the slow parts (the course model with its sklearn/scipy
+# imports, SBERT with torch, and loading the LLM into Ollama's memory) load here, by default in a background
+# thread so a worker accepts connections right away. /api/livez answers as soon as the process serves
+# requests; /api/readyz answers 200 only once warm-up has finished, so a load balancer routes traffic to warm
+# workers only.
+import multiprocessing
+import threading
+import time
+
+COMPONENT_COURSE_RECOMMENDER = 'course_recommender'
+COMPONENT_SBERT = 'sbert'
+COMPONENT_LLM = 'llm'
+
+_lock = threading.Lock()
+_components = {} # name -> {"status": pending|loading|ready|failed|disabled, "seconds": float, "error": str}
+_required_components = ()
+_create_app_seconds = None
+_process_started_at = time.time()
+_warmup_started_at = None
+_warmup_finished_at = None
+_warmup_thread = None
+
+def _warm_course_recommender(app):
+    from .course_recommender.service import warm_up
+    return warm_up()
+
+def _warm_sbert(app):
+    from .pages.load_model import SBERT_MODEL_NAME, load_bert_model, load_onnx_bert_model
+    from .pages.embedding_cache import wrap_encoder
+    from .pages.inference_batcher import wrap_batcher
+    from .course_recommender.service import set_query_encoder
+    cache_model_name = SBERT_MODEL_NAME
+    if app.config.get('SBERT_BACKEND', 'torch') == 'onnx':
+        sbert_model, sbert_loaded = load_onnx_bert_model(app.logger, app.config.get('SBERT_ONNX_DIR'),
+                                                         quantized=app.config.get('SBERT_ONNX_QUANTIZED', True),
+                                                         intra_op_threads=app.config.get('SBERT_ONNX_THREADS', 0))
+        if sbert_loaded:
+            cache_model_name = sbert_model.model_name # Its vectors differ slightly; keep them apart in the cache
+    else:
+        sbert_model, sbert_loaded = load_bert_model(app.logger)
+    sbert_model = wrap_batcher(sbert_model, logger=app.logger) # Concurrent cache misses share forward passes
+    sbert_model = wrap_encoder(sbert_model, cache_model_name, logger=app.logger) # Every caller goes through the embedding cache
+    app.config['SBERT_MODEL'] = sbert_model
+    app.config['SBERT_MODEL_LOADED'] = sbert_loaded
+    if sbert_loaded:
+        # The ONNX export is the same model (drift-checked), so course embeddings built with torch still match
+        set_query_encoder(sbert_model, SBERT_MODEL_NAME) # Enables the 'hybrid' course engine
+    return sbert_loaded
+
+def _warm_llm(app):
+    from .pages.llm_client import get_llm_client
+    return get_llm_client().preload(app.config.get('LLM_MODEL', 'tinyllama'), app.logger)
+
+def _set_component(name, **fields):
+    with _lock:
+        _components.setdefault(name, {"status": "pending", "seconds": None, "error": None}).update(fields)
+
+def _run_component(app, name, loader):
+    _set_component(name, status="loading")
+    start = time.perf_counter()
+    try:
+        loaded, error = bool(loader(app)), None
+        if not loaded:
+            error = "Load failed; see logs."
+    except Exception as e:
+        app.logger.error(f"Warm-up of '{name}' failed: {e}", exc_info=True)
+        loaded, error = False, str(e)
+    seconds = round(time.perf_counter() - start, 3)
+    _set_component(name, status="ready" if loaded else "failed", seconds=seconds, error=error)
+    if loaded:
+        app.logger.info(f"Warm-up: '{name}' ready in {seconds:.2f}s.")
+    else:
+        app.logger.error(f"Warm-up: '{name}' failed after {seconds:.2f}s: {error}")
+
+def _run_warmup(app, loaders):
+    global _warmup_finished_at
+    for name, loader in loaders:
+        _run_component(app, name, loader)
+    _warmup_finished_at = time.time()
+    app.logger.info(f"Warm-up finished in {_warmup_finished_at - _warmup_started_at:.2f}s.")
+
+def start_warmup(app):
+    """Loads the models configured in app.config, in a background thread unless WARMUP_IN_BACKGROUND is false."""
+    global _required_components, _warmup_started_at, _warmup_finished_at, _warmup_thread
+    if multiprocessing.current_process().name != 'MainProcess':
+        # A pool process (e.g. pages/extract.py) re-importing the entry module; it never serves requests.
+        # (parent_process() is only set after that import, so the name is the reliable check.)
+        return
+    loaders = [(COMPONENT_COURSE_RECOMMENDER, _warm_course_recommender)]
+    with _lock:
+        _components.clear()
+        _components[COMPONENT_COURSE_RECOMMENDER] = {"status": "pending", "seconds": None, "error": None}
+        if app.config.get('SBERT_ENABLED'):
+            _components[COMPONENT_SBERT] = {"status": "pending", "seconds": None, "error": None}
+            loaders.append((COMPONENT_SBERT, _warm_sbert))
+        else:
+            _components[COMPONENT_SBERT] = {"status": "disabled", "seconds": None, "error": None}
+        if app.config.get('LLM_PRELOAD'):
+            _components[COMPONENT_LLM] = {"status": "pending", "seconds": None, "error": None}
+            loaders.append((COMPONENT_LLM, _warm_llm))
+        else:
+            _components[COMPONENT_LLM] = {"status": "disabled", "seconds": None, "error": None}
+    _required_components = tuple(name.strip() for name in app.config.get('WARMUP_REQUIRED_COMPONENTS', '').split(',') if name.strip())
+    _warmup_started_at, _warmup_finished_at = time.time(), None
+
+    if app.config.get('WARMUP_IN_BACKGROUND', True):
+        _warmup_thread = threading.Thread(target=_run_warmup, args=(app, loaders), name="app-warmup", daemon=True)
+        _warmup_thread.start()
+        app.logger.info(f"Warm-up started in background: {', '.join(name for name, _ in loaders)}")
+    else:
+        _run_warmup(app, loaders)
+
+def record_create_app_time(seconds):
+    global _create_app_seconds
+    _create_app_seconds = round(seconds, 3)
+
+def get_liveness():
+    return {"status": "alive", "uptime_seconds": round(time.time() - _process_started_at, 1)}
+
+def get_readiness():
+    """Returns (ready, report). Ready once warm-up has finished and no required component failed."""
+    with _lock:
+        components = {name: dict(info) for name, info in _components.items()}
+    finished = _warmup_started_at is not None and _warmup_finished_at is not None
+    failed_required = [name for name in _required_components if components.get(name, {}).get("status") != "ready"]
+    ready = finished and not failed_required
+    if not finished:
+        status = "warming_up"
+    elif failed_required:
+        status = "failed"
+    else:
+        status = "ready"
+    return ready, {
+        "status": status,
+        "components": components,
+        "required_components": list(_required_components),
+        "create_app_seconds": _create_app_seconds,
+        "warmup_seconds": round(_warmup_finished_at - _warmup_started_at, 3) if finished else None,
+    }
@@ -0,0 +1,116 @@
+# tests/test_fetch_data.py
+# Adzuna client (pages/fetch_data.py) against the local stand-in server (pages/fake_adzuna.py):
+# connection pooling, Retry-After handling, timeouts and circuit breaker transitions.
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from flask_server.pages import fetch_data
+from flask_server.pages.fake_adzuna import start_fake_adzuna
+from flask_server.pages.fetch_data import AdzunaUnavailable, search_adzuna_jobs
+
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def server():
+    server = start_fake_adzuna(port=0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def configure(server):
+    """Points fetch_data at the fake server; settings override the (fast) test defaults."""
+    def configure(**settings):
+        config = {
+            'ADZUNA_BASE_URL': f"http://127.0.0.1:{server.server_address[1]}/v1/api/jobs",
+            'ADZUNA_CONNECT_TIMEOUT_SECONDS': 1.0,
+            'ADZUNA_READ_TIMEOUT_SECONDS': 2.0,
+            'ADZUNA_MAX_RETRIES': 2,
+            'ADZUNA_BACKOFF_SECONDS': 0.01,
+            'ADZUNA_MAX_RETRY_AFTER_SECONDS': 1.0,
+            'ADZUNA_BREAKER_FAILURES': 5,
+            'ADZUNA_BREAKER_RESET_SECONDS': 30.0,
+        }
+        config.update(settings)
+        fetch_data.init_app(SimpleNamespace(config=config))
+    yield configure
+    fetch_data.init_app(SimpleNamespace(config={})) # Closes the pooled session
+
+def search(page=1):
+    return search_adzuna_jobs("id", "key", logger, country_code="gb", page=page, keywords="python", location="london")
+
+def test_searches_reuse_one_pooled_connection(server, configure):
+    configure()
+    for page in range(1, 6):
+        jobs, count = search(page)
+        assert len(jobs) == 20 and count > 0
+    assert server.requests == 5
+    assert server.connections == 1
+
+def test_503_with_retry_after_is_retried(server, configure):
+    configure()
+    server.fail_next, server.retry_after = 1, "0.2" # One 503, then success
+    started = time.monotonic()
+    jobs, _ = search()
+    assert jobs
+    assert server.requests == 2
+    assert time.monotonic() - started >= 0.2
+
+def test_retry_after_beyond_limit_fails_fast(server, configure):
+    configure(ADZUNA_MAX_RETRY_AFTER_SECONDS=1.0)
+    server.fail_status, server.retry_after = 429, "60"
+    with pytest.raises(AdzunaUnavailable) as raised:
+        search()
+    assert raised.value.retry_after == 60
+    assert server.requests == 1
+
+def test_read_timeout_surfaces_as_unavailable(server, configure):
+    configure(ADZUNA_READ_TIMEOUT_SECONDS=0.1, ADZUNA_MAX_RETRIES=0)
+    server.latency_seconds = 0.5
+    with pytest.raises(AdzunaUnavailable, match="ReadTimeout"):
+        search()
+
+def test_breaker_opens_after_consecutive_failures(server, configure):
+    configure(ADZUNA_MAX_RETRIES=0, ADZUNA_BREAKER_FAILURES=3)
+    server.fail_status = 503
+    for _ in range(3):
+        with pytest.raises(AdzunaUnavailable):
+            search()
+    assert fetch_data._breaker.state == "open"
+
+    started = time.monotonic()
+    with pytest.raises(AdzunaUnavailable, match="circuit breaker is open") as raised:
+        search()
+    assert time.monotonic() - started < 0.1
+    assert raised.value.retry_after > 0
+    assert server.requests == 3 # The short-circuited search never reached the server
+
+def test_breaker_half_open_trial_closes_it(server, configure):
+    configure(ADZUNA_MAX_RETRIES=0, ADZUNA_BREAKER_FAILURES=2, ADZUNA_BREAKER_RESET_SECONDS=0.2)
+    server.fail_status = 503
+    for _ in range(2):
+        with pytest.raises(AdzunaUnavailable):
+            search()
+    assert fetch_data._breaker.state == "open"
+
+    server.fail_status = None
+    time.sleep(0.25)
+    assert fetch_data._breaker.state == "half_open"
+    jobs, _ = search()
+    assert jobs
+    assert fetch_data._breaker.state == "closed"
+
+def test_breaker_failed_trial_reopens_it(server, configure):
+    configure(ADZUNA_MAX_RETRIES=0, ADZUNA_BREAKER_FAILURES=2, ADZUNA_BREAKER_RESET_SECONDS=0.2)
+    server.fail_status = 503
+    for _ in range(2):
+        with pytest.raises(AdzunaUnavailable):
+            search()
+    time.sleep(0.25)
+    with pytest.raises(AdzunaUnavailable, match="HTTP 503"):
+        search()
+    assert fetch_data._breaker.state == "open"
+    assert server.requests == 3